@@ -21,8 +21,5 @@ def inquiry_post_save(sender, instance, created, **kwargs):
     """Handle new inquiries"""
     if created:
         # Send notification email
-        send_inquiry_notification.delay(instance.id)
-        
-        # Update property inquiry count
-        instance.property.inquiry_count += 1
-        instance.property.save(update_fields=['inquiry_count'])
\ No newline at end of file
+        # (inquiry_count is incremented by submit_property_inquiry; counting here too counted every inquiry twice)
+        send_inquiry_notification.delay(instance.id)
\ No newline at end of file
@@ -9,5 +9,6 @@ urlpatterns = [
     path('api/filter/', views.exclusive_properties_filter_api, name='filter_api'),
     path('api/filter-options/', views.get_filter_options, name='filter_options'),
     path('inquiry/', views.submit_property_inquiry, name='submit_inquiry'),
+    path('api/<int:pk>/view/', views.exclusive_view_beacon, name='view_beacon'),
     path('<slug:slug>/', views.exclusive_property_detail, name='detail'),
 ]
\ No newline at end of file
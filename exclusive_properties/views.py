@@ -2,12 +2,17 @@ from main.utils import utf8_json_response as JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.utils import timezone
 from .models import ExclusiveProperty, PropertyInquiry
+from main.cache_tags import cached_tagged
+from main.conditional import not_modified, tags_etag, with_etag
+from main.edge_cache import tag_response
+from main import counters
+from main.crawlers import countable_beacon
 from django.conf import settings
 import json
 
@@ -235,7 +240,7 @@ def exclusive_properties_list(request):
         }
     }
     
-    return render(request, 'properties/exclusive_list.html', context)
+    return tag_response(render(request, 'properties/exclusive_list.html', context), 'exclusives')
 
 
 def exclusive_property_detail(request, slug):
@@ -246,26 +251,50 @@ def exclusive_property_detail(request, slug):
         is_exclusive=True
     )
     
-    # Increment view count
-    property_obj.view_count += 1
-    property_obj.save(update_fields=['view_count'])
+    # Views are counted by the page's beacon (exclusive_view_beacon): this view only sees
+    # edge-cache misses and revalidations
+
+    # Validator from the property (including the view count it shows) and the versions of its
+    # cached parts; revalidations skip the rendering
+    etag = tags_etag([f'exclusive:{property_obj.pk}', 'exclusives'], property_obj.updated_at, property_obj.view_count)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
     
-    # Get related properties
-    related_properties = ExclusiveProperty.objects.filter(
-        is_exclusive=True,
-        status__in=['available', 'under_offer'],
-        district=property_obj.district
-    ).exclude(id=property_obj.id)[:3]
+    # Related properties, images and amenities, cached until this or any exclusive property changes
+    related_properties, images, amenities = cached_tagged(
+        f'exclusive_detail_v1:{property_obj.pk}',
+        [f'exclusive:{property_obj.pk}', 'exclusives'],
+        lambda: (
+            list(ExclusiveProperty.objects.filter(
+                is_exclusive=True,
+                status__in=['available', 'under_offer'],
+                district=property_obj.district
+            ).exclude(id=property_obj.id)[:3]),
+            list(property_obj.images.all()),
+            list(property_obj.amenities.select_related('amenity')),
+        ),
+    )
     
     context = {
         'property': property_obj,
         'related_properties': related_properties,
-        'images': property_obj.images.all(),
-        'amenities': property_obj.amenities.all(),
+        'images': images,
+        'amenities': amenities,
         'MICROSERVICE_API':settings.MICROSERVICE_API,
     }
     
-    return render(request, 'properties/exclusive_detail.html', context)
+    response = with_etag(request, render(request, 'properties/exclusive_detail.html', context), etag)
+    return tag_response(response, f'exclusive:{property_obj.pk}', 'exclusives')
+
+
+@csrf_exempt
+@require_POST
+def exclusive_view_beacon(request, pk):
+    """Beacon sent by exclusive_detail.html; counted in memory and written in bulk (main/counters.py)"""
+    if countable_beacon(request, 'exclusive', pk) and ExclusiveProperty.objects.filter(pk=pk, is_exclusive=True).exists():
+        counters.increment(ExclusiveProperty, pk, 'view_count')
+    return HttpResponse(status=204)
 
 
 @require_POST
@@ -290,9 +319,8 @@ def submit_property_inquiry(request):
             budget_max=data.get('budget_max'),
         )
         
-        # Increment inquiry count
-        property_obj.inquiry_count += 1
-        property_obj.save(update_fields=['inquiry_count'])
+        # The only place inquiries are counted (main/counters.py writes it in bulk)
+        counters.increment(ExclusiveProperty, property_obj.pk, 'inquiry_count')
         
         # Send notification email (implement as needed)
         # send_inquiry_notification.delay(inquiry.id)
@@ -480,48 +508,53 @@ def exclusive_properties_api(request):
     return JsonResponse(list(properties), safe=False)
 
 
+def _filter_options():
+    """Distinct filter values across exclusive properties; cached until any of them changes"""
+    # Get cities
+    cities = list(ExclusiveProperty.objects.values_list('city', flat=True).distinct().exclude(city=''))
+    if not cities:
+        cities = ['Dubai', 'Abu Dhabi', 'Sharjah', 'Ajman', 'Ras Al Khaimah']
+    
+    # Get districts
+    districts = list(ExclusiveProperty.objects.values_list('district', flat=True).distinct().exclude(district=''))
+    if not districts:
+        districts = [
+            'Downtown Dubai', 'Dubai Marina', 'Palm Jumeirah', 'Dubai Hills Estate',
+            'Business Bay', 'Jumeirah Village Circle', 'Dubai South', 'Palm Jebel Ali',
+            'Jumeirah Beach Residence', 'Dubai Creek Harbour', 'Dubai Harbour',
+            'Bluewaters Island', 'Dubai Silicon Oasis', 'Dubai Sports City',
+            'Dubai Production City', 'Dubai Media City', 'Dubai Internet City'
+        ]
+    
+    # Get developers
+    developers = list(ExclusiveProperty.objects.values_list('developer_name', flat=True).distinct().exclude(developer_name=''))
+    if not developers:
+        developers = [
+            'Emaar Properties', 'Damac Properties', 'Nakheel', 'Meraas',
+            'Dubai Properties', 'Sobha Realty', 'Azizi Developments',
+            'Deyaar Development', 'Union Properties', 'Al Habtoor Group'
+        ]
+    
+    # Get completion years
+    completion_years = list(ExclusiveProperty.objects.values_list('completion_year', flat=True).distinct().exclude(completion_year__isnull=True).order_by('completion_year'))
+    if not completion_years:
+        current_year = timezone.now().year
+        completion_years = list(range(current_year, current_year + 6))
+    
+    return {
+        'cities': sorted(cities),
+        'districts': sorted(districts),
+        'developers': sorted(developers),
+        'completion_years': completion_years,
+    }
+
+
 def get_filter_options(request):
     """API endpoint to get filter options for dynamic loading"""
     try:
-        # Get cities
-        cities = list(ExclusiveProperty.objects.values_list('city', flat=True).distinct().exclude(city=''))
-        if not cities:
-            cities = ['Dubai', 'Abu Dhabi', 'Sharjah', 'Ajman', 'Ras Al Khaimah']
-        
-        # Get districts
-        districts = list(ExclusiveProperty.objects.values_list('district', flat=True).distinct().exclude(district=''))
-        if not districts:
-            districts = [
-                'Downtown Dubai', 'Dubai Marina', 'Palm Jumeirah', 'Dubai Hills Estate',
-                'Business Bay', 'Jumeirah Village Circle', 'Dubai South', 'Palm Jebel Ali',
-                'Jumeirah Beach Residence', 'Dubai Creek Harbour', 'Dubai Harbour',
-                'Bluewaters Island', 'Dubai Silicon Oasis', 'Dubai Sports City',
-                'Dubai Production City', 'Dubai Media City', 'Dubai Internet City'
-            ]
-        
-        # Get developers
-        developers = list(ExclusiveProperty.objects.values_list('developer_name', flat=True).distinct().exclude(developer_name=''))
-        if not developers:
-            developers = [
-                'Emaar Properties', 'Damac Properties', 'Nakheel', 'Meraas',
-                'Dubai Properties', 'Sobha Realty', 'Azizi Developments',
-                'Deyaar Development', 'Union Properties', 'Al Habtoor Group'
-            ]
-        
-        # Get completion years
-        completion_years = list(ExclusiveProperty.objects.values_list('completion_year', flat=True).distinct().exclude(completion_year__isnull=True).order_by('completion_year'))
-        if not completion_years:
-            current_year = timezone.now().year
-            completion_years = list(range(current_year, current_year + 6))
-        
         return JsonResponse({
             'status': 'success',
-            'data': {
-                'cities': sorted(cities),
-                'districts': sorted(districts),
-                'developers': sorted(developers),
-                'completion_years': completion_years,
-            }
+            'data': cached_tagged('exclusive_filter_options_v1', ['exclusives'], _filter_options),
         }, json_dumps_params={'ensure_ascii': False})
         
     except Exception as e:
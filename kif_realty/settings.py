@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',  # blog full-text search (main/blog_search.py)
     'main',
     'tinymce',
     'ckeditor',  # For rich text editing
@@ -55,6 +56,8 @@ TINYMCE_DEFAULT_CONFIG = {
 MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.gzip.GZipMiddleware',  # compress responses
+    'main.edge_cache.EdgeCacheMiddleware',  # Cache-Control / Surrogate-Key for the CDN
+    'main.hot_urls.HitCounterMiddleware',  # sampled popularity for manage.py warm_hot_urls
     'main.middleware.RemoveWWW',
     'main.middleware.UTF8EnforcementMiddleware',  # New UTF-8 middleware
     'django.middleware.security.SecurityMiddleware',
@@ -77,18 +80,27 @@ MAX_IMAGE_SIZE = (1200, 800)
 # Pagination settings
 PAGINATE_BY = 6
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'main.shell_fragments.shell',
+                'main.notices.notices',
             ],
+            # Parsed templates are kept per process in production; templates
+            # are re-read on every render while developing
+            'loaders': TEMPLATE_LOADERS if DEBUG else [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)],
         },
     },
 ]
@@ -137,11 +149,51 @@ DEFAULT_FROM_EMAIL = 'KIF Realty <noreply@kifrealty.com>'
 # CELERY_RESULT_BACKEND = 'redis://localhost:6379'
 
 
-CACHES = {
-    'default': {
+# Shared (L2) cache: 'db' (default), 'file' or 'redis'
+CACHE_L2 = os.getenv('CACHE_L2', 'db')
+SHARED_CACHES = {
+    'db': {
         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
         'LOCATION': 'sitemap_cache_table',
-    }
+        # Django's default of 300 entries culled the per-property entries (payload, HTML,
+        # slug, description, crawler snapshot, tag tokens: several keys per property) as
+        # fast as they were written. Above MAX_ENTRIES a write first deletes the expired
+        # rows and only then 1/CULL_FREQUENCY of the rest; size it to the catalogue.
+        # Redis ('redis') has no per-write COUNT(*) and is preferable under load.
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_DB_MAX_ENTRIES', 250000)),
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_FILE_PATH', str(BASE_DIR / 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_FILE_MAX_ENTRIES', 250000)),
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    # Per-process LRU in front of the shared cache (main/cache_backends.py)
+    'default': {
+        'BACKEND': 'main.cache_backends.TieredCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'MAX_ENTRIES': 2000,
+            'MAX_BYTES': 64 * 1024 * 1024,
+            'L1_TIMEOUT': 30,  # max staleness between workers, seconds
+            # Pickles at least this large are stored compressed
+            'COMPRESS_MIN_BYTES': 1024,
+            'COMPRESSOR': os.getenv('CACHE_COMPRESSOR', 'zlib'),  # 'lz4' if installed
+        },
+    },
+    'shared': SHARED_CACHES[CACHE_L2],
 }
 
 
@@ -193,3 +245,34 @@ PROPERTIES_API_URL = f"{MICROSERVICE_API}/properties/filter/"
 CITIES_API_URL = f"{MICROSERVICE_API}/cities/"
 DEVELOPERS_API_URL = f"{MICROSERVICE_API}/developers/"
 API_TIMEOUT = 30
+
+# Public forms use signed ?notice= tokens (main/notices.py); what's left of the
+# messages framework (the admin) stays out of the session store
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Reverse proxy / CDN (main/edge_cache.py)
+EDGE_CACHE_S_MAXAGE = int(os.getenv('EDGE_CACHE_S_MAXAGE', 300))
+EDGE_CACHE_STALE_WHILE_REVALIDATE = 60
+EDGE_CACHE_STALE_IF_ERROR = 60 * 60 * 24
+# 'main.edge_cache.HttpPurgeBackend' sends Varnish-style PURGE requests to EDGE_PURGE_URL
+EDGE_PURGE_BACKEND = os.getenv('EDGE_PURGE_BACKEND', 'main.edge_cache.NullPurgeBackend')
+EDGE_PURGE_URL = os.getenv('EDGE_PURGE_URL', 'http://127.0.0.1:6081')
+
+# Sampled page popularity (main/hot_urls.py) read by manage.py warm_hot_urls
+HOT_URLS_SAMPLE_RATE = float(os.getenv('HOT_URLS_SAMPLE_RATE', 0.1))
+HOT_URLS_FLUSH_INTERVAL = 60
+HOT_URLS_WINDOW_HOURS = 24
+
+# Upstream property views, counted in memory and upserted into PropertyViewDaily (main/property_views.py)
+PROPERTY_VIEWS_FLUSH_INTERVAL = 60
+# Write-behind view/inquiry counters of BlogPost and ExclusiveProperty (main/counters.py)
+COUNTERS_FLUSH_INTERVAL = 30
+
+# Landing/legal pages exported by manage.py export_static_pages on deploy
+STATIC_PAGES_ROOT = Path(os.getenv('STATIC_PAGES_ROOT', str(BASE_DIR / 'static_pages')))
+STATIC_PAGES_SERVE = config('STATIC_PAGES_SERVE', default=not DEBUG, cast=bool)
+
+# Fragment cache of the base.html navigation/footer (main/shell_fragments.py);
+# bump RELEASE on deploys that change URLs the shell links to
+RELEASE = os.getenv('RELEASE', '')
+SHELL_CACHE_TIMEOUT = 0 if DEBUG else 60 * 60 * 24
@@ -1,20 +1,12 @@
+from datetime import timedelta
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Q
 from django.urls import reverse
-from django.core.cache import cache
-from django.utils.text import slugify
-from main.models import BlogPost
-import requests
-import logging
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-logger = logging.getLogger(__name__)
-
-MICROSERVICE_API = os.getenv("MICROSERVICE_API")
-
-PROPERTIES_API_URL = f'{MICROSERVICE_API}/properties/large/'
+from django.utils import timezone
+from main.models import BlogPost, Property
+from main.sitemaps import PropertySitemap
+from exclusive_properties.models import ExclusiveProperty
 
 
 class StaticViewSitemap(Sitemap):
@@ -61,147 +53,65 @@ class BlogPostSitemap(Sitemap):
         return obj.updated_at
 
 
-class PropertySitemap(Sitemap):
-    changefreq = 'daily'
+class ExclusivePropertySitemap(Sitemap):
+    """Sitemap for exclusive (locally managed) properties."""
+    changefreq = "weekly"
     priority = 0.9
-    protocol = 'https'
-    limit = 250  # Django auto-splits into multiple sitemaps
 
     def items(self):
-        # """
-        # Fetch ALL 1712 properties from API
-        # Django will automatically paginate into multiple sitemap files
-        # """
-        # cache_key = 'sitemap_all_properties_final'
-        # cached = cache.get(cache_key)
-        """
-        Fetch ALL properties from API with slug and ID
-        Django will automatically paginate into multiple sitemap files
-        """
-        cache_key = 'sitemap_properties_slug_id_format'  # ✅ Updated cache key
-        cached = cache.get(cache_key)
-
-        if cached:
-            logger.info(f"[SITEMAP] ✅ Cache hit: {len(cached)} properties")
-            return cached
-
-        all_properties = []
-        page = 1
-        # max_pages = 10
-        max_pages = 100  # Increased to fetch more pages
-
-        logger.info("[SITEMAP] 🚀 Fetching all properties from API...")
-
-        while page <= max_pages:
-            try:
-                response = requests.get(
-                    PROPERTIES_API_URL,
-                    params={'page': page},
-                    timeout=30
-                )
-
-                if response.status_code != 200:
-                    logger.error(f"[SITEMAP] HTTP {response.status_code} on page {page}")
-                    break
-
-                data = response.json()
-
-                if not data.get('status'):
-                    logger.warning(f"[SITEMAP] Status false on page {page}")
-                    break
-
-                # Extract: data['data']['results']
-                data_block = data.get('data', {})
-                results = data_block.get('results', [])
-
-                if not results:
-                    logger.info(f"[SITEMAP] No results on page {page}")
-                    break
-
-
-                # Store each property as dict with id
-                # for prop in results:
-                #     if isinstance(prop, dict) and prop.get('id'):
-                #         all_properties.append({
-                #             'id': prop['id'],
-                #             'title': prop.get('title', '')
-                #         })
-
-                 # ✅ Store each property with id, slug, and title
-                for prop in results:
-                    if isinstance(prop, dict) and prop.get('id'):
-                        # Extract title - matches your views.py logic exactly
-                        title_data = prop.get('title', {})
-                        if isinstance(title_data, dict):
-                            title = title_data.get('en', 'Untitled')
-                        else:
-                            title = title_data or 'Untitled'
-                        
-                        # Get slug from API or create from title - matches views.py
-                        slug = prop.get('slug') or slugify(title)
-                        
-                        all_properties.append({
-                            'id': prop['id'],
-                            'slug': slug,
-                            'title': title
-                        })
-                
-                logger.info(f"[SITEMAP] Page {page}: {len(results)} properties | Total: {len(all_properties)}")
-
-                # Check if there's a next page
-                if not data_block.get('next_page_url'):
-                    logger.info("[SITEMAP] ✅ Reached last page")
-                    break
-
-                page += 1
-
-            except Exception as e:
-                logger.error(f"[SITEMAP] Error on page {page}: {str(e)}")
-                break
-
-        logger.info(f"[SITEMAP] ✅ Total fetched: {len(all_properties)} properties")
-
-        # Cache for 6 hours
-        if all_properties:
-            cache.set(cache_key, all_properties, 60 * 60 * 6)
-
-        return all_properties
+        return ExclusiveProperty.objects.filter(is_exclusive=True).exclude(slug='').only('slug', 'updated_at')
+
+    def location(self, obj):
+        return reverse('exclusive_properties:detail', kwargs={'slug': obj.slug})
+
+    def lastmod(self, obj):
+        return obj.updated_at
+
+
+class RecentChangesSitemap(Sitemap):
+    """
+    Properties, exclusive properties and blog posts created or updated in the
+    last SITEMAP_RECENT_DAYS days, newest first. Small enough to regenerate
+    often (generate_sitemaps --sections recent) so crawlers find fresh
+    inventory without re-reading every property shard.
+    """
+    changefreq = "daily"
+    priority = 1.0
+
+    def items(self):
+        since = timezone.now() - timedelta(days=getattr(settings, 'SITEMAP_RECENT_DAYS', 7))
+        recent = Q(updated_at__gte=since) | Q(created_at__gte=since)
+
+        items = [
+            {'loc': f'/property/{slug}-{api_id}/', 'lastmod': max(created_at, updated_at)}
+            for api_id, slug, created_at, updated_at in Property.objects.filter(recent, is_active=True)
+            .exclude(slug='').values_list('api_id', 'slug', 'created_at', 'updated_at')
+        ]
+        items.extend(
+            {'loc': reverse('exclusive_properties:detail', kwargs={'slug': slug}), 'lastmod': updated_at}
+            for slug, updated_at in ExclusiveProperty.objects.filter(recent, is_exclusive=True)
+            .exclude(slug='').values_list('slug', 'updated_at')
+        )
+        items.extend(
+            {'loc': reverse('blog_detail', kwargs={'slug': slug}), 'lastmod': updated_at}
+            for slug, updated_at in BlogPost.objects.filter(updated_at__gte=since, status='published')
+            .values_list('slug', 'updated_at')
+        )
+        items.sort(key=lambda item: item['lastmod'], reverse=True)
+        return items
 
     def location(self, obj):
-        
-        """
-        Generate URL for each property in slug-id format
-        Format: /property/vue-doree-2492/
-        This matches the URL pattern in urls.py: path('property/<slug:slug>-<int:pk>/'...)
-        """
-        if isinstance(obj, dict) and obj.get('id') and obj.get('slug'):
-            # ✅ Return slug-id format - matches your actual URLs
-            return f"/property/{obj['slug']}-{obj['id']}/"
-        
-        # Fallback if slug is missing (shouldn't happen but just in case)
-        if isinstance(obj, dict) and obj.get('id'):
-            logger.warning(f"[SITEMAP] Missing slug for property {obj['id']}, using ID only")
-            return f"/property/{obj['id']}/"
-        
-        # Debug log if something's wrong
-        logger.warning(f"[SITEMAP] Invalid object in location(): {type(obj)}")
-        return None
+        return obj['loc']
 
     def lastmod(self, obj):
-        """No lastmod data available from this API endpoint"""
-        return None
-        
-    #     """
-    #     Generate URL for each property
-    #     obj should be a dict with 'id' key
-    #     """
-    #     if isinstance(obj, dict) and obj.get('id'):
-    #         return f"/property/{obj['id']}/"
-        
-    #     # Debug log if something's wrong
-    #     logger.warning(f"[SITEMAP] Invalid object in location(): {type(obj)}")
-    #     return None
-
-    # def lastmod(self, obj):
-    #     """No lastmod data available from this API endpoint"""
-    #     return None
\ No newline at end of file
+        return obj['lastmod']
+
+
+# Sections served at /sitemap.xml, shared by the URLconf and generate_sitemaps
+SITEMAPS = {
+    'blogs': BlogPostSitemap,
+    'static': StaticViewSitemap,
+    'properties': PropertySitemap,
+    'exclusive': ExclusivePropertySitemap,
+    'recent': RecentChangesSitemap,
+}
@@ -1,10 +1,10 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap, index as sitemap_index
+from django.contrib.sitemaps.views import sitemap
 
-from .sitemaps import StaticViewSitemap, BlogPostSitemap,  PropertySitemap
+from .sitemaps import SITEMAPS
 # from .sitemaps import BlogSitemap, StaticViewSitemap, PropertySitemap
 # from .sitemaps import (
 #     BlogSitemap, 
@@ -14,11 +14,7 @@ from .sitemaps import StaticViewSitemap, BlogPostSitemap,  PropertySitemap
 from main import views as main_views  # import your app's views
 
 
-sitemaps_dict = {
-    'blogs': BlogPostSitemap,
-    'static': StaticViewSitemap,
-    'properties': PropertySitemap,   
-}
+sitemaps_dict = SITEMAPS
 
 
 urlpatterns = [
@@ -28,10 +24,13 @@ urlpatterns = [
     path('ckeditor/', include('ckeditor_uploader.urls')),
     # path('exclusive-properties/', include('exclusive_properties.urls')),
     
-    # Sitemap index (main sitemap file)
-    path('sitemap.xml', sitemap_index, {'sitemaps': sitemaps_dict}, name='django.contrib.sitemaps.views.sitemap_index'),
+    # Sitemap index - pre-generated file (generate_sitemaps), dynamic until one exists
+    path('sitemap.xml', main_views.sitemap_index_file, {'sitemaps': sitemaps_dict}, name='django.contrib.sitemaps.views.sitemap_index'),
     
-    # Individual sitemap sections
+    # Pre-generated, gzip-compressed shards
+    re_path(r'^(?P<filename>sitemap-[\w-]+\.xml\.gz)$', main_views.sitemap_file, name='sitemap_file'),
+    
+    # Individual sitemap sections (dynamic fallback)
     path('sitemap-<section>.xml', sitemap, {'sitemaps': sitemaps_dict}, name='django.contrib.sitemaps.views.sitemap'),
     
     # Robots.txt
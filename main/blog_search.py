@@ -0,0 +1,138 @@
+# main/blog_search.py
+"""
+Full-text search for the blog.
+
+The search used to OR ``icontains`` over title, excerpt, content and tag
+names and ``.distinct()`` the tag join: a sequential scan over every post
+body per search, getting slower with each post. Now each post stores a
+weighted ``search_vector`` (GIN-indexed), so a search is an index lookup:
+
+    A  title
+    B  excerpt, tag names
+    C  content (HTML tags are dropped by the PostgreSQL parser)
+    D  category name
+
+The vector is rebuilt with one UPDATE after a post is saved, its tags change,
+or a tag or category is renamed (main/signals.py); ``manage.py
+update_search_vectors`` fills it for existing posts. Results are ordered by
+``SearchRank`` and get a ``search_headline``: a ``ts_headline`` snippet of
+the content with the matches in ``<mark>``, computed only for the posts on
+the current page.
+
+Queries use ``websearch_to_tsquery`` syntax ("quoted phrases", ``or``,
+``-excluded``). Other databases (local SQLite) fall back to the old
+``icontains`` filter without ranking or snippets. Posts that match only
+through a tag or the category get no snippet and keep their excerpt.
+
+Schema: the column and its index come with ``BlogPost``
+(``'django.contrib.postgres'`` is in INSTALLED_APPS). Generate the
+migration with ``makemigrations main``, or apply the same DDL by hand, then
+fill the column with ``manage.py update_search_vectors``:
+
+    ALTER TABLE "main_blogpost" ADD COLUMN "search_vector" tsvector NULL;
+    CREATE INDEX "blogpost_search_vector_gin" ON "main_blogpost" USING gin ("search_vector");
+
+Posts without a vector yet are not found by the search.
+"""
+import logging
+import re
+from html import unescape
+from typing import Iterable
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Q, Value
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'english'
+HEADLINE_START = '<mark>'
+HEADLINE_STOP = '</mark>'
+HEADLINE_OPTIONS = {'max_words': 35, 'min_words': 15, 'max_fragments': 2, 'fragment_delimiter': ' … '}
+_SPACES_RE = re.compile(r'\s+')
+
+
+def supported() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def _vector(tag_names: str, category_name: str):
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('excerpt', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(Value(tag_names), weight='B', config=SEARCH_CONFIG)
+        + SearchVector('content', weight='C', config=SEARCH_CONFIG)
+        + SearchVector(Value(category_name), weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(post_ids: Iterable[int]) -> int:
+    """Rebuild ``search_vector`` of the given posts; one UPDATE per post, without save()"""
+    from .models import BlogPost
+
+    if not supported():
+        return 0
+    posts = BlogPost.objects.filter(pk__in=list(post_ids)).select_related('category').prefetch_related('tags')
+    updated = 0
+    for post in posts:
+        tag_names = ' '.join(tag.name for tag in post.tags.all())
+        category_name = post.category.name if post.category_id else ''
+        updated += BlogPost.objects.filter(pk=post.pk).update(search_vector=_vector(tag_names, category_name))
+    return updated
+
+
+def search(posts, query: str):
+    """``posts`` matching ``query``, best match first"""
+    if not supported():
+        return posts.filter(
+            Q(title__icontains=query) |
+            Q(excerpt__icontains=query) |
+            Q(content__icontains=query) |
+            Q(tags__name__icontains=query)
+        ).distinct()
+
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    return posts.filter(search_vector=search_query).annotate(
+        rank=SearchRank(F('search_vector'), search_query),
+    ).order_by('-rank', '-published_at')
+
+
+def _text(html: str) -> str:
+    return escape(unescape(strip_tags(html)))
+
+
+def _safe_headline(headline: str):
+    """Plain text of a ts_headline result with only our ``<mark>`` tags kept"""
+    parts = []
+    for i, chunk in enumerate(headline.split(HEADLINE_START)):
+        marked, _, rest = chunk.partition(HEADLINE_STOP) if i else ('', '', chunk)
+        if marked:
+            parts.append(f'<mark>{_text(marked)}</mark>')
+        parts.append(_text(rest))
+    # Dropped inline tags (<b>, <a>) leave runs of spaces around the words they wrapped
+    return mark_safe(_SPACES_RE.sub(' ', ''.join(parts)).strip())
+
+
+def add_headlines(posts, query: str):
+    """Set ``search_headline`` on the (already paginated) ``posts``"""
+    from .models import BlogPost
+
+    posts = list(posts)
+    if not posts or not supported():
+        return posts
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    headlines = dict(
+        BlogPost.objects.filter(pk__in=[post.pk for post in posts]).annotate(
+            headline=SearchHeadline(
+                'content', search_query, config=SEARCH_CONFIG,
+                start_sel=HEADLINE_START, stop_sel=HEADLINE_STOP, **HEADLINE_OPTIONS,
+            ),
+        ).values_list('pk', 'headline')
+    )
+    for post in posts:
+        headline = headlines.get(post.pk)
+        # No match in the content (only in the title, a tag or the category): keep the excerpt
+        post.search_headline = _safe_headline(headline) if headline and HEADLINE_START in headline else None
+    return posts
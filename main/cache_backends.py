@@ -0,0 +1,336 @@
+# main/cache_backends.py
+"""
+Two-level cache backend.
+
+``TieredCache`` keeps a small per-process LRU (L1) in front of another
+configured cache (L2, the shared one: database, file or Redis). Reads are
+served from memory when possible, so hot keys - cached property pages,
+sitemap items, reference data - no longer cost a SQL query each. Writes and
+deletes go to both levels.
+
+Other workers can't invalidate this process' L1, so entries live there for
+at most ``L1_TIMEOUT`` seconds: that is the staleness bound across workers.
+
+Values are serialised once per write by ``CacheSerializer``: highest-protocol
+pickle, compressed with zlib (or lz4 when installed and ``COMPRESSOR`` asks
+for it) once the pickle reaches ``COMPRESS_MIN_BYTES``. The same bytes go to
+L2 - property payloads and sitemap lists shrink several times in
+``sitemap_cache_table`` - and into L1, where their length is what the
+``MAX_BYTES`` budget counts. Every hit unpickles a fresh copy, like
+LocMemCache, so callers mutating a returned object (property_detail does)
+can't corrupt the cached one. Plain ints are stored as they are so L2 can
+``incr()`` them.
+
+Hits, stored/raw bytes and (de)serialisation time are counted per key prefix
+(``sitemap_property_items_v2``, ``property_payload_v1`` ...) and folded into a
+shared counter in L2 every ``STATS_INTERVAL`` seconds; ``manage.py
+cache_stats`` reports them.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'main.cache_backends.TieredCache',
+            'OPTIONS': {'L2': 'shared', 'MAX_ENTRIES': 2000, 'MAX_BYTES': 64 * 1024 * 1024, 'L1_TIMEOUT': 30,
+                        'COMPRESS_MIN_BYTES': 1024, 'COMPRESSOR': 'zlib'},
+        },
+        'shared': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'sitemap_cache_table'},
+    }
+"""
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+try:
+    import lz4.frame
+except ImportError:  # optional, zlib is always available
+    lz4 = None
+
+STATS_CACHE_KEY = 'tiered_cache_stats_v1'
+HIT_FIELDS = ('l1_hits', 'l2_hits', 'misses')
+STATS_FIELDS = HIT_FIELDS + ('writes', 'raw_bytes', 'stored_bytes', 'dumps_seconds', 'loads', 'loads_seconds')
+
+_MISSING = object()
+
+
+def key_prefix(key: str) -> str:
+    """Group a key for statistics: the part before ``:``, at most four dotted parts"""
+    head = key.split(':', 1)[0]
+    return '.'.join(head.split('.')[:4])
+
+
+def _new_stats():
+    return defaultdict(lambda: dict.fromkeys(STATS_FIELDS, 0))
+
+
+class CacheSerializer:
+    """
+    ``dumps()`` -> ``MAGIC`` + one format byte + body. Anything without the
+    magic (ints, entries written before this layer existed) is returned by
+    ``loads()`` unchanged.
+    """
+    MAGIC = b'\x00kc'
+    PICKLE = b'p'
+    ZLIB = b'z'
+    LZ4 = b'4'
+
+    def __init__(self, min_compress_bytes: int = 1024, compressor: str = 'zlib', level: int = 1):
+        self.min_compress_bytes = min_compress_bytes
+        self.level = level
+        if compressor == 'lz4' and lz4 is not None:
+            self.compress_format, self._compress = self.LZ4, lz4.frame.compress
+        else:
+            self.compress_format, self._compress = self.ZLIB, lambda data: zlib.compress(data, self.level)
+
+    @classmethod
+    def is_serialized(cls, stored) -> bool:
+        return isinstance(stored, bytes) and stored[:3] == cls.MAGIC
+
+    def dumps(self, value):
+        """``(stored, raw_size)``; raises like ``pickle.dumps`` for unpicklable values"""
+        if type(value) is int:
+            return value, 8
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) >= self.min_compress_bytes:
+            compressed = self._compress(data)
+            # Already-compressed content (images, gzip) doesn't shrink
+            if len(compressed) < len(data):
+                return self.MAGIC + self.compress_format + compressed, len(data)
+        return self.MAGIC + self.PICKLE + data, len(data)
+
+    def loads(self, stored):
+        if not self.is_serialized(stored):
+            return stored
+        body = memoryview(stored)[4:]
+        fmt = stored[3:4]
+        if fmt == self.ZLIB:
+            body = zlib.decompress(body)
+        elif fmt == self.LZ4:
+            if lz4 is None:
+                raise ValueError('Cache entry is lz4-compressed but lz4 is not installed')
+            body = lz4.frame.decompress(body)
+        return pickle.loads(body)
+
+
+def stored_size(stored) -> int:
+    return len(stored) if isinstance(stored, bytes) else 8
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', 'shared')
+        self._max_entries = int(options.get('MAX_ENTRIES', 2000))
+        self._max_bytes = int(options.get('MAX_BYTES', 64 * 1024 * 1024))
+        self._l1_timeout = float(options.get('L1_TIMEOUT', 30))
+        self._stats_interval = float(options.get('STATS_INTERVAL', 60))
+        self.serializer = CacheSerializer(
+            int(options.get('COMPRESS_MIN_BYTES', 1024)),
+            options.get('COMPRESSOR', 'zlib'),
+            int(options.get('COMPRESS_LEVEL', 1)),
+        )
+        # A single entry may use at most this share of the byte budget
+        self._max_entry_bytes = self._max_bytes // 8
+
+        self._entries = OrderedDict()  # key -> (expires_at, stored)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = _new_stats()
+        self._stats_flushed_at = time.monotonic()
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    # L1 ---------------------------------------------------------------
+
+    def _l1_get(self, internal_key):
+        """Stored (serialised) form, or ``_MISSING``"""
+        with self._lock:
+            entry = self._entries.get(internal_key)
+            if entry is None:
+                return _MISSING
+            expires_at, stored = entry
+            if expires_at <= time.monotonic():
+                self._l1_discard(internal_key)
+                return _MISSING
+            self._entries.move_to_end(internal_key)
+        return stored
+
+    def _l1_set(self, internal_key, stored, timeout=DEFAULT_TIMEOUT):
+        ttl = self._l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            if timeout <= 0:
+                self._l1_delete(internal_key)
+                return
+            ttl = min(ttl, timeout)
+        size = stored_size(stored)
+
+        with self._lock:
+            self._l1_discard(internal_key)
+            if size > self._max_entry_bytes:
+                return
+            self._entries[internal_key] = (time.monotonic() + ttl, stored)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+                _key, (_expires_at, evicted) = self._entries.popitem(last=False)
+                self._bytes -= stored_size(evicted)
+
+    def _l1_discard(self, internal_key):
+        """Drop an entry; caller holds the lock"""
+        entry = self._entries.pop(internal_key, None)
+        if entry is not None:
+            self._bytes -= stored_size(entry[1])
+
+    def _l1_delete(self, internal_key):
+        with self._lock:
+            self._l1_discard(internal_key)
+
+    # Statistics -------------------------------------------------------
+
+    def _count(self, key, field, amount=1):
+        self._stats[key_prefix(key)][field] += amount
+        if time.monotonic() - self._stats_flushed_at >= self._stats_interval:
+            self.flush_stats()
+
+    # Serialisation ----------------------------------------------------
+
+    def _encode(self, key, value):
+        start = time.perf_counter()
+        stored, raw_size = self.serializer.dumps(value)
+        counts = self._stats[key_prefix(key)]
+        counts['dumps_seconds'] += time.perf_counter() - start
+        counts['raw_bytes'] += raw_size
+        counts['stored_bytes'] += stored_size(stored)
+        self._count(key, 'writes')
+        return stored
+
+    def _decode(self, key, stored):
+        if not self.serializer.is_serialized(stored):
+            return stored
+        start = time.perf_counter()
+        value = self.serializer.loads(stored)
+        self._stats[key_prefix(key)]['loads_seconds'] += time.perf_counter() - start
+        self._count(key, 'loads')
+        return value
+
+    def flush_stats(self):
+        """Add this process' counters to the shared totals in L2"""
+        with self._lock:
+            local, self._stats = self._stats, _new_stats()
+            self._stats_flushed_at = time.monotonic()
+        if not local:
+            return
+        # Read-modify-write: concurrent flushes may drop a few counts, fine for ratios
+        totals = self.l2.get(STATS_CACHE_KEY) or {}
+        for prefix, counts in local.items():
+            merged = totals.setdefault(prefix, dict.fromkeys(STATS_FIELDS, 0))
+            for field, value in counts.items():
+                merged[field] = merged.get(field, 0) + value
+        self.l2.set(STATS_CACHE_KEY, totals, None)
+
+    def local_stats(self):
+        with self._lock:
+            return {prefix: dict(counts) for prefix, counts in self._stats.items()}
+
+    # Cache API --------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        internal_key = self.make_and_validate_key(key, version=version)
+        stored = self._l1_get(internal_key)
+        if stored is not _MISSING:
+            self._count(key, 'l1_hits')
+            return self._decode(key, stored)
+
+        stored = self.l2.get(key, _MISSING, version=version)
+        if stored is _MISSING:
+            self._count(key, 'misses')
+            return default
+        self._count(key, 'l2_hits')
+        self._l1_set(internal_key, stored)
+        return self._decode(key, stored)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        pending = []
+        for key in keys:
+            stored = self._l1_get(self.make_and_validate_key(key, version=version))
+            if stored is _MISSING:
+                pending.append(key)
+            else:
+                found[key] = self._decode(key, stored)
+                self._count(key, 'l1_hits')
+        if pending:
+            fetched = self.l2.get_many(pending, version=version)
+            for key in pending:
+                if key in fetched:
+                    self._l1_set(self.make_key(key, version=version), fetched[key])
+                    found[key] = self._decode(key, fetched[key])
+                    self._count(key, 'l2_hits')
+                else:
+                    self._count(key, 'misses')
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        internal_key = self.make_and_validate_key(key, version=version)
+        stored = self._encode(key, value)
+        self.l2.set(key, stored, timeout, version=version)
+        self._l1_set(internal_key, stored, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        encoded = {key: self._encode(key, value) for key, value in data.items()}
+        failed = self.l2.set_many(encoded, timeout, version=version)
+        for key, stored in encoded.items():
+            if key not in failed:
+                self._l1_set(self.make_and_validate_key(key, version=version), stored, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        internal_key = self.make_and_validate_key(key, version=version)
+        stored = self._encode(key, value)
+        added = self.l2.add(key, stored, timeout, version=version)
+        if added:
+            self._l1_set(internal_key, stored, timeout)
+        else:
+            self._l1_delete(internal_key)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        # Counters must be exact across workers, so they live in L2 only
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.decr(key, delta, version=version)
+
+    def delete(self, key, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._l1_delete(self.make_and_validate_key(key, version=version))
+        self.l2.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        if self._l1_get(self.make_and_validate_key(key, version=version)) is not _MISSING:
+            return True
+        return self.l2.has_key(key, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
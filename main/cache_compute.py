@@ -0,0 +1,125 @@
+# main/cache_compute.py
+"""
+Stampede-safe read-through caching.
+
+``get_or_compute(key, compute, timeout)`` replaces the get / compute / set
+pattern. Three things keep a hot key from being recomputed by every request
+that notices it expired:
+
+* XFetch early refresh: each read may decide to recompute a little before
+  the entry expires, with a probability that grows as expiry approaches and
+  with how long the value took to compute (``beta`` scales it). One request
+  usually refreshes the value while everyone else still gets a hit.
+* A recompute lock (``cache.add``): one request recomputes; the others are
+  served the previous value, which is kept ``stale_timeout`` seconds past
+  its logical expiry for exactly this. With nothing stale to serve they
+  briefly wait for the winner's result instead of all calling upstream.
+* Jittered TTLs, so entries written together don't all expire together.
+
+``compute`` returning ``None`` means "failed, don't cache": the stale value
+is served if there is one. ``prime()`` writes a value in the same envelope
+for callers that already have it (snapshot import, warmers).
+
+Inside ``with refresh_ahead(seconds):`` entries expiring within ``seconds``
+are recomputed as if expired; the cache warmer replays pages that way so
+the entries it touches outlive its next run.
+"""
+import logging
+import math
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional, Union
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+LOCK_SUFFIX = ':recompute-lock'
+DEFAULT_JITTER = 0.1
+DEFAULT_LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 5.0
+WAIT_INTERVAL = 0.05
+
+_refresh_within = ContextVar('refresh_within', default=0.0)
+
+
+def jittered(timeout: float, jitter: float = DEFAULT_JITTER) -> float:
+    return timeout * random.uniform(1 - jitter, 1 + jitter)
+
+
+def _envelope(value, delta: float, timeout: float) -> dict:
+    return {'value': value, 'delta': delta, 'expires': time.time() + timeout}
+
+
+def prime(key: str, value, timeout: float, stale_timeout: Optional[float] = None, jitter: float = DEFAULT_JITTER):
+    """Store ``value`` as if ``get_or_compute`` had just computed it"""
+    timeout = jittered(timeout, jitter)
+    stale = timeout if stale_timeout is None else stale_timeout
+    cache.set(key, _envelope(value, 0.0, timeout), int(timeout + stale))
+
+
+@contextmanager
+def refresh_ahead(seconds: float):
+    """Treat entries that expire within ``seconds`` as expired (in this thread / context)"""
+    token = _refresh_within.set(seconds)
+    try:
+        yield
+    finally:
+        _refresh_within.reset(token)
+
+
+def _should_refresh(entry: dict, beta: float) -> bool:
+    """XFetch: refresh once now - delta * beta * ln(rand) passes the expiry"""
+    now = time.time() + _refresh_within.get()
+    return now - entry['delta'] * beta * math.log(random.random() or 1e-12) >= entry['expires']
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable,
+    timeout: Union[float, Callable],
+    beta: float = 1.0,
+    stale_timeout: Optional[float] = None,
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+    jitter: float = DEFAULT_JITTER,
+):
+    """
+    Cached value of ``compute()`` under ``key``. ``timeout`` may be a callable
+    taking the computed value (e.g. shorter for a fallback result). Entries
+    stay readable as stale for ``stale_timeout`` seconds (default: one more
+    ``timeout``) after they expire.
+    """
+    entry = cache.get(key)
+    if entry is not None and not _should_refresh(entry, beta):
+        return entry['value']
+
+    lock_key = f'{key}{LOCK_SUFFIX}'
+    locked = cache.add(lock_key, 1, lock_timeout)
+    if not locked:
+        if entry is not None:
+            return entry['value']
+        # Cold key: wait for the request that holds the lock rather than pile on
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            entry = cache.get(key)
+            if entry is not None:
+                return entry['value']
+        logger.warning(f"[CACHE] Gave up waiting for {key}, computing without the lock")
+
+    try:
+        start = time.perf_counter()
+        value = compute()
+        delta = time.perf_counter() - start
+        if value is None:
+            return entry['value'] if entry is not None else None
+
+        ttl = jittered(timeout(value) if callable(timeout) else timeout, jitter)
+        stale = ttl if stale_timeout is None else stale_timeout
+        cache.set(key, _envelope(value, delta, ttl), int(ttl + stale))
+        return value
+    finally:
+        if locked:
+            cache.delete(lock_key)
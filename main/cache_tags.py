@@ -0,0 +1,80 @@
+# main/cache_tags.py
+"""
+Tag-based cache invalidation.
+
+A tagged entry records, next to its value, the current token of every tag
+it depends on (``blogpost:42``, ``category:3``, ``exclusive:<uuid>``, or a
+collection tag such as ``blogposts``). ``invalidate_tags()`` deletes the
+tag tokens, so every entry that recorded the old token reads as a miss from
+then on - without knowing or scanning those entries. The model signal
+handlers in ``main.signals`` do that on save/delete, which is what lets
+these entries live for hours.
+
+Tag tokens go through the default cache like everything else, so another
+worker may keep serving an invalidated entry for up to the tiered cache's
+``L1_TIMEOUT``.
+"""
+import uuid
+from typing import Callable, Iterable
+
+from django.core.cache import cache
+
+TAG_CACHE_PREFIX = 'cache_tag_v1'
+TAGGED_CACHE_TIMEOUT = 60 * 60 * 6
+
+_MISSING = object()
+
+
+def _tag_key(tag: str) -> str:
+    return f'{TAG_CACHE_PREFIX}:{tag}'
+
+
+def _current_tokens(tags: Iterable[str]) -> dict:
+    """Token per tag key, creating tokens for tags seen for the first time"""
+    keys = [_tag_key(tag) for tag in tags]
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            # add() so concurrent first writers agree on one token
+            cache.add(key, uuid.uuid4().hex[:12], None)
+            tokens[key] = cache.get(key)
+    return tokens
+
+
+def set_tagged(key: str, value, tags: Iterable[str], timeout: int = TAGGED_CACHE_TIMEOUT, tokens=None):
+    cache.set(key, {'value': value, 'tags': tokens if tokens is not None else _current_tokens(tags)}, timeout)
+
+
+def get_tagged(key: str, default=None):
+    """Value stored by ``set_tagged()``, or ``default`` if any of its tags was invalidated"""
+    entry = cache.get(key)
+    if not entry:
+        return default
+    recorded = entry['tags']
+    if recorded and cache.get_many(list(recorded)) != recorded:
+        return default
+    return entry['value']
+
+
+def cached_tagged(key: str, tags: Iterable[str], compute: Callable, timeout: int = TAGGED_CACHE_TIMEOUT):
+    """``get_tagged()`` or compute, store with ``tags`` and return"""
+    value = get_tagged(key, _MISSING)
+    if value is _MISSING:
+        # Tokens are read before computing: an invalidation that lands
+        # meanwhile leaves this entry already outdated, not stale for hours
+        tokens = _current_tokens(tags)
+        value = compute()
+        set_tagged(key, value, tags, timeout, tokens=tokens)
+    return value
+
+
+def tags_version(tags: Iterable[str]) -> str:
+    """Current tokens of ``tags`` as one string; changes whenever any of them is invalidated"""
+    tags = list(tags)
+    tokens = _current_tokens(tags)
+    return ','.join(str(tokens[_tag_key(tag)]) for tag in tags)
+
+
+def invalidate_tags(*tags: str):
+    """Make every entry recorded under any of ``tags`` a miss"""
+    cache.delete_many([_tag_key(tag) for tag in tags if tag])
@@ -0,0 +1,77 @@
+# main/conditional.py
+"""
+Conditional GET for pages and JSON endpoints.
+
+Model-backed pages derive an ETag before rendering from data they already
+have: the object's ``updated_at`` plus the current tokens of the cache tags
+the page depends on (main.cache_tags - the same version counters that
+invalidate their cached parts). ``not_modified()`` answers a matching
+``If-None-Match`` with a 304, so nothing is queried or rendered beyond what
+computing the validator took. Views are counted by the pages' beacons
+(blog_view_beacon, exclusive_view_beacon, property_view_beacon), not by the
+views, so 304s and edge-cache hits are counted as well; the count a page
+shows is part of its validator. No ``Last-Modified`` is sent for these
+pages: comments or related listings change without ``updated_at``.
+
+JSON endpoints backed by the upstream API use a hash of the serialised
+payload instead (``conditional_json()``): the payload is still produced (it
+usually comes from cache) but an unchanged body isn't sent again.
+
+Pages involving flash messages or a ``?notice=`` (main.notices) get neither
+a 304 (pending messages would be consumed without being shown) nor an ETag
+(a revalidated copy would show them again).
+"""
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.utils.http import quote_etag
+
+from .cache_tags import tags_version
+from .notices import NOTICE_PARAM
+
+
+def make_etag(*parts) -> str:
+    """Quoted ETag from any values with a stable ``str()``"""
+    return quote_etag(hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()[:20])
+
+
+def tags_etag(tags, *parts) -> str:
+    """ETag of the current versions of ``tags`` plus ``parts`` (e.g. ``updated_at``)"""
+    return make_etag(tags_version(tags), *parts)
+
+
+def _has_pending_messages(request) -> bool:
+    if NOTICE_PARAM in request.GET:
+        return True
+    # len() doesn't mark the messages as used
+    return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def not_modified(request, etag):
+    """A 304 response when the client's copy is current, else ``None``"""
+    if request.method not in ('GET', 'HEAD') or _has_pending_messages(request):
+        return None
+    response = get_conditional_response(request, etag=etag)
+    if response is not None and response.status_code == 304:
+        return response
+    return None
+
+
+def with_etag(request, response, etag):
+    """Add ``etag`` to a successful GET response that didn't display flash messages"""
+    messages_shown = NOTICE_PARAM in request.GET or (
+        getattr(request, '_messages', None) is not None and request._messages.used
+    )
+    if (request.method in ('GET', 'HEAD') and response.status_code == 200
+            and not messages_shown and not response.has_header('ETag')):
+        response['ETag'] = etag
+    return response
+
+
+def conditional_json(request, response):
+    """ETag a 200 JSON response by its body hash; 304 when the client has that body"""
+    if response.status_code != 200 or request.method not in ('GET', 'HEAD'):
+        return response
+    set_response_etag(response)
+    return get_conditional_response(request, etag=response['ETag'], response=response)
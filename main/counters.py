@@ -0,0 +1,116 @@
+# main/counters.py
+"""
+Write-behind counters for model fields (blog views, exclusive property
+views and inquiries).
+
+``post.increment_views()`` used to ``save(update_fields=['views'])``, which
+ran ``BlogPost.save`` - and with it the featured-image resize, opening the
+file with PIL - on every page view, and exclusive_property_detail did a
+read-modify-write of ``view_count`` that lost concurrent views. Each view
+also took a row lock on the hottest rows.
+
+``increment(Model, pk, field)`` only adds to an in-memory counter. A daemon
+thread per worker flushes every ``COUNTERS_FLUSH_INTERVAL`` seconds with one
+``UPDATE ... SET field = field + n WHERE pk IN (...)`` per model, field and
+amount: atomic, no ``save()``, no signals, no image processing. Pending
+increments are written at exit as well; a worker that is killed loses at
+most one interval of counts.
+
+``BackgroundFlusher`` is the flusher thread, shared with main.property_views.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Callable
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING = 10000
+
+
+class BackgroundFlusher:
+    """Calls ``flush`` every ``interval_setting`` seconds from a daemon thread started on first use"""
+    def __init__(self, name: str, flush: Callable, interval_setting: str, default_interval: int = 60):
+        self.name = name
+        self.flush = flush
+        self.interval_setting = interval_setting
+        self.default_interval = default_interval
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self._flush_at_exit)
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stop = threading.Event()
+        while not stop.wait(getattr(settings, self.interval_setting, self.default_interval)):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"[COUNTERS] {self.name} flush failed: {e}")
+            finally:
+                connections.close_all()
+
+    def _flush_at_exit(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"[COUNTERS] Final {self.name} flush failed: {e}")
+
+
+_pending = Counter()  # (model, pk, field) -> amount
+_lock = threading.Lock()
+
+
+def increment(model, pk, field: str, amount: int = 1):
+    """Add ``amount`` to ``model.field`` of row ``pk`` at the next flush"""
+    key = (model, pk, field)
+    with _lock:
+        if len(_pending) < MAX_PENDING or key in _pending:
+            _pending[key] += amount
+    _flusher.ensure_started()
+
+
+def pending(model, pk, field: str) -> int:
+    """Increments of this worker not yet written"""
+    with _lock:
+        return _pending.get((model, pk, field), 0)
+
+
+def flush() -> int:
+    """Write all pending increments; returns the number of UPDATE statements"""
+    with _lock:
+        if not _pending:
+            return 0
+        batch = dict(_pending)
+        _pending.clear()
+
+    groups = defaultdict(list)  # (model, field, amount) -> pks
+    for (model, pk, field), amount in batch.items():
+        groups[(model, field, amount)].append(pk)
+
+    statements = 0
+    for (model, field, amount), pks in groups.items():
+        try:
+            model._default_manager.filter(pk__in=pks).update(**{field: F(field) + amount})
+            statements += 1
+        except DatabaseError as e:
+            logger.warning(f"[COUNTERS] {model.__name__}.{field} +{amount} for {len(pks)} rows failed, retrying later: {e}")
+            with _lock:
+                for pk in pks:
+                    _pending[(model, pk, field)] += amount
+    return statements
+
+
+_flusher = BackgroundFlusher('counters-flush', flush, 'COUNTERS_FLUSH_INTERVAL')
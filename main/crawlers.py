@@ -0,0 +1,234 @@
+# main/crawlers.py
+"""
+Separate serving tier for verified search-engine crawlers.
+
+Bots walk the whole catalogue, so on property pages they mostly hit cold
+URLs: each visit costs an upstream call and pushes a page real visitors use
+out of the 15 minute visitor caches. ``crawler_snapshot`` routes
+verified crawlers around that cache to a long-lived snapshot of the rendered
+page instead, and limits how many snapshot misses (= upstream calls) each
+crawler may cause per minute. Humans never touch either.
+
+A request counts as a crawler only when the user agent matches an entry in
+``CRAWLERS`` *and* the client IP is inside one of that crawler's published
+networks. No DNS is needed for that; with ``CRAWLER_VERIFY_DNS`` an IP
+outside the networks may still be accepted by forward-confirmed reverse DNS
+against the entry's hostname suffixes (result cached per IP). A request
+that only claims to be Googlebot is treated like any other visitor.
+
+``countable_beacon`` filters the view beacons: no bots (verified or not),
+no cache-warmer replays and at most ``BEACON_RATE_LIMIT`` counted views per
+client IP and page per ``BEACON_RATE_WINDOW`` seconds and worker, so a
+script posting in a loop can't inflate the counts. That window is kept in
+memory (at most ``BEACON_MAX_TRACKED`` entries, oldest dropped first): a
+beacon writes nothing to the shared cache.
+"""
+import ipaddress
+import logging
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .hot_urls import is_warmer
+from .utils import canonical_path
+
+logger = logging.getLogger(__name__)
+
+# Published crawler networks and reverse-DNS domains; extend or replace with settings.CRAWLERS
+DEFAULT_CRAWLERS = {
+    'googlebot': {
+        'user_agent': r'Googlebot|Google-InspectionTool|AdsBot-Google|Storebot-Google',
+        'networks': ['66.249.64.0/19', '2001:4860:4801::/48'],
+        'hostnames': ['.googlebot.com', '.google.com', '.googleusercontent.com'],
+    },
+    'bingbot': {
+        'user_agent': r'bingbot|BingPreview|msnbot',
+        'networks': ['157.55.39.0/24', '207.46.13.0/24', '40.77.167.0/24', '13.66.139.0/24', '52.167.144.0/24'],
+        'hostnames': ['.search.msn.com'],
+    },
+    'applebot': {
+        'user_agent': r'Applebot',
+        'networks': ['17.0.0.0/8'],
+        'hostnames': ['.applebot.apple.com'],
+    },
+    'yandexbot': {
+        'user_agent': r'YandexBot|YandexImages',
+        'networks': [],
+        'hostnames': ['.yandex.ru', '.yandex.net', '.yandex.com'],
+    },
+}
+
+SNAPSHOT_CACHE_PREFIX = 'crawler_snapshot_v2'
+# Query parameters that change a snapshotted page; any others share the plain path's snapshot
+SNAPSHOT_PARAMS = tuple(getattr(settings, 'CRAWLER_SNAPSHOT_PARAMS', ()))
+SNAPSHOT_TIMEOUT = getattr(settings, 'CRAWLER_SNAPSHOT_TIMEOUT', 60 * 60 * 24 * 7)
+RATE_LIMIT = getattr(settings, 'CRAWLER_RATE_LIMIT', 120)  # snapshot misses per crawler per minute
+RATE_CACHE_PREFIX = 'crawler_rate_v1'
+RETRY_AFTER = 60
+BEACON_RATE_LIMIT = getattr(settings, 'BEACON_RATE_LIMIT', 2)
+BEACON_RATE_WINDOW = getattr(settings, 'BEACON_RATE_WINDOW', 60 * 30)
+BEACON_MAX_TRACKED = 50000
+# Clients that identify as automated, besides the CRAWLERS entries
+BOT_USER_AGENT = re.compile(
+    r'bot\b|crawl|spider|slurp|preview|facebookexternalhit|headless|python-requests|curl/|wget/',
+    re.IGNORECASE,
+)
+
+
+def _compile(crawlers):
+    compiled = []
+    for name, entry in crawlers.items():
+        compiled.append((
+            name,
+            re.compile(entry['user_agent'], re.IGNORECASE),
+            [ipaddress.ip_network(network) for network in entry.get('networks', ())],
+            tuple(entry.get('hostnames', ())),
+        ))
+    return compiled
+
+
+CRAWLERS = _compile(getattr(settings, 'CRAWLERS', DEFAULT_CRAWLERS))
+VERIFY_DNS = getattr(settings, 'CRAWLER_VERIFY_DNS', False)
+TRUST_FORWARDED_FOR = getattr(settings, 'CRAWLER_TRUST_FORWARDED_FOR', False)
+
+
+def client_ip(request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+@lru_cache(maxsize=4096)
+def _dns_confirms(ip: str, hostnames: tuple) -> bool:
+    """Forward-confirmed reverse DNS: PTR name in ``hostnames`` and resolving back to ``ip``"""
+    try:
+        host = socket.gethostbyaddr(ip)[0].lower()
+        if not host.endswith(hostnames):
+            return False
+        return ip in {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except (OSError, UnicodeError):
+        return False
+
+
+def identify(user_agent: str, ip: str) -> Optional[str]:
+    """Name of the verified crawler behind ``user_agent`` / ``ip``, else ``None``"""
+    if not user_agent or not ip:
+        return None
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+
+    for name, pattern, networks, hostnames in CRAWLERS:
+        if not pattern.search(user_agent):
+            continue
+        if any(address in network for network in networks):
+            return name
+        if VERIFY_DNS and hostnames and _dns_confirms(ip, hostnames):
+            return name
+        logger.info(f"[CRAWLER] Unverified {name} user agent from {ip}")
+        return None
+    return None
+
+
+def verified_crawler(request) -> Optional[str]:
+    if not hasattr(request, '_verified_crawler'):
+        request._verified_crawler = identify(request.META.get('HTTP_USER_AGENT', ''), client_ip(request))
+    return request._verified_crawler
+
+
+def within_rate(name: str, limit: int, window: int = 60) -> bool:
+    """Fixed window of ``window`` seconds per ``name``, shared by all workers"""
+    key = f'{RATE_CACHE_PREFIX}:{name}:{int(time.time() // window)}'
+    cache.add(key, 0, window * 2)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        count = 1
+    return count <= limit
+
+
+def _within_rate(crawler: str) -> bool:
+    return within_rate(crawler, RATE_LIMIT)
+
+
+_beacon_counts = OrderedDict()  # (kind, pk, ip) -> (window, count)
+_beacon_lock = threading.Lock()
+
+
+def _beacon_within_rate(name: tuple) -> bool:
+    window = int(time.time() // BEACON_RATE_WINDOW)
+    with _beacon_lock:
+        seen_window, count = _beacon_counts.pop(name, (window, 0))
+        count = count + 1 if seen_window == window else 1
+        _beacon_counts[name] = (window, count)
+        while len(_beacon_counts) > BEACON_MAX_TRACKED:
+            _beacon_counts.popitem(last=False)
+    return count <= BEACON_RATE_LIMIT
+
+
+def looks_like_bot(request) -> bool:
+    """User agent of a known crawler (verified or not) or of an automated client"""
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if not user_agent or BOT_USER_AGENT.search(user_agent):
+        return True
+    return any(pattern.search(user_agent) for _, pattern, _, _ in CRAWLERS)
+
+
+def countable_beacon(request, kind: str, pk) -> bool:
+    """Whether a view beacon for ``kind`` ``pk`` should be counted"""
+    if is_warmer(request) or looks_like_bot(request):
+        return False
+    return _beacon_within_rate((kind, int(pk), client_ip(request)))
+
+
+def crawler_snapshot(view):
+    """
+    Serve verified crawlers from the snapshot tier. Apply it outside the
+    page-cache decorator so crawlers bypass (and don't churn) the visitor
+    cache. Responses marked private / no-store are not kept. Snapshots are
+    keyed by path plus ``SNAPSHOT_PARAMS``, so query variants share one.
+    """
+    render_view = getattr(view, '__wrapped__', view)
+
+    @wraps(view)
+    def _wrapped(request, *args, **kwargs):
+        crawler = verified_crawler(request) if request.method in ('GET', 'HEAD') else None
+        if not crawler:
+            return view(request, *args, **kwargs)
+
+        key = f'{SNAPSHOT_CACHE_PREFIX}:{canonical_path(request, SNAPSHOT_PARAMS)}'
+        snapshot = cache.get(key)
+        if snapshot is not None:
+            response = HttpResponse(snapshot['content'], content_type=snapshot['content_type'])
+            response['X-Snapshot'] = 'hit'
+            return response
+
+        if not _within_rate(crawler):
+            logger.warning(f"[CRAWLER] {crawler} over {RATE_LIMIT}/min, deferring {request.path}")
+            response = HttpResponse('Crawl rate exceeded, retry later.', status=503, content_type='text/plain')
+            response['Retry-After'] = str(RETRY_AFTER)
+            return response
+
+        response = render_view(request, *args, **kwargs)
+        cache_control = response.get('Cache-Control', '')
+        if (response.status_code == 200 and not response.streaming
+                and 'private' not in cache_control and 'no-store' not in cache_control):
+            cache.set(key, {
+                'content': response.content,
+                'content_type': response.get('Content-Type', 'text/html; charset=utf-8'),
+            }, SNAPSHOT_TIMEOUT)
+            response['X-Snapshot'] = 'miss'
+        return response
+
+    return _wrapped
@@ -0,0 +1,76 @@
+# main/descriptions.py
+"""
+Cleaning of upstream property descriptions.
+
+``description.en`` arrives as editor HTML full of inline styles and pasted
+CSS fragments. property_detail turns it into a few plain ``<p>`` paragraphs of
+three sentences each. The work is pure regex, so the patterns are compiled
+once and the result is cached by a hash of the raw HTML: identical
+descriptions are cleaned once, and an edited description gets a new key.
+
+A shared-cache hit on the DatabaseCache costs about as much as the cleaning
+itself, so a small per-process LRU sits in front of it.
+"""
+import hashlib
+import re
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.utils.html import strip_tags
+
+DESCRIPTION_CACHE_PREFIX = 'property_description_v1'
+DESCRIPTION_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # content-addressed, so only evicted for space
+LOCAL_CACHE_SIZE = 512
+EMPTY_DESCRIPTION = '<p>No description available.</p>'
+SENTENCES_PER_PARAGRAPH = 3
+
+# Applied to the raw HTML
+STYLE_ATTR_RE = re.compile(r'style\s*=\s*["\'][^"\']*["\']?', re.IGNORECASE | re.DOTALL)
+CSS_IN_TAG_RE = re.compile(r'(color-scheme|forced-color-adjust|font-family|position-anchor)[^>]*', re.IGNORECASE)
+
+# Applied to the text left after strip_tags
+BROKEN_P_TAG_RE = re.compile(r'<\s*p[^a-zA-Z0-9>]*')
+WHITESPACE_RE = re.compile(r'\s+')
+UNSET_RE = re.compile(r'unset[;:\s]+')
+CSS_DECLARATION_RE = re.compile(r'(color-scheme|forced-color-adjust|mask|math-depth|position|appearance)[:\s]+[^;]*;?')
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+def clean_description(raw_html: str) -> str:
+    """Turn upstream description HTML into ``<p>`` paragraphs of plain text"""
+    raw_html = STYLE_ATTR_RE.sub('', raw_html)
+    raw_html = CSS_IN_TAG_RE.sub('', raw_html)
+
+    clean_text = strip_tags(raw_html)
+    clean_text = BROKEN_P_TAG_RE.sub('', clean_text)
+    clean_text = WHITESPACE_RE.sub(' ', clean_text).strip()
+    clean_text = UNSET_RE.sub('', clean_text)
+    clean_text = CSS_DECLARATION_RE.sub('', clean_text)
+
+    sentences = SENTENCE_SPLIT_RE.split(clean_text)
+    paragraphs = []
+    for i in range(0, len(sentences), SENTENCES_PER_PARAGRAPH):
+        para_text = ' '.join(sentences[i:i + SENTENCES_PER_PARAGRAPH]).strip()
+        if para_text:
+            paragraphs.append(f'<p>{para_text}</p>')
+
+    return '\n'.join(paragraphs) if paragraphs else EMPTY_DESCRIPTION
+
+
+def description_cache_key(raw_html: str) -> str:
+    digest = hashlib.blake2b(raw_html.encode('utf-8'), digest_size=16).hexdigest()
+    return f'{DESCRIPTION_CACHE_PREFIX}:{digest}'
+
+
+@lru_cache(maxsize=LOCAL_CACHE_SIZE)
+def cached_clean_description(raw_html: str) -> str:
+    """clean_description() memoised per process and in the shared cache by content hash"""
+    if not raw_html:
+        return EMPTY_DESCRIPTION
+
+    key = description_cache_key(raw_html)
+    cleaned = cache.get(key)
+    if cleaned is None:
+        cleaned = clean_description(raw_html)
+        cache.set(key, cleaned, DESCRIPTION_CACHE_TIMEOUT)
+    return cleaned
@@ -0,0 +1,273 @@
+# main/edge_cache.py
+"""
+Cache policy and purging for a reverse proxy / CDN in front of the site.
+
+Views name the objects a page depends on with ``tag_response(response,
+*keys)``, using the cache tag names of main.cache_tags (``property:2376``,
+``blogpost:42``, ``category:3``, ``blogposts`` ...). ``EdgeCacheMiddleware``
+turns that into headers on public GET responses:
+
+    Cache-Control: public, max-age=0, s-maxage=300, stale-while-revalidate=60, stale-if-error=86400
+    Surrogate-Key: blogpost:42 category:3
+
+Browsers revalidate every time (the ETags of main.conditional make that a
+304); the edge keeps the page ``s-maxage`` seconds and may serve it stale
+while it refetches. Responses that set cookies, are private / no-store or
+carry no keys are left alone.
+
+Purging: the middleware also records, per key, which URLs were served with
+it - the path plus the query parameters that change the page
+(``EDGE_URL_PARAMS``), so tracking parameters don't fill the list; variants
+with other parameters are reached through the surrogate key.
+``purge_keys(*keys)`` queues those URLs (and the keys, for CDNs that purge
+by surrogate key) for the configured ``EDGE_PURGE_BACKEND`` once the current
+transaction commits. A daemon thread per worker sends them, so a save never
+waits on the proxy. The model signals purge the keys they invalidate, and a
+changed upstream payload purges its ``property:<pk>``, so an edit purges
+exactly the pages that showed the object.
+
+Backends: ``NullPurgeBackend`` (default, logs), ``HttpPurgeBackend`` (a
+Varnish-style ``PURGE <path>`` per URL to ``EDGE_PURGE_URL``) and
+``RecordingPurgeBackend`` (keeps purges in memory). ``manage.py
+purge_standin`` runs a local HTTP server that accepts PURGE requests.
+"""
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from typing import Iterable, List
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+
+from .utils import canonical_path
+
+logger = logging.getLogger(__name__)
+
+URLS_CACHE_PREFIX = 'edge_urls_v1'
+URLS_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+MAX_URLS_PER_KEY = 500
+PURGE_TIMEOUT = 3
+PURGE_WORKERS = 4
+PURGE_QUEUE_SIZE = 1000
+# Query parameters that change an edge-cached page; only these are kept in the recorded URLs
+URL_PARAMS = tuple(getattr(settings, 'EDGE_URL_PARAMS', ('page', 'category', 'tag', 'q')))
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def tag_response(response, *keys):
+    """Declare the surrogate keys of ``response``; returns it for chaining"""
+    existing = getattr(response, 'surrogate_keys', [])
+    response.surrogate_keys = existing + [key for key in keys if key and key not in existing]
+    return response
+
+
+def surrogate_keys(*keys):
+    """View decorator: ``tag_response()`` every response with fixed ``keys``"""
+    def decorator(view):
+        @wraps(view)
+        def _wrapped(request, *args, **kwargs):
+            return tag_response(view(request, *args, **kwargs), *keys)
+        return _wrapped
+    return decorator
+
+
+def _urls_key(key: str) -> str:
+    return f'{URLS_CACHE_PREFIX}:{key}'
+
+
+def _remember_urls(keys: List[str], path: str):
+    """Record ``path`` under each key; only writes the first time a path is seen"""
+    known = cache.get_many([_urls_key(key) for key in keys])
+    for key in keys:
+        urls = known.get(_urls_key(key)) or []
+        if path in urls:
+            continue
+        # Read-modify-write: a concurrent first hit may be lost and is then purged by key only
+        urls = (urls + [path])[-MAX_URLS_PER_KEY:]
+        cache.set(_urls_key(key), urls, URLS_CACHE_TIMEOUT)
+
+
+def urls_for_keys(keys: Iterable[str]) -> List[str]:
+    found = cache.get_many([_urls_key(key) for key in keys])
+    urls = []
+    for paths in found.values():
+        urls.extend(path for path in paths if path not in urls)
+    return urls
+
+
+class EdgeCacheMiddleware:
+    """Cache-Control / Surrogate-Key for responses tagged with ``tag_response()``"""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        keys = getattr(response, 'surrogate_keys', None)
+        if not keys or not self._cacheable(request, response):
+            return response
+
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=0,
+            s_maxage=_setting('EDGE_CACHE_S_MAXAGE', 300),
+            stale_while_revalidate=_setting('EDGE_CACHE_STALE_WHILE_REVALIDATE', 60),
+            stale_if_error=_setting('EDGE_CACHE_STALE_IF_ERROR', 60 * 60 * 24),
+        )
+        response['Surrogate-Key'] = ' '.join(keys)
+        try:
+            _remember_urls(keys, canonical_path(request, URL_PARAMS))
+        except Exception as e:
+            logger.warning(f"[EDGE] Could not record URL for purging: {e}")
+        return response
+
+    @staticmethod
+    def _cacheable(request, response) -> bool:
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200 or response.cookies:
+            return False
+        cache_control = response.get('Cache-Control', '')
+        return not any(word in cache_control for word in ('private', 'no-store', 'no-cache'))
+
+
+# Purge backends ----------------------------------------------------------
+
+class NullPurgeBackend:
+    """No proxy configured: log what would be purged"""
+    def purge(self, urls: List[str], keys: List[str]):
+        logger.debug(f"[EDGE] Purge {len(urls)} URLs for {', '.join(keys)} (no backend configured)")
+
+
+class RecordingPurgeBackend:
+    """Keeps every purge in ``purged`` (URLs) and ``purged_keys``; for tests and local runs"""
+    purged: List[str] = []
+    purged_keys: List[str] = []
+    _lock = threading.Lock()
+
+    def purge(self, urls: List[str], keys: List[str]):
+        with self._lock:
+            self.purged.extend(urls)
+            self.purged_keys.extend(keys)
+
+
+class HttpPurgeBackend:
+    """
+    Varnish-style purge: ``PURGE <path>`` to ``EDGE_PURGE_URL`` with the site's
+    ``Host``, one request per URL. The keys are sent as ``Surrogate-Key`` on
+    each request for proxies that ban by key (xkey and similar).
+    """
+    def __init__(self):
+        self.base_url = _setting('EDGE_PURGE_URL', 'http://127.0.0.1:6081').rstrip('/')
+        self.host = _setting('EDGE_PURGE_HOST', '') or _setting('SITE_URL', 'https://kifrealty.com').split('://')[-1]
+
+    def _purge_one(self, path: str, keys: List[str]) -> bool:
+        try:
+            resp = requests.request(
+                'PURGE', f'{self.base_url}{path}',
+                headers={'Host': self.host, 'Surrogate-Key': ' '.join(keys)},
+                timeout=PURGE_TIMEOUT,
+            )
+            return resp.status_code < 400 or resp.status_code == 404
+        except requests.RequestException as e:
+            logger.warning(f"[EDGE] PURGE {path} failed: {e}")
+            return False
+
+    def purge(self, urls: List[str], keys: List[str]):
+        if not urls:
+            return
+        with ThreadPoolExecutor(max_workers=min(PURGE_WORKERS, len(urls))) as pool:
+            results = list(pool.map(lambda path: self._purge_one(path, keys), urls))
+        failed = results.count(False)
+        if failed:
+            logger.warning(f"[EDGE] {failed}/{len(urls)} purges failed for {', '.join(keys)}")
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(_setting('EDGE_PURGE_BACKEND', 'main.edge_cache.NullPurgeBackend'))()
+    return _backend
+
+
+def _purge_now(keys: List[str]):
+    try:
+        get_backend().purge(urls_for_keys(keys), keys)
+    except Exception as e:
+        logger.error(f"[EDGE] Purge of {', '.join(keys)} failed: {e}")
+
+
+class _PurgeWorker:
+    """Sends queued purges from a daemon thread started on first use; drains the queue at exit"""
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=PURGE_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.drain)
+
+    def submit(self, keys: List[str]):
+        self.ensure_started()
+        try:
+            self.queue.put_nowait(keys)
+        except queue.Full:
+            # The proxy is not keeping up; the pages expire after s-maxage anyway
+            logger.warning(f"[EDGE] Purge queue full, dropping purge of {', '.join(keys)}")
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='edge-purge', daemon=True)
+                self._thread.start()
+
+    def _take_batch(self, first: List[str]) -> List[str]:
+        # Purges queued meanwhile are merged, so a burst of saves sends each URL once
+        keys = list(first)
+        while True:
+            try:
+                more = self.queue.get_nowait()
+            except queue.Empty:
+                return keys
+            keys.extend(key for key in more if key not in keys)
+            self.queue.task_done()
+
+    def _run(self):
+        while True:
+            keys = self._take_batch(self.queue.get())
+            try:
+                _purge_now(keys)
+            finally:
+                self.queue.task_done()
+
+    def drain(self):
+        """Send whatever is still queued, in the calling thread"""
+        while True:
+            try:
+                keys = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            _purge_now(self._take_batch(keys))
+            self.queue.task_done()
+
+
+_worker = _PurgeWorker()
+
+
+def purge_keys(*keys: str):
+    """Purge every URL served with any of ``keys``; queued once the current transaction commits"""
+    keys = [key for key in keys if key]
+    if not keys:
+        return
+    transaction.on_commit(lambda: _worker.submit(keys))
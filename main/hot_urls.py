@@ -0,0 +1,177 @@
+# main/hot_urls.py
+"""
+Request popularity per normalised URL, for the cache warmer.
+
+After a deploy or a cache flush the first visitors of the popular property
+and blog pages paid for the upstream fetch and the render. ``HitCounter-
+Middleware`` samples successful anonymous GETs of the warmable views (one in
+``HOT_URLS_SAMPLE_RATE``), counts them in process and flushes the counts in
+one write every ``HOT_URLS_FLUSH_INTERVAL`` seconds into an hourly bucket in
+the shared cache:
+
+    hot_urls_v1:<hour> = {'/property/marina-heights-2376/': 41, '/blogs/': 17, ...}
+
+URLs are normalised to the path plus the query parameters that change the
+page (``page``, ``category``, ``tag``), so tracking parameters don't split
+the counts. ``top_urls(n)`` ranks the last ``HOT_URLS_WINDOW_HOURS`` buckets,
+older hours weighing less (half-life ``HALF_LIFE_HOURS``).
+
+``manage.py warm_hot_urls`` replays the top URLs through the full stack with
+bounded concurrency and the ``WARMER_HEADER`` header (``is_warmer()``: not
+counted as a hit or a view) - after a deploy, and periodically (``--loop``) so
+entries close to expiry are refreshed (``cache_compute.refresh_ahead``)
+before a visitor finds them expired.
+"""
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from typing import List, Tuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+BUCKET_PREFIX = 'hot_urls_v1'
+BUCKET_SECONDS = 60 * 60
+MAX_URLS_PER_BUCKET = 5000
+HALF_LIFE_HOURS = 6
+FLUSH_LOCK_TIMEOUT = 10
+WARMER_HEADER = 'HTTP_X_CACHE_WARMER'
+
+# url_name (with namespace) of the views worth warming
+WARMABLE_VIEWS = {
+    'index', 'properties', 'property_detail', 'unit_detail',
+    'blogs', 'blog_detail', 'blog_category', 'blog_tag',
+    'exclusive_properties:list', 'exclusive_properties:detail',
+}
+KEPT_PARAMS = ('page', 'category', 'tag')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_warmer(request) -> bool:
+    """Request replayed by ``warm_hot_urls``; not a visit, so it must not count as a hit or a view"""
+    return WARMER_HEADER in request.META
+
+
+def normalise_url(request) -> str:
+    params = [(name, request.GET[name]) for name in KEPT_PARAMS if request.GET.get(name)]
+    return f"{request.path}?{urlencode(params)}" if params else request.path
+
+
+def _bucket_key(hour: int) -> str:
+    return f'{BUCKET_PREFIX}:{hour}'
+
+
+def _current_hour() -> int:
+    return int(time.time() // BUCKET_SECONDS)
+
+
+class _Pending:
+    """Sampled hits of this process not yet written to the shared cache"""
+    def __init__(self):
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def add(self, url: str):
+        with self.lock:
+            self.counts[url] += 1
+            due = (time.monotonic() - self.last_flush >= _setting('HOT_URLS_FLUSH_INTERVAL', 60)
+                   or len(self.counts) >= _setting('HOT_URLS_FLUSH_MAX', 500))
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.last_flush = time.monotonic()
+        if not counts:
+            return
+        try:
+            if not _merge(counts):
+                self._requeue(counts)
+        except Exception as e:
+            logger.warning(f"[HOT URLS] Flush failed: {e}")
+            self._requeue(counts)
+
+    def _requeue(self, counts: Counter):
+        # Kept for the next flush; dropped rather than grown without bound
+        with self.lock:
+            if len(self.counts) < MAX_URLS_PER_BUCKET:
+                self.counts.update(counts)
+
+
+_pending = _Pending()
+
+
+def _merge(counts: Counter) -> bool:
+    """Add ``counts`` to the current bucket; ``False`` if another process holds its lock"""
+    key = _bucket_key(_current_hour())
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, FLUSH_LOCK_TIMEOUT):
+        return False
+    try:
+        bucket = Counter(cache.get(key) or {})
+        bucket.update(counts)
+        if len(bucket) > MAX_URLS_PER_BUCKET:
+            bucket = Counter(dict(bucket.most_common(MAX_URLS_PER_BUCKET)))
+        window = _setting('HOT_URLS_WINDOW_HOURS', 24)
+        cache.set(key, dict(bucket), (window + 1) * BUCKET_SECONDS)
+        return True
+    finally:
+        cache.delete(lock_key)
+
+
+def record_hit(url: str):
+    _pending.add(url)
+
+
+def flush():
+    """Write this process's pending counts now"""
+    _pending.flush()
+
+
+def top_urls(n: int = 100, hours: int = None) -> List[Tuple[str, float]]:
+    """The ``n`` most requested URLs of the last ``hours`` hours as ``(url, score)``, recent hours weighted higher"""
+    hours = hours or _setting('HOT_URLS_WINDOW_HOURS', 24)
+    now = _current_hour()
+    keys = {_bucket_key(now - age): age for age in range(hours)}
+    scores = Counter()
+    for key, bucket in cache.get_many(list(keys)).items():
+        weight = 0.5 ** (keys[key] / HALF_LIFE_HOURS)
+        for url, count in bucket.items():
+            scores[url] += count * weight
+    return scores.most_common(n)
+
+
+class HitCounterMiddleware:
+    """Samples requests to ``WARMABLE_VIEWS`` into the hourly popularity buckets"""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        try:
+            if self._countable(request, response) and random.random() < _setting('HOT_URLS_SAMPLE_RATE', 0.1):
+                record_hit(normalise_url(request))
+        except Exception as e:
+            logger.warning(f"[HOT URLS] Could not record hit: {e}")
+        return response
+
+    @staticmethod
+    def _countable(request, response) -> bool:
+        match = getattr(request, 'resolver_match', None)
+        return (
+            request.method == 'GET'
+            and response.status_code in (200, 304)
+            and match is not None
+            and match.view_name in WARMABLE_VIEWS
+            and not is_warmer(request)
+        )
@@ -0,0 +1,112 @@
+# main/listing.py
+"""
+First page of the default property listing, for server-side rendering.
+
+/properties/ and the homepage used to ship an empty grid and let the browser
+call the microservice. The same request (Residential, 12 per page, page 1) is
+made here once per cache period and rendered into the HTML; the page's JS only
+takes over for filtering and pagination.
+"""
+import logging
+import math
+from typing import Dict, Optional
+
+from django.db import DatabaseError
+
+from . import slug_index
+from .cache_compute import get_or_compute
+from .mapping import PROPERTY_TILE
+from .models import Property
+from .services import PropertyService
+
+logger = logging.getLogger(__name__)
+
+LISTING_CACHE_KEY = 'listing_first_page_v2'
+LISTING_CACHE_TIMEOUT = 60 * 10
+MIRROR_FALLBACK_TIMEOUT = 60  # retry the API soon when serving from the mirror
+PAGE_SIZE = 12
+
+# Must match the initial request properties.html makes from JS
+DEFAULT_LISTING_FILTERS = {'property_type': 'Residential', 'limit': PAGE_SIZE, 'page': 1}
+
+PLACEHOLDER_IMAGE = 'https://images.unsplash.com/photo-1560518883-ce09059eeffa?ixlib=rb-4.0.3&auto=format&fit=crop&w=800&q=80'
+
+
+def _tile(record) -> Dict:
+    """Card fields in the same shape the properties.html JS renders"""
+    tile = record.as_dict()
+    image = record.cover or record.image or PLACEHOLDER_IMAGE
+    tile['image_url'] = f"{image}{'&' if '?' in image else '?'}w=400&h=300&q=80"
+    if record.district:
+        tile['location'] = f'{record.district}, {record.city}'
+    else:
+        tile['location'] = record.city or 'Premium Location, Dubai'
+    tile['url'] = f'/property/{record.slug}-{record.id}/'
+    return tile
+
+
+def _from_api() -> Optional[Dict]:
+    result = PropertyService.get_properties(dict(DEFAULT_LISTING_FILTERS))
+    if not (result['success'] and result['data'].get('status') is True):
+        return None
+
+    data_block = result['data'].get('data') or {}
+    records = PROPERTY_TILE.map_many(data_block.get('results', []))
+    slug_index.remember_many((record.id, record.slug) for record in records)
+    return {
+        'results': [_tile(record) for record in records],
+        'count': data_block.get('count', 0),
+        'current_page': data_block.get('current_page', 1),
+        'last_page': data_block.get('last_page', 1),
+        'next_page_url': data_block.get('next_page_url'),
+        'previous_page_url': data_block.get('previous_page_url'),
+        'source': 'api',
+    }
+
+
+def _from_mirror() -> Optional[Dict]:
+    try:
+        queryset = Property.objects.filter(is_active=True, property_type='residential')
+        count = queryset.count()
+        rows = list(queryset.order_by('-created_at')[:PAGE_SIZE])
+    except DatabaseError as e:
+        logger.warning(f"[LISTING] Mirror unavailable: {e}")
+        return None
+    if not rows:
+        return None
+
+    records = [
+        PROPERTY_TILE({
+            'id': row.api_id,
+            'title': row.title,
+            'slug': row.slug,
+            'city': {'name': row.city},
+            'district': {'name': row.district},
+            'cover': row.cover_image,
+            'low_price': row.low_price and float(row.low_price),
+            'min_area': row.min_area and float(row.min_area),
+            'property_type': 20,
+        })
+        for row in rows
+    ]
+    return {
+        'results': [_tile(record) for record in records],
+        'count': count,
+        'current_page': 1,
+        'last_page': max(1, math.ceil(count / PAGE_SIZE)),
+        'next_page_url': None,
+        'previous_page_url': None,
+        'source': 'mirror',
+    }
+
+
+def _listing_timeout(listing) -> int:
+    return MIRROR_FALLBACK_TIMEOUT if listing.get('source') == 'mirror' else LISTING_CACHE_TIMEOUT
+
+
+def get_first_page() -> Optional[Dict]:
+    """
+    Cached first listing page: the API result when available, else the
+    mirror's newest residential properties, else ``None`` (JS loads it).
+    """
+    return get_or_compute(LISTING_CACHE_KEY, lambda: _from_api() or _from_mirror(), _listing_timeout)
@@ -0,0 +1,111 @@
+# main/management/commands/benchmark_descriptions.py
+
+import json
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.html import strip_tags
+
+from main.descriptions import cached_clean_description, clean_description
+from main.models import Property
+
+SAMPLE_DESCRIPTION = (
+    '<p style="color-scheme: light; font-family: Arial, sans-serif;">'
+    '<span style="forced-color-adjust: auto; position-anchor: none">Welcome to {name}, '
+    'a landmark address in the heart of Dubai.</span> Residences feature floor-to-ceiling windows '
+    'and private balconies! Residents enjoy an infinity pool, gym and landscaped gardens.</p>'
+    '<p style="mask: none; math-depth: 0; appearance: auto;">Handover is planned for Q4 2027. '
+    'Flexible payment plans are available? Contact us for a private viewing.</p>'
+)
+
+
+def legacy_clean(raw_html):
+    """The inline cleaning property_detail did before main.descriptions"""
+    raw_html = re.sub(r'style\s*=\s*["\'][^"\']*["\']?', '', raw_html, flags=re.IGNORECASE | re.DOTALL)
+    raw_html = re.sub(r'(color-scheme|forced-color-adjust|font-family|position-anchor)[^>]*', '', raw_html, flags=re.IGNORECASE)
+    clean_text = strip_tags(raw_html)
+    clean_text = re.sub(r'<\s*p[^a-zA-Z0-9>]*', '', clean_text)
+    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+    clean_text = re.sub(r'unset[;:\s]+', '', clean_text)
+    clean_text = re.sub(r'(color-scheme|forced-color-adjust|mask|math-depth|position|appearance)[:\s]+[^;]*;?', '', clean_text)
+    sentences = re.split(r'(?<=[.!?])\s+', clean_text)
+    paragraphs = []
+    for i in range(0, len(sentences), 3):
+        para_text = ' '.join(sentences[i:i+3]).strip()
+        if para_text:
+            paragraphs.append(f'<p>{para_text}</p>')
+    return '\n'.join(paragraphs) if paragraphs else '<p>No description available.</p>'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark property description cleaning over a corpus of descriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input',
+            help='JSON file: a list of upstream property payloads or of raw description strings',
+        )
+        parser.add_argument('--rounds', type=int, default=5, help='Timing rounds (best is reported)')
+        parser.add_argument('--samples', type=int, default=500, help='Synthetic descriptions when no corpus is found')
+
+    def handle(self, *args, **options):
+        corpus, source = self._load_corpus(options)
+        if not corpus:
+            raise CommandError('Description corpus is empty')
+
+        # The cleaned output must be identical to the old inline implementation
+        mismatches = sum(1 for raw in corpus if clean_description(raw) != legacy_clean(raw))
+        if mismatches:
+            raise CommandError(f'{mismatches} descriptions clean differently from the legacy code')
+
+        total_kb = sum(len(raw) for raw in corpus) / 1024
+        self.stdout.write(f'Corpus: {len(corpus)} descriptions ({total_kb:.0f} KB) from {source}')
+        self.stdout.write('')
+
+        # Warm the cache once so the last case measures steady-state hits
+        for raw in corpus:
+            cached_clean_description(raw)
+
+        cases = [
+            ('legacy inline re.sub', legacy_clean),
+            ('precompiled', clean_description),
+            ('shared cache (hit)', cached_clean_description.__wrapped__),
+            ('process LRU (hit)', cached_clean_description),
+        ]
+        for label, clean in cases:
+            best = min(self._time(clean, corpus) for _ in range(options['rounds']))
+            self.stdout.write(
+                f'{label:<22} {best * 1e6 / len(corpus):>9.1f} µs/description '
+                f'{len(corpus) / best:>10,.0f} descriptions/s'
+            )
+
+    def _load_corpus(self, options):
+        if options['input']:
+            try:
+                with open(options['input'], encoding='utf-8') as fh:
+                    items = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Unable to load {options["input"]}: {e}')
+            corpus = []
+            for item in items:
+                if isinstance(item, dict):
+                    item = (item.get('description') or {}).get('en')
+                if isinstance(item, str) and item:
+                    corpus.append(item)
+            return corpus, options['input']
+
+        corpus = list(
+            Property.objects.exclude(description='').values_list('description', flat=True)
+        )
+        if corpus:
+            return corpus, 'Property mirror'
+
+        return [SAMPLE_DESCRIPTION.format(name=f'Tower {i}') for i in range(options['samples'])], 'synthetic samples'
+
+    @staticmethod
+    def _time(clean, corpus):
+        start = time.perf_counter()
+        for raw in corpus:
+            clean(raw)
+        return time.perf_counter() - start
@@ -0,0 +1,124 @@
+# main/management/commands/benchmark_mapper.py
+
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import slugify
+
+from main.mapping import PROPERTY_CARD, PROPERTY_HEADER, PROPERTY_REF
+
+
+def sample_payload(i):
+    """Upstream-shaped listing payload (same nesting as /properties/filter/ results)"""
+    return {
+        'id': i,
+        'title': {'en': f'Sample Residences Tower {i}', 'ar': 'برج'},
+        'slug': None if i % 3 else f'sample-residences-tower-{i}',
+        'city': {'id': 1, 'name': {'en': 'Dubai', 'ar': 'دبي'}},
+        'district': {'id': 7, 'name': {'en': 'Business Bay', 'ar': 'الخليج التجاري'}},
+        'developer': {'id': 3, 'name': {'en': 'Emaar'}},
+        'property_type': 3 if i % 4 == 0 else 20,
+        'cover': f'https://cdn.example.com/{i}.webp',
+        'low_price': 1250000 + i,
+        'min_area': 640,
+        'bedrooms': i % 5,
+    }
+
+
+def legacy_card(prop):
+    """The hand-written extraction filter_properties_api used before main.mapping"""
+    title_data = prop.get('title', {})
+    property_type_id = prop.get('property_type')
+    property_type_text = 'Residential'
+    if property_type_id == '3' or property_type_id == 3:
+        property_type_text = 'Commercial'
+    return {
+        'id': prop.get('id'),
+        'title': title_data.get('en', 'Luxury Property'),
+        'location': prop.get('location', 'Premium Location, Dubai'),
+        'bedrooms': prop.get('bedrooms', 'N/A'),
+        'area': prop.get('area', 'N/A'),
+        'price': prop.get('price'),
+        'low_price': prop.get('low_price'),
+        'min_area': prop.get('min_area'),
+        'property_type': property_type_text,
+        'cover': prop.get('cover'),
+        'image': prop.get('image'),
+        'city': prop.get('city'),
+        'district': prop.get('district'),
+        'detail_url': f"/property/{prop.get('id')}/",
+    }
+
+
+def legacy_ref(prop):
+    """The hand-written id/slug/title extraction the sitemaps used"""
+    title_data = prop.get('title', {})
+    if isinstance(title_data, dict):
+        title = title_data.get('en', 'Untitled')
+    else:
+        title = title_data or 'Untitled'
+    return {'id': prop['id'], 'slug': prop.get('slug') or slugify(title), 'title': title}
+
+
+class Command(BaseCommand):
+    help = 'Measure main.mapping throughput and memory per record against the hand-written extraction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=20000, help='Synthetic payloads to map')
+        parser.add_argument('--rounds', type=int, default=5, help='Timing rounds (best is reported)')
+        parser.add_argument('--input', help='JSON file with a list of real upstream payloads')
+
+    def handle(self, *args, **options):
+        if options['input']:
+            try:
+                with open(options['input'], encoding='utf-8') as fh:
+                    payloads = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Unable to load {options["input"]}: {e}')
+            if isinstance(payloads, dict):
+                payloads = payloads.get('data', {}).get('results', [])
+        else:
+            payloads = [sample_payload(i) for i in range(1, options['records'] + 1)]
+
+        payloads = [p for p in payloads if isinstance(p, dict) and p.get('id')]
+        if not payloads:
+            raise CommandError('No payloads with an id to benchmark')
+
+        self.stdout.write(f'Payloads: {len(payloads)}  Rounds: {options["rounds"]}')
+        self.stdout.write('')
+
+        cases = [
+            ('card  legacy dict', lambda: [legacy_card(p) for p in payloads]),
+            ('card  PROPERTY_CARD', lambda: PROPERTY_CARD.map_many(payloads)),
+            ('ref   legacy dict', lambda: [legacy_ref(p) for p in payloads]),
+            ('ref   PROPERTY_REF', lambda: PROPERTY_REF.map_many(payloads)),
+            ('header PROPERTY_HEADER', lambda: PROPERTY_HEADER.map_many(payloads)),
+        ]
+
+        for label, run in cases:
+            best = min(self._time(run) for _ in range(options['rounds']))
+            per_record = self._memory(run) / len(payloads)
+            self.stdout.write(
+                f'{label:<24} {len(payloads) / best:>12,.0f} rec/s '
+                f'{best * 1e6 / len(payloads):>7.2f} µs/rec '
+                f'{per_record:>8.0f} B/rec'
+            )
+
+    @staticmethod
+    def _time(run):
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+
+    @staticmethod
+    def _memory(run):
+        tracemalloc.start()
+        try:
+            result = run()
+            current, _peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del result
+        return current
@@ -0,0 +1,92 @@
+# main/management/commands/benchmark_templates.py
+
+import time
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.test import RequestFactory, override_settings
+from django.urls import NoReverseMatch, resolve, reverse
+
+from main.shell_fragments import shell_version
+
+# Pages that are nothing but the shell plus static content
+DEFAULT_PAGES = [
+    'retail-spaces', 'secondary-residential-properties', 'commercial-properties',
+    'luxury-villas-townhouses', 'beachfront-Properties', 'off-plan-residential-properties',
+    'labour-camps', 'warehouses-for-sale', 'plots-for-sale', 'mansions-for-sale',
+    'privacy-policy', 'terms-and-conditions', 'rera-compliance', 'about', 'contact',
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-page render time with and without the base.html fragment cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', nargs='+', metavar='URL_NAME', help='URL names to render (default: static pages)')
+        parser.add_argument('--iterations', type=int, default=50, help='Renders per page and round')
+        parser.add_argument('--rounds', type=int, default=3, help='Timing rounds (best is reported)')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        pages = []
+        for name in options['pages'] or DEFAULT_PAGES:
+            try:
+                pages.append((name, reverse(name)))
+            except NoReverseMatch:
+                raise CommandError(f'Unknown URL name: {name}')
+
+        loaders = engines['django'].engine.template_loaders
+        cached_loader = any(loader.__class__.__name__ == 'Loader' and loader.__module__.endswith('cached') for loader in loaders)
+        self.stdout.write(f'Template loader: {"cached" if cached_loader else "uncached (DEBUG)"}')
+        self.stdout.write(f'{"page":<36} {"first ms":>9} {"no frag ms":>11} {"frag ms":>9} {"KB":>6}')
+
+        totals = [0.0, 0.0, 0.0]
+        for name, path in pages:
+            match = resolve(path)
+
+            def render():
+                request = factory.get(path)
+                request.resolver_match = match
+                return match.func(request, *match.args, **match.kwargs)
+
+            # Cold fragments for the first render, without touching other cache entries
+            cache.delete_many([
+                make_template_fragment_key('shell_nav', [shell_version(), match.url_name]),
+                make_template_fragment_key('shell_footer', [shell_version()]),
+            ])
+            start = time.perf_counter()
+            size = len(render().content)
+            first = time.perf_counter() - start
+
+            with override_settings(SHELL_CACHE_TIMEOUT=0):
+                uncached = self._best(render, options)
+            with override_settings(SHELL_CACHE_TIMEOUT=60 * 60):
+                render()  # fill the fragments
+                fragments = self._best(render, options)
+
+            for i, value in enumerate((first, uncached, fragments)):
+                totals[i] += value
+            self.stdout.write(
+                f'{name[:36]:<36} {first * 1000:>9.2f} {uncached * 1000:>11.2f} '
+                f'{fragments * 1000:>9.2f} {size / 1024:>6.0f}'
+            )
+
+        count = len(pages) or 1
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Average: first {totals[0] * 1000 / count:.2f} ms, '
+            f'without fragment cache {totals[1] * 1000 / count:.2f} ms, '
+            f'with fragment cache {totals[2] * 1000 / count:.2f} ms per render'
+        ))
+
+    @staticmethod
+    def _best(render, options):
+        best = None
+        for _ in range(options['rounds']):
+            start = time.perf_counter()
+            for _ in range(options['iterations']):
+                render()
+            elapsed = (time.perf_counter() - start) / options['iterations']
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,50 @@
+# main/management/commands/cache_stats.py
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+
+from main.cache_backends import HIT_FIELDS, STATS_CACHE_KEY, TieredCache
+
+
+class Command(BaseCommand):
+    help = 'Show per-prefix hit ratios (L1 memory / L2 shared / miss), entry sizes and serialisation cost of the tiered cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Clear the counters after printing')
+
+    def handle(self, *args, **options):
+        cache = caches['default']
+        if not isinstance(cache, TieredCache):
+            self.stdout.write(self.style.WARNING('⚠ The default cache is not main.cache_backends.TieredCache'))
+            return
+
+        totals = cache.l2.get(STATS_CACHE_KEY) or {}
+        if not totals:
+            self.stdout.write('No statistics recorded yet (workers flush them every minute)')
+            return
+
+        self.stdout.write(
+            f'{"prefix":<44} {"requests":>10} {"L1":>7} {"L2":>7} {"miss":>7} '
+            f'{"avg size":>10} {"packed":>7} {"dump ms":>8} {"load ms":>8}'
+        )
+        rows = sorted(totals.items(), key=lambda item: -sum(item[1].get(field, 0) for field in HIT_FIELDS))
+        for prefix, counts in rows:
+            requests = sum(counts.get(field, 0) for field in HIT_FIELDS) or 1
+            writes = counts.get('writes', 0) or 1
+            raw_bytes = counts.get('raw_bytes', 0)
+            stored_bytes = counts.get('stored_bytes', 0)
+            self.stdout.write(
+                f'{prefix[:44]:<44} {requests:>10,} '
+                f'{counts.get("l1_hits", 0) / requests:>7.1%} '
+                f'{counts.get("l2_hits", 0) / requests:>7.1%} '
+                f'{counts.get("misses", 0) / requests:>7.1%} '
+                f'{stored_bytes // writes:>10,} '
+                f'{stored_bytes / (raw_bytes or 1):>7.1%} '
+                f'{counts.get("dumps_seconds", 0) * 1000 / writes:>8.3f} '
+                f'{counts.get("loads_seconds", 0) * 1000 / (counts.get("loads", 0) or 1):>8.3f}'
+            )
+        self.stdout.write('avg size / packed: stored bytes per write and as a share of the raw pickle')
+
+        if options['reset']:
+            cache.l2.delete(STATS_CACHE_KEY)
+            self.stdout.write(self.style.SUCCESS('✓ Counters reset'))
@@ -0,0 +1,41 @@
+# main/management/commands/export_catalogue_snapshot.py
+
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.snapshot import export_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Export the property mirror and reference data as one compressed, versioned snapshot file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default='catalogue-snapshot.jsonl.gz',
+            help='Output file (gzip-compressed JSON lines)',
+        )
+        parser.add_argument(
+            '--no-reference',
+            action='store_true',
+            help='Skip cities/developers reference data (no API calls)',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        tmp_path = f'{path}.tmp'
+        start_time = time.time()
+
+        # Write to a temp file first so a crashed export never leaves a truncated snapshot
+        header = export_snapshot(tmp_path, include_reference=not options['no_reference'])
+        os.replace(tmp_path, path)
+
+        elapsed_time = time.time() - start_time
+        counts = header['counts']
+        self.stdout.write(self.style.SUCCESS(f'✓ Snapshot v{header["version"]} written to {path}'))
+        self.stdout.write(f'  Properties: {counts["properties"]}')
+        self.stdout.write(f'  Cities: {counts["cities"]}  Developers: {counts["developers"]}')
+        self.stdout.write(f'  Size: {os.path.getsize(path) / 1024:.1f} KB  Time: {elapsed_time:.2f}s')
@@ -0,0 +1,57 @@
+# main/management/commands/export_static_pages.py
+
+from pathlib import Path
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+
+from main.static_pages import (
+    EXPORTED_PAGES, KEEP_VERSIONS, minify_html, new_version_name, prune_versions, static_pages_root, write_version,
+)
+
+
+class Command(BaseCommand):
+    help = 'Render the landing and legal pages (and robots.txt) to minified, precompressed files; run on every deploy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', help='Output directory (default: STATIC_PAGES_ROOT)')
+        parser.add_argument('--name', help='Version directory name (default: timestamp plus RELEASE)')
+        parser.add_argument('--keep', type=int, default=KEEP_VERSIONS, help='Version directories to keep')
+
+    def handle(self, *args, **options):
+        root = Path(options['root']) if options['root'] else static_pages_root()
+        version = options['name'] or new_version_name()
+        site = urlparse(getattr(settings, 'SITE_URL', 'https://kifrealty.com'))
+        factory = RequestFactory(SERVER_NAME=site.hostname, secure=site.scheme == 'https')
+
+        pages = {}
+        raw_total = 0
+        # Render the real views, never the previous export
+        with override_settings(STATIC_PAGES_SERVE=False):
+            for name in EXPORTED_PAGES:
+                path = reverse(name)
+                match = resolve(path)
+                request = factory.get(path)
+                request.resolver_match = match
+                response = match.func(request, *match.args, **match.kwargs)
+                if response.status_code != 200:
+                    raise CommandError(f'{path} returned {response.status_code}, nothing was exported')
+
+                content_type = response['Content-Type']
+                body = response.content
+                raw_total += len(body)
+                if content_type.startswith('text/html'):
+                    body = minify_html(body.decode(response.charset or 'utf-8')).encode('utf-8')
+                pages[path] = (content_type, body)
+                self.stdout.write(f'  {path:<38} {len(response.content) / 1024:>7.1f} KB -> {len(body) / 1024:>7.1f} KB')
+
+        target = write_version(pages, root, version)
+        prune_versions(root, options['keep'])
+        minified_total = sum(len(body) for _, body in pages.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Exported {len(pages)} pages to {target} '
+            f'({raw_total / 1024:.0f} KB -> {minified_total / 1024:.0f} KB minified); current -> {version}'
+        ))
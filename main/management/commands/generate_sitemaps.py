@@ -0,0 +1,49 @@
+# main/management/commands/generate_sitemaps.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kif_realty.sitemaps import SITEMAPS
+from main.sitemaps import refresh_property_items
+from main import sitemap_files
+
+
+class Command(BaseCommand):
+    help = 'Write gzip sitemap shards and sitemap.xml under SITEMAP_ROOT (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', help=f'Output directory (default: {sitemap_files.SITEMAP_ROOT})')
+        parser.add_argument('--shard-size', type=int, default=sitemap_files.SHARD_SIZE,
+                            help='URLs per shard file')
+        parser.add_argument('--no-fetch', action='store_true',
+                            help="Don't refresh properties from the API; use the cache or the mirror")
+        parser.add_argument('--sections', nargs='+', choices=sorted(SITEMAPS),
+                            help='Regenerate only these sections (e.g. "recent" hourly); the rest keep their shards')
+
+    def handle(self, *args, **options):
+        if options['shard_size'] < 1:
+            raise CommandError('--shard-size must be at least 1')
+
+        start_time = time.time()
+
+        sections = options['sections']
+        if not options['no_fetch'] and (not sections or 'properties' in sections):
+            properties = refresh_property_items()
+            if properties:
+                self.stdout.write(self.style.SUCCESS(f'✓ Fetched {len(properties)} properties from the API'))
+            else:
+                self.stdout.write(self.style.WARNING('⚠ API fetch failed or incomplete, using the published catalogue'))
+
+        try:
+            result = sitemap_files.generate(
+                SITEMAPS, root=options['root'], shard_size=options['shard_size'], sections=sections,
+            )
+        except OSError as e:
+            raise CommandError(f'Unable to write sitemaps: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {result['urls']} URLs in {len(result['shards'])} shards "
+            f"({result['written']} rewritten, {result['removed']} removed) "
+            f"in {time.time() - start_time:.1f}s"
+        ))
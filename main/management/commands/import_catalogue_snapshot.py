@@ -0,0 +1,46 @@
+# main/management/commands/import_catalogue_snapshot.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.snapshot import SnapshotError, import_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Bootstrap the property mirror and reference cache from a catalogue snapshot (no network access)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Snapshot file written by export_catalogue_snapshot')
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Empty the mirror before loading instead of upserting on api_id',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Do not prime the cache with reference data',
+        )
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+
+        try:
+            result = import_snapshot(
+                options['path'],
+                replace=options['replace'],
+                prime_cache=not options['no_cache'],
+            )
+        except SnapshotError as e:
+            raise CommandError(str(e))
+
+        elapsed_time = time.time() - start_time
+        stats = result['stats']
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Imported snapshot v{result["header"]["version"]} '
+            f'created {result["header"].get("created_at")}'
+        ))
+        self.stdout.write(f'  Properties: {stats["properties"]}')
+        self.stdout.write(f'  Cities: {stats["cities"]}  Developers: {stats["developers"]}')
+        self.stdout.write(f'  Time: {elapsed_time:.2f}s')
@@ -0,0 +1,28 @@
+# main/management/commands/purge_edge.py
+
+from django.core.management.base import BaseCommand
+
+from main.edge_cache import get_backend, urls_for_keys
+
+
+class Command(BaseCommand):
+    help = 'Purge edge-cached pages by surrogate key (e.g. "pages" after a deploy, "property:2376")'
+
+    def add_arguments(self, parser):
+        parser.add_argument('keys', nargs='+', help='Surrogate keys to purge')
+        parser.add_argument('--dry-run', action='store_true', help='Only list the URLs')
+
+    def handle(self, *args, **options):
+        keys = options['keys']
+        urls = urls_for_keys(keys)
+        for url in urls:
+            self.stdout.write(f'  {url}')
+        if options['dry_run']:
+            self.stdout.write(f'{len(urls)} URLs recorded for {", ".join(keys)}')
+            return
+
+        backend = get_backend()
+        backend.purge(urls, keys)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Purged {len(urls)} URLs for {", ".join(keys)} via {backend.__class__.__name__}'
+        ))
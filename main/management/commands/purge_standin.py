@@ -0,0 +1,41 @@
+# main/management/commands/purge_standin.py
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class PurgeHandler(BaseHTTPRequestHandler):
+    """Answers PURGE like Varnish does (200 Purged) and logs it"""
+    stdout = None
+
+    def do_PURGE(self):
+        keys = self.headers.get('Surrogate-Key', '')
+        self.stdout.write(f'PURGE {self.headers.get("Host", "")}{self.path}  keys: {keys}')
+        body = b'Purged'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Run a local stand-in for a Varnish-compatible HTTP PURGE endpoint (for HttpPurgeBackend)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=6081)
+
+    def handle(self, *args, **options):
+        PurgeHandler.stdout = self.stdout
+        server = ThreadingHTTPServer((options['host'], options['port']), PurgeHandler)
+        self.stdout.write(self.style.SUCCESS(f'✓ Accepting PURGE on http://{options["host"]}:{options["port"]}/ (Ctrl+C to stop)'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
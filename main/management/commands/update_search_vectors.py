@@ -0,0 +1,33 @@
+# main/management/commands/update_search_vectors.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.blog_search import supported, update_search_vectors
+from main.models import BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search vector of blog posts (run once after adding the column, see main/blog_search.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing', action='store_true', help='Only posts without a vector yet')
+        parser.add_argument('--batch-size', type=int, default=200, help='Posts per batch')
+
+    def handle(self, *args, **options):
+        if not supported():
+            raise CommandError('Blog full-text search needs PostgreSQL')
+
+        posts = BlogPost.objects.order_by('pk')
+        if options['missing']:
+            posts = posts.filter(search_vector__isnull=True)
+        ids = list(posts.values_list('pk', flat=True))
+
+        start_time = time.perf_counter()
+        updated = 0
+        for i in range(0, len(ids), options['batch_size']):
+            updated += update_search_vectors(ids[i:i + options['batch_size']])
+        elapsed_time = time.perf_counter() - start_time
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Updated {updated} of {len(ids)} posts in {elapsed_time:.1f}s'))
@@ -0,0 +1,88 @@
+# main/management/commands/warm_hot_urls.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+from main.cache_compute import refresh_ahead
+from main.hot_urls import WARMER_HEADER, top_urls
+from main.property_views import most_viewed
+
+
+class Command(BaseCommand):
+    help = 'Replay the most requested pages so their cache entries are warm (run after deploys and with --loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=100, help='Number of URLs to replay')
+        parser.add_argument('--hours', type=int, default=None,
+                            help='Popularity window in hours (default: HOT_URLS_WINDOW_HOURS)')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent requests')
+        parser.add_argument('--refresh-within', type=int, default=300,
+                            help='Recompute cache entries expiring within this many seconds')
+        parser.add_argument('--most-viewed', type=int, default=0, metavar='N',
+                            help="Also warm the N most viewed properties of the week (beacon counts)")
+        parser.add_argument('--loop', type=int, default=0, metavar='SECONDS',
+                            help='Repeat every SECONDS (0 = run once)')
+        parser.add_argument('--dry-run', action='store_true', help='List the URLs without requesting them')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['top'] < 1:
+            raise CommandError('--workers and --top must be at least 1')
+        if options['loop'] and options['refresh_within'] < options['loop']:
+            self.stdout.write(self.style.WARNING(
+                '⚠ --refresh-within is shorter than --loop; entries may expire between runs'
+            ))
+
+        while True:
+            self._run(options)
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
+
+    def _run(self, options):
+        ranked = top_urls(options['top'], options['hours'])
+        if options['most_viewed']:
+            known = {url for url, _ in ranked}
+            ranked += [(item['url'], float(item['views'])) for item in most_viewed(7, options['most_viewed'])
+                       if item['url'] not in known]
+        if not ranked:
+            self.stdout.write(self.style.WARNING('⚠ No hit statistics yet; nothing to warm'))
+            return
+        if options['dry_run']:
+            for url, score in ranked:
+                self.stdout.write(f'{score:>10.1f}  {url}')
+            return
+
+        urls = [url for url, _ in ranked]
+        site_url = getattr(settings, 'SITE_URL', 'https://kifrealty.com')
+        host = site_url.split('://')[-1].rstrip('/')
+        secure = site_url.startswith('https')
+
+        def warm(url):
+            try:
+                with refresh_ahead(options['refresh_within']):
+                    start = time.perf_counter()
+                    response = Client(HTTP_HOST=host, **{WARMER_HEADER: '1'}).get(url, secure=secure)
+                    return url, response.status_code, time.perf_counter() - start
+            except Exception as e:
+                return url, f'error: {e}', 0.0
+            finally:
+                connections.close_all()
+
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=min(options['workers'], len(urls))) as pool:
+            results = list(pool.map(warm, urls))
+        elapsed_time = time.perf_counter() - start_time
+
+        failed = [(url, status) for url, status, _ in results if status != 200]
+        slowest = max(results, key=lambda result: result[2])
+        for url, status in failed:
+            self.stdout.write(self.style.WARNING(f'⚠ {url}: {status}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Warmed {len(results) - len(failed)}/{len(results)} URLs in {elapsed_time:.1f}s '
+            f'(slowest {slowest[2] * 1000:.0f} ms: {slowest[0]})'
+        ))
@@ -0,0 +1,223 @@
+# main/mapping.py
+"""
+Declarative mapping of upstream property payloads.
+
+The microservice returns multilingual, deeply nested dicts
+(``{'title': {'en': ...}, 'city': {'name': {'en': ...}}}``). Every consumer
+used to walk them by hand; instead a ``RecordSpec`` lists the fields once and
+is compiled into a single generated extraction function that fills a compact
+``__slots__`` record.
+
+Paths are dotted (``'city.name.en'``). A path ending in a language key
+(``en``) also accepts a plain string at the parent level, which is what the
+API sends for some older properties.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.utils.text import slugify
+
+LANGUAGE_KEYS = {'en', 'ar', 'ru'}
+
+# Upstream property_type ids: 3 = Commercial, 20 = Residential (default)
+PROPERTY_TYPE_LABELS = {'3': 'Commercial', '20': 'Residential'}
+
+
+def property_type_label(value) -> str:
+    """Map an upstream property_type id to 'Commercial' / 'Residential'"""
+    return PROPERTY_TYPE_LABELS.get(str(value) if value is not None else '', 'Residential')
+
+
+def property_type_key(value) -> str:
+    """Lowercase variant used by the Property mirror's choices"""
+    return property_type_label(value).lower()
+
+
+class Field:
+    """
+    One output attribute of a record.
+
+    ``path``      dotted path into the payload (``None`` for purely derived fields)
+    ``default``   used when the path is missing, ``None`` or ``''``
+    ``transform`` applied to the extracted value (after defaulting)
+    ``derive``    called with the partially built record when the value is
+                  still empty; runs after all path-based fields
+    """
+    __slots__ = ('path', 'default', 'transform', 'derive')
+
+    def __init__(self, path: Optional[str] = None, default: Any = None,
+                 transform: Optional[Callable] = None, derive: Optional[Callable] = None):
+        self.path = tuple(path.split('.')) if path else ()
+        self.default = default
+        self.transform = transform
+        self.derive = derive
+
+
+class Record:
+    """Base class of compiled records; subclasses only add ``__slots__``"""
+    __slots__ = ()
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    __hash__ = None
+
+
+def _path_source(path, var) -> List[str]:
+    """
+    Generate statements that leave the value at ``path`` in ``var``
+    (``None`` when any level is missing or not a dict). ``src`` itself is
+    always a dict, so the first level is a plain ``.get()``.
+    """
+    first, *rest = path
+    lines = [f'{var} = src.get({first!r})']
+    if not rest:
+        return lines
+    *parents, leaf = rest
+    for key in parents:
+        lines.append(f'{var} = {var}.get({key!r}) if {var}.__class__ is dict else None')
+    if leaf in LANGUAGE_KEYS:
+        # ``{'name': 'Dubai'}`` is accepted in place of ``{'name': {'en': 'Dubai'}}``
+        lines.append(
+            f'{var} = {var}.get({leaf!r}) if {var}.__class__ is dict '
+            f'else ({var} if {var}.__class__ is str else None)'
+        )
+    else:
+        lines.append(f'{var} = {var}.get({leaf!r}) if {var}.__class__ is dict else None')
+    return lines
+
+
+class RecordSpec:
+    """
+    A named set of ``Field``s compiled into a ``__slots__`` class plus a
+    generated ``map(payload) -> record`` function.
+    """
+
+    def __init__(self, name: str, fields: Dict[str, Field]):
+        self.name = name
+        self.fields = dict(fields)
+        self.record_class = type(name, (Record,), {'__slots__': tuple(self.fields)})
+        self.map = self._compile()
+
+    def _compile(self) -> Callable[[Dict], Record]:
+        namespace = {'Record': self.record_class, 'new': object.__new__}
+        body = ['def _map(src):', '    rec = new(Record)']
+        derived = []
+
+        for index, (name, field) in enumerate(self.fields.items()):
+            namespace[f'default_{index}'] = field.default
+            var = f'v{index}'
+            if field.path:
+                body.extend(f'    {line}' for line in _path_source(field.path, var))
+            else:
+                body.append(f'    {var} = None')
+            if field.default is not None:
+                body.append(f"    if {var} is None or {var} == '': {var} = default_{index}")
+            if field.transform:
+                namespace[f'transform_{index}'] = field.transform
+                body.append(f'    {var} = transform_{index}({var})')
+            body.append(f'    rec.{name} = {var}')
+            if field.derive:
+                namespace[f'derive_{index}'] = field.derive
+                derived.append((name, index))
+
+        for name, index in derived:
+            body.append(f"    if rec.{name} is None or rec.{name} == '': rec.{name} = derive_{index}(rec)")
+
+        body.append('    return rec')
+        source = '\n'.join(body)
+        exec(compile(source, f'<RecordSpec {self.name}>', 'exec'), namespace)
+        return namespace['_map']
+
+    def map_many(self, payloads: Iterable) -> List[Record]:
+        """Map every dict payload that carries an ``id``; anything else is skipped"""
+        mapper = self.map
+        return [mapper(p) for p in payloads if isinstance(p, dict) and p.get('id')]
+
+    def __call__(self, payload: Dict) -> Record:
+        return self.map(payload if isinstance(payload, dict) else {})
+
+
+def _slug_from_title(rec) -> str:
+    return slugify(rec.title)
+
+
+# Minimal identity used by sitemaps, redirects and slug checks
+PROPERTY_REF = RecordSpec('PropertyRef', {
+    'id': Field('id'),
+    'title': Field('title.en', default='property'),
+    'slug': Field('slug', derive=_slug_from_title),
+})
+
+# Header information property_detail / unit_detail need next to the raw payload
+PROPERTY_HEADER = RecordSpec('PropertyHeader', {
+    'id': Field('id'),
+    'title': Field('title.en', default='property'),
+    'slug': Field('slug', derive=_slug_from_title),
+    'city': Field('city.name.en', default=''),
+    'district': Field('district.name.en', default=''),
+    'developer': Field('developer.name.en', default=''),
+    'property_type': Field('property_type', transform=property_type_label),
+})
+
+# Card shape returned to properties.js by filter_properties_api
+PROPERTY_CARD = RecordSpec('PropertyCard', {
+    'id': Field('id'),
+    'title': Field('title.en', default='Luxury Property'),
+    'location': Field('location', default='Premium Location, Dubai'),
+    'bedrooms': Field('bedrooms', default='N/A'),
+    'area': Field('area', default='N/A'),
+    'price': Field('price'),
+    'low_price': Field('low_price'),
+    'min_area': Field('min_area'),
+    'property_type': Field('property_type', transform=property_type_label),
+    'cover': Field('cover'),
+    'image': Field('image'),
+    'city': Field('city'),
+    'district': Field('district'),
+    'detail_url': Field(derive=lambda rec: f'/property/{rec.id}/'),
+})
+
+# Server-rendered listing tiles (properties page / homepage first paint)
+PROPERTY_TILE = RecordSpec('PropertyTile', {
+    'id': Field('id'),
+    'title': Field('title.en', default='Luxury Property'),
+    'slug': Field('slug', derive=_slug_from_title),
+    'city': Field('city.name.en', default=''),
+    'district': Field('district.name.en', default=''),
+    'cover': Field('cover'),
+    'image': Field('image'),
+    'low_price': Field('low_price'),
+    'min_area': Field('min_area'),
+    'property_type': Field('property_type', transform=property_type_label),
+})
+
+# Columns of the Property mirror table
+PROPERTY_MIRROR = RecordSpec('PropertyMirror', {
+    'api_id': Field('id'),
+    'title': Field('title.en', default='Untitled Property'),
+    'description': Field('description.en', default=''),
+    'property_type': Field('property_type', transform=property_type_key),
+    'unit_type': Field('unit_type', default=''),
+    'city': Field('city.name.en', default=''),
+    'district': Field('district.name.en', default=''),
+    'developer': Field('developer.name.en', default=''),
+    'low_price': Field('low_price'),
+    'high_price': Field('high_price'),
+    'min_area': Field('min_area'),
+    'max_area': Field('max_area'),
+    'bedrooms': Field('bedrooms'),
+    'bathrooms': Field('bathrooms'),
+    'rooms': Field('rooms', default=''),
+    'cover_image': Field('cover', default=''),
+    'property_status': Field('property_status', default=''),
+    'sales_status': Field('sales_status', default=''),
+    'delivery_year': Field('delivery_year'),
+    'is_featured': Field('is_featured', default=False, transform=bool),
+})
@@ -7,9 +7,13 @@ from django.db import models
 from django.utils.text import slugify
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from PIL import Image
 import os
 
+from . import counters
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -69,6 +73,8 @@ class BlogPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
+    # Weighted title/excerpt/tags/content/category vector, maintained by main/blog_search.py
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['-created_at']
@@ -76,6 +82,7 @@ class BlogPost(models.Model):
             models.Index(fields=['-published_at']),
             models.Index(fields=['status']),
             models.Index(fields=['is_featured']),
+            GinIndex(fields=['search_vector'], name='blogpost_search_vector_gin'),
         ]
     
     def __str__(self):
@@ -92,8 +99,9 @@ class BlogPost(models.Model):
             
         super().save(*args, **kwargs)
         
-        # Resize featured image if it's too large
-        if self.featured_image:
+        # Resize featured image if it's too large (not on saves of other fields only)
+        update_fields = kwargs.get('update_fields')
+        if self.featured_image and (update_fields is None or 'featured_image' in update_fields):
             img_path = self.featured_image.path
             if os.path.exists(img_path):
                 with Image.open(img_path) as img:
@@ -105,8 +113,9 @@ class BlogPost(models.Model):
         return reverse('blog_detail', kwargs={'slug': self.slug})
     
     def increment_views(self):
+        """Count a view; written in bulk by main.counters, without save()"""
+        counters.increment(BlogPost, self.pk, 'views')
         self.views += 1
-        self.save(update_fields=['views'])
     
     @property
     def reading_time(self):
@@ -485,6 +494,7 @@ class Property(models.Model):
             models.Index(fields=['api_id']),
             models.Index(fields=['slug']),
             models.Index(fields=['is_active', '-created_at']),
+            models.Index(fields=['is_active', '-updated_at']),
             models.Index(fields=['property_type']),
             models.Index(fields=['city']),
             models.Index(fields=['is_featured']),
@@ -550,4 +560,26 @@ class Property(models.Model):
     @property
     def property_type_display(self):
         """Return readable property type"""
-        return self.get_property_type_display() if self.property_type else "Property"    
\ No newline at end of file
+        return self.get_property_type_display() if self.property_type else "Property"    
+
+class PropertyViewDaily(models.Model):
+    """Views per upstream property and day, upserted in bulk by main/property_views.py"""
+
+    api_id = models.IntegerField(help_text="Property ID from external API")
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'property_view_daily'
+        verbose_name = 'Property views (daily)'
+        verbose_name_plural = 'Property views (daily)'
+        ordering = ['-day', '-views']
+        constraints = [
+            models.UniqueConstraint(fields=['api_id', 'day'], name='property_view_daily_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'api_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.api_id} on {self.day}: {self.views}"
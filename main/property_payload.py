@@ -0,0 +1,145 @@
+# main/property_payload.py
+"""
+Upstream property payloads, cached by ``pk``.
+
+property_detail used to be page-cached by full URL, so every slug and
+query-string variant of a property missed separately, and unit_detail and
+property_redirect fetched the same ``/property/<pk>`` payload uncached. Here
+the payload is fetched once, normalised (clean description, list fields
+present, images capped) and cached under the pk for all of them.
+
+A 404 / ``status: false`` answer is cached briefly as ``{'error': ...}`` so
+unknown ids don't hit the API on every request; timeouts and 5xx are not
+cached and the previous payload is served while it is still stale-readable.
+
+Each payload carries a ``version`` (hash of its content). property_detail keys
+its optional rendered-HTML cache by pk, template and shell versions and payload
+version, so a changed payload or a deploy with new templates never serves old
+HTML. A refresh that finds a new version purges ``property:<pk>`` from the
+edge cache (main.edge_cache).
+"""
+import hashlib
+import json
+import logging
+from typing import Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from . import slug_index
+from .cache_compute import get_or_compute
+from .descriptions import cached_clean_description
+from .edge_cache import purge_keys
+from .mapping import PROPERTY_HEADER
+from .shell_fragments import shell_version, template_version
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_CACHE_PREFIX = 'property_payload_v1'
+PAYLOAD_CACHE_TIMEOUT = 60 * 15
+NOT_FOUND_CACHE_TIMEOUT = 60 * 2
+HTML_CACHE_PREFIX = 'property_html_v1'
+MAX_IMAGES = 20
+LIST_FIELDS = ('property_images', 'facilities', 'grouped_apartments', 'payment_plans', 'property_units')
+
+
+def _payload_key(pk) -> str:
+    return f'{PAYLOAD_CACHE_PREFIX}:{int(pk)}'
+
+
+def normalise(prop: dict) -> dict:
+    """The shape every property view expects; sets ``slug`` from the API or the title"""
+    desc = prop.get('description')
+    if isinstance(desc, dict) and 'en' in desc:
+        desc['en'] = cached_clean_description(desc['en'])
+
+    for field in LIST_FIELDS:
+        if not prop.get(field):
+            prop[field] = []
+    prop['property_images'] = prop['property_images'][:MAX_IMAGES]
+    prop['slug'] = PROPERTY_HEADER(prop).slug
+    return prop
+
+
+def _fetch(pk) -> Optional[dict]:
+    """``{'property', 'version'}``, ``{'error'}`` for unknown ids, ``None`` if the API failed"""
+    url = f'{settings.MICROSERVICE_API}/property/{pk}'
+    try:
+        resp = requests.get(url, timeout=8)
+    except requests.RequestException as e:
+        logger.warning(f"[PROPERTY] Fetching {pk} failed: {e}")
+        return None
+
+    if resp.status_code == 404:
+        return {'error': 'Property not found or API error.'}
+    if resp.status_code != 200:
+        logger.warning(f"[PROPERTY] Fetching {pk} returned {resp.status_code}")
+        return None
+
+    try:
+        data = resp.json()
+    except ValueError:
+        logger.warning(f"[PROPERTY] Invalid JSON for {pk}")
+        return None
+    if not data.get('status'):
+        return {'error': data.get('message') or 'API returned error.'}
+
+    prop = normalise(data.get('data') or {})
+    slug_index.remember(pk, prop['slug'])
+    digest = hashlib.md5(json.dumps(prop, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+    # Upstream edits have no signal: a refresh that finds new content purges the edge copies
+    previous = cache.get(_payload_key(pk))
+    if previous and previous['value'].get('version') not in (None, digest):
+        purge_keys(f'property:{pk}')
+    return {'property': prop, 'version': digest}
+
+
+def _timeout(payload: dict) -> int:
+    return NOT_FOUND_CACHE_TIMEOUT if 'error' in payload else PAYLOAD_CACHE_TIMEOUT
+
+
+def get_payload(pk) -> dict:
+    """
+    Cached payload for ``pk``: ``{'property': {...}, 'version': str}`` or
+    ``{'error': message}``. The property dict is a private copy.
+    """
+    payload = get_or_compute(_payload_key(pk), lambda: _fetch(pk), _timeout)
+    return payload or {'error': 'Failed to retrieve property data.'}
+
+
+def get_property(pk) -> Optional[dict]:
+    return get_payload(pk).get('property')
+
+
+def find_unit(prop: dict, unit_id) -> Optional[dict]:
+    """Unit ``unit_id`` from the payload's grouped_apartments or property_units"""
+    for field in ('grouped_apartments', 'property_units'):
+        for unit in prop.get(field) or []:
+            if str(unit.get('id')) == str(unit_id):
+                return unit
+    return None
+
+
+# Rendered HTML ----------------------------------------------------------
+
+def _html_key(pk, payload: dict, templates) -> str:
+    return f"{HTML_CACHE_PREFIX}:{int(pk)}:{template_version(*templates)}:{shell_version()}:{payload['version']}"
+
+
+def html_cache_timeout() -> int:
+    """``PROPERTY_HTML_CACHE_TIMEOUT`` setting; 0 disables the rendered-HTML cache"""
+    return int(getattr(settings, 'PROPERTY_HTML_CACHE_TIMEOUT', PAYLOAD_CACHE_TIMEOUT))
+
+
+def get_html(pk, payload: dict, templates) -> Optional[bytes]:
+    if not html_cache_timeout():
+        return None
+    return cache.get(_html_key(pk, payload, templates))
+
+
+def set_html(pk, payload: dict, templates, content: bytes):
+    timeout = html_cache_timeout()
+    if timeout:
+        cache.set(_html_key(pk, payload, templates), content, timeout)
@@ -4,6 +4,7 @@
 # import logging
 # from django.conf import settings
 # from main.models import Property
+# from main.mapping import PROPERTY_MIRROR
 # from django.db import transaction
 # from typing import Dict, List
 
@@ -13,46 +14,6 @@
 # class PropertySyncService:
 #     """Service to sync properties from external API to database"""
     
-#     @staticmethod
-#     def extract_multilang_field(data, field_name, default=''):
-#         """
-#         Extract English value from multilingual field.
-#         Handles nested structures like: {'en': 'value'} or {'name': {'en': 'value'}}
-#         """
-#         field_data = data.get(field_name, {})
-        
-#         if isinstance(field_data, dict):
-#             # Check if it has direct 'en' key
-#             if 'en' in field_data:
-#                 return field_data.get('en', default)
-#             # Check if it has nested 'name' with 'en'
-#             elif 'name' in field_data:
-#                 name_data = field_data.get('name', {})
-#                 if isinstance(name_data, dict):
-#                     return name_data.get('en', default)
-#                 return name_data or default
-#             # If dict but no 'en' or 'name', try to get first value
-#             values = list(field_data.values())
-#             return values[0] if values else default
-        
-#         # If not dict, return as is or default
-#         return field_data or default
-    
-#     @staticmethod
-#     def map_property_type(property_type_id):
-#         """
-#         Map property type ID to readable text.
-#         Based on your view: 3 = Commercial, 20 = Residential
-#         """
-#         property_type_id = str(property_type_id) if property_type_id else ''
-        
-#         if property_type_id == '3':
-#             return 'commercial'
-#         elif property_type_id == '20':
-#             return 'residential'
-#         else:
-#             return 'residential'  # Default to residential
-    
 #     @staticmethod
 #     def sync_property_from_api_data(api_property: Dict) -> Property:
 #         """
@@ -65,74 +26,16 @@
 #             logger.warning("Property missing 'id' field, skipping")
 #             return None
         
-#         # Extract title (multilingual)
-#         title_data = api_property.get('title', {})
-#         if isinstance(title_data, dict):
-#             title = title_data.get('en', 'Untitled Property')
-#         else:
-#             title = title_data or 'Untitled Property'
-        
-#         # Extract city (nested structure: city.name.en)
-#         city_data = api_property.get('city', {})
-#         city = ''
-#         if isinstance(city_data, dict):
-#             name_data = city_data.get('name', {})
-#             if isinstance(name_data, dict):
-#                 city = name_data.get('en', '')
-#             else:
-#                 city = name_data or ''
-        
-#         # Extract district (nested structure: district.name.en)
-#         district_data = api_property.get('district', {})
-#         district = ''
-#         if isinstance(district_data, dict):
-#             name_data = district_data.get('name', {})
-#             if isinstance(name_data, dict):
-#                 district = name_data.get('en', '')
-#             else:
-#                 district = name_data or ''
-        
-#         # Extract developer (nested structure: developer.name.en)
-#         developer_data = api_property.get('developer', {})
-#         developer = ''
-#         if isinstance(developer_data, dict):
-#             name_data = developer_data.get('name', {})
-#             if isinstance(name_data, dict):
-#                 developer = name_data.get('en', '')
-#             else:
-#                 developer = name_data or ''
-        
-#         # Map property type (3 = commercial, 20 = residential)
-#         property_type_id = api_property.get('property_type')
-#         property_type = PropertySyncService.map_property_type(property_type_id)
+#         # Multilingual extraction and 3/20 property_type mapping are shared
+#         # with the views and sitemaps through main.mapping
+#         fields = PROPERTY_MIRROR(api_property).as_dict()
+#         fields.pop('api_id')
+#         title = fields['title']
         
 #         # Create or update property
 #         property_obj, created = Property.objects.update_or_create(
 #             api_id=api_id,
-#             defaults={
-#                 'title': title,
-#                 'description': PropertySyncService.extract_multilang_field(
-#                     api_property, 'description', ''
-#                 ),
-#                 'property_type': property_type,
-#                 'unit_type': api_property.get('unit_type', ''),
-#                 'city': city,
-#                 'district': district,
-#                 'low_price': api_property.get('low_price'),
-#                 'high_price': api_property.get('high_price'),
-#                 'min_area': api_property.get('min_area'),
-#                 'max_area': api_property.get('max_area'),
-#                 'bedrooms': api_property.get('bedrooms'),
-#                 'bathrooms': api_property.get('bathrooms'),
-#                 'rooms': api_property.get('rooms', ''),
-#                 'cover_image': api_property.get('cover', ''),  # API uses 'cover' field
-#                 'property_status': api_property.get('property_status', ''),
-#                 'sales_status': api_property.get('sales_status', ''),
-#                 'delivery_year': api_property.get('delivery_year'),
-#                 'developer': developer,
-#                 'is_featured': api_property.get('is_featured', False) or api_property.get('featured', False),
-#                 'is_active': True,
-#             }
+#             defaults={**fields, 'is_active': True},
 #         )
         
 #         action = "Created" if created else "Updated"
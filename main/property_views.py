@@ -0,0 +1,135 @@
+# main/property_views.py
+"""
+View counts of upstream properties.
+
+ExclusiveProperty has ``view_count``; upstream properties had nothing, so
+there was no way to tell which ones get traffic. Counting them in the view
+wouldn't work anyway: property pages are served from the rendered-HTML
+cache and the edge, so most visits never reach Django. The page instead
+sends a beacon (``POST /api/properties/<pk>/view/``; bots, warmer replays
+and repeats from one IP are dropped by ``crawlers.countable_beacon``) and
+``record_view()`` only bumps an in-memory counter - nothing is written on
+the request path.
+
+A daemon thread per worker (main.counters.BackgroundFlusher) flushes the
+counters every ``PROPERTY_VIEWS_FLUSH_INTERVAL`` seconds into the daily
+rollup table ``PropertyViewDaily`` with multi-row upserts (``UPSERT_BATCH``
+rows each) in one transaction, so a flush is written completely or not at
+all:
+
+    INSERT ... VALUES (...), (...) ON CONFLICT (api_id, day) DO UPDATE SET views = views + excluded.views
+
+Beacons for ids missing from the Property mirror are not counted, so junk
+ids can't create rows or crowd the ranking.
+
+``most_viewed(days, limit)`` ranks the rollups (cached, joined with the
+Property mirror for the card fields) for homepage rails and for deciding
+what to keep warm.
+"""
+import logging
+import threading
+from collections import Counter
+from datetime import timedelta
+from typing import List
+
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .cache_compute import get_or_compute
+from .counters import BackgroundFlusher
+
+logger = logging.getLogger(__name__)
+
+MOST_VIEWED_CACHE_PREFIX = 'most_viewed_v1'
+MOST_VIEWED_CACHE_TIMEOUT = 60 * 10
+MAX_PENDING = 10000
+UPSERT_BATCH = 1000
+
+_pending = Counter()  # (api_id, day) -> views
+_lock = threading.Lock()
+
+
+def record_view(pk: int):
+    """Count one view of upstream property ``pk``; flushed later by the worker's flusher thread"""
+    key = (int(pk), timezone.localdate())
+    with _lock:
+        if len(_pending) < MAX_PENDING or key in _pending:
+            _pending[key] += 1
+    _flusher.ensure_started()
+
+
+def _upsert_sql(row_count: int) -> str:
+    from .models import PropertyViewDaily
+
+    table = connection.ops.quote_name(PropertyViewDaily._meta.db_table)
+    values = ', '.join(['(%s, %s, %s)'] * row_count)
+    return (
+        f'INSERT INTO {table} (api_id, day, views) VALUES {values} '
+        f'ON CONFLICT (api_id, day) DO UPDATE SET views = {table}.views + excluded.views'
+    )
+
+
+def flush() -> int:
+    """Write the pending counts in one transaction; returns the number of rows written"""
+    with _lock:
+        if not _pending:
+            return 0
+        rows = [(pk, day, views) for (pk, day), views in _pending.items()]
+        _pending.clear()
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, len(rows), UPSERT_BATCH):
+                batch = rows[start:start + UPSERT_BATCH]
+                cursor.execute(_upsert_sql(len(batch)), [value for row in batch for value in row])
+    except DatabaseError as e:
+        # Rolled back as a whole, so every row goes back
+        logger.warning(f"[PROPERTY VIEWS] Flush of {len(rows)} rows failed, retrying later: {e}")
+        with _lock:
+            for pk, day, views in rows:
+                if len(_pending) < MAX_PENDING or (pk, day) in _pending:
+                    _pending[(pk, day)] += views
+        return 0
+    logger.debug(f"[PROPERTY VIEWS] Flushed {len(rows)} rows")
+    return len(rows)
+
+
+_flusher = BackgroundFlusher('property-views-flush', flush, 'PROPERTY_VIEWS_FLUSH_INTERVAL')
+
+
+def _most_viewed(days: int, limit: int) -> List[dict]:
+    from .models import Property, PropertyViewDaily
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    listed = Property.objects.filter(is_active=True).values('api_id')
+    ranked = list(
+        PropertyViewDaily.objects.filter(day__gte=since, api_id__in=listed)
+        .values('api_id').annotate(views=Sum('views')).order_by('-views', 'api_id')[:limit]
+    )
+    mirror = {
+        prop.api_id: prop
+        for prop in Property.objects.filter(api_id__in=[row['api_id'] for row in ranked], is_active=True)
+    }
+    results = []
+    for row in ranked:
+        prop = mirror.get(row['api_id'])
+        item = {'id': row['api_id'], 'views': row['views']}
+        if prop is not None:
+            item.update({
+                'title': prop.title,
+                'url': f'/property/{prop.slug}-{prop.api_id}/',
+                'city': prop.city,
+                'district': prop.district,
+                'cover': prop.cover_image,
+                'low_price': float(prop.low_price) if prop.low_price is not None else None,
+            })
+        else:
+            item['url'] = f'/property/{row["api_id"]}/'
+        results.append(item)
+    return results
+
+
+def most_viewed(days: int = 7, limit: int = 12) -> List[dict]:
+    """The ``limit`` most viewed upstream properties of the last ``days`` days, most viewed first"""
+    key = f'{MOST_VIEWED_CACHE_PREFIX}:{days}:{limit}'
+    return get_or_compute(key, lambda: _most_viewed(days, limit), MOST_VIEWED_CACHE_TIMEOUT) or []
@@ -2,7 +2,7 @@ import requests
 import logging
 from django.conf import settings
 from typing import Dict, Optional
-from django.core.cache import cache
+from .cache_compute import get_or_compute
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +25,12 @@ ALLOWED_FILTER_KEYS = {
     'page_size'   # ← Add this
 }
 
+# Reference data changes rarely; keep it cached so cities/developers
+# dropdowns (and freshly bootstrapped nodes) don't need the API
+CITIES_CACHE_KEY = 'reference_cities_v2'
+DEVELOPERS_CACHE_KEY = 'reference_developers_v2'
+REFERENCE_CACHE_TIMEOUT = 60 * 60 * 6
+
 class PropertyService:
     @staticmethod
     def get_properties(filters: Optional[Dict] = None) -> Dict:
@@ -119,69 +125,42 @@ class PropertyService:
         return PropertyService.get_properties(search_filters)
 
     @staticmethod
-    def get_cities() -> Dict:
-        """
-        Get cities with districts from external API.
-        """
+    def _fetch_reference(url: str, label: str):
+        """Reference list from the API, or ``None`` on failure (logged)"""
         try:
-            response = requests.get(
-                settings.CITIES_API_URL,
-                timeout=settings.API_TIMEOUT
-            )
+            response = requests.get(url, timeout=settings.API_TIMEOUT)
             response.raise_for_status()
-            data = response.json()
-            
-            return {
-                'success': True,
-                'data': data,
-                'error': None
-            }
-            
+            return response.json()
         except requests.exceptions.RequestException as e:
-            logger.error(f"Cities API request failed: {str(e)}")
-            return {
-                'success': False,
-                'data': [],
-                'error': 'Unable to fetch cities data.'
-            }
+            logger.error(f"{label} API request failed: {str(e)}")
         except Exception as e:
-            logger.error(f"Unexpected error fetching cities: {str(e)}")
-            return {
-                'success': False,
-                'data': [],
-                'error': 'An unexpected error occurred.'
-            }
+            logger.error(f"Unexpected error fetching {label.lower()}: {str(e)}")
+        return None
+
+    @staticmethod
+    def get_cities() -> Dict:
+        """
+        Get cities with districts from external API.
+        """
+        data = get_or_compute(
+            CITIES_CACHE_KEY,
+            lambda: PropertyService._fetch_reference(settings.CITIES_API_URL, 'Cities'),
+            REFERENCE_CACHE_TIMEOUT,
+        )
+        if data is None:
+            return {'success': False, 'data': [], 'error': 'Unable to fetch cities data.'}
+        return {'success': True, 'data': data, 'error': None}
 
     @staticmethod
     def get_developers() -> Dict:
         """
         Get developers list from external API.
         """
-        try:
-            response = requests.get(
-                settings.DEVELOPERS_API_URL,
-                timeout=settings.API_TIMEOUT
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                'success': True,
-                'data': data,
-                'error': None
-            }
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Developers API request failed: {str(e)}")
-            return {
-                'success': False,
-                'data': [],
-                'error': 'Unable to fetch developers data.'
-            }
-        except Exception as e:
-            logger.error(f"Unexpected error fetching developers: {str(e)}")
-            return {
-                'success': False,
-                'data': [],
-                'error': 'An unexpected error occurred.'
-            }
\ No newline at end of file
+        data = get_or_compute(
+            DEVELOPERS_CACHE_KEY,
+            lambda: PropertyService._fetch_reference(settings.DEVELOPERS_API_URL, 'Developers'),
+            REFERENCE_CACHE_TIMEOUT,
+        )
+        if data is None:
+            return {'success': False, 'data': [], 'error': 'Unable to fetch developers data.'}
+        return {'success': True, 'data': data, 'error': None}
\ No newline at end of file
@@ -0,0 +1,52 @@
+# main/shell_fragments.py
+"""
+Cached fragments of the ``base.html`` shell.
+
+Every page, down to the static landing and legal pages, extends the ~80 KB
+``base.html``. Its navigation (mega-menus, ~40 ``{% url %}`` tags) and footer
+are the same for every visitor, so they live in ``templates/partials/`` and
+base.html wraps them in ``{% cache %}``: the navigation per page name (for
+the active link), the footer once. The inline CSS and JS around them are
+plain text nodes and cost next to nothing once the cached template loader
+keeps the parsed template.
+
+Fragment keys include ``shell_version``: a hash of the partials' files and
+the ``RELEASE`` setting, so a deploy that changes the shell (or the URLs it
+reverses, with a new ``RELEASE``) never serves the old fragments.
+``manage.py benchmark_templates`` measures the per-page render cost.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.loader import get_template
+
+SHELL_TEMPLATES = ('partials/shell_nav.html', 'partials/shell_footer.html')
+SHELL_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@lru_cache(maxsize=None)
+def template_version(*names: str) -> str:
+    """Hash of the templates' paths, sizes and mtimes; changes with a deploy that edits them"""
+    parts = []
+    for name in names:
+        path = get_template(name).origin.name
+        try:
+            stat = os.stat(path)
+            parts.append(f'{path}:{stat.st_size}:{stat.st_mtime_ns}')
+        except OSError:
+            parts.append(path)
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()[:8]
+
+
+def shell_version() -> str:
+    return f"{getattr(settings, 'RELEASE', '')}-{template_version(*SHELL_TEMPLATES)}"
+
+
+def shell(request):
+    """Context processor: the fragment cache version and timeout base.html uses"""
+    return {
+        'shell_version': shell_version(),
+        'shell_cache_timeout': getattr(settings, 'SHELL_CACHE_TIMEOUT', SHELL_CACHE_TIMEOUT),
+    }
@@ -0,0 +1,103 @@
+# main/signals.py
+"""
+Cache invalidation: model changes invalidate the tags of main.cache_tags and
+purge the edge-cached pages that carried them as surrogate keys
+(main.edge_cache).
+
+Counter-only saves (``increment_views()``, view/inquiry counts) are ignored,
+otherwise every page view would throw away the cache it just used.
+
+Posts, their tags and tag / category names also feed the blog search vector
+(main.blog_search), which is rebuilt alongside.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from exclusive_properties.models import ExclusiveProperty, ExclusivePropertyAmenity, ExclusivePropertyImage
+
+from .blog_search import update_search_vectors
+from .cache_tags import invalidate_tags
+from .edge_cache import purge_keys
+from .models import BlogPost, Category, Comment, Tag
+
+COUNTER_FIELDS = {'views', 'view_count', 'inquiry_count'}
+
+
+def _invalidate(*tags):
+    invalidate_tags(*tags)
+    purge_keys(*tags)
+
+
+def _counter_only(kwargs) -> bool:
+    update_fields = kwargs.get('update_fields')
+    return bool(update_fields) and set(update_fields) <= COUNTER_FIELDS
+
+
+@receiver([post_save, post_delete], sender=BlogPost)
+def blogpost_changed(sender, instance, **kwargs):
+    if _counter_only(kwargs):
+        return
+    if kwargs.get('signal') is post_save:
+        update_search_vectors([instance.pk])
+    _invalidate(f'blogpost:{instance.pk}', f'category:{instance.category_id}', 'blogposts')
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def blogpost_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # Changed from the tag's side (tag.posts.add/remove/clear): the posts are in pk_set,
+        # except for clear, whose posts are only known before they are unlinked
+        if action == 'pre_clear':
+            instance._cleared_post_ids = list(instance.posts.values_list('pk', flat=True))
+            return
+        if action == 'post_clear':
+            post_ids = instance.__dict__.pop('_cleared_post_ids', [])
+        else:
+            post_ids = list(pk_set or ())
+    else:
+        post_ids = [instance.pk]
+
+    if action in ('post_add', 'post_remove', 'post_clear') and post_ids:
+        update_search_vectors(post_ids)
+        _invalidate(*(f'blogpost:{pk}' for pk in post_ids), 'blogposts')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, instance, **kwargs):
+    if kwargs.get('signal') is post_save:
+        update_search_vectors(instance.posts.values_list('pk', flat=True))
+    _invalidate(f'category:{instance.pk}', 'blogposts')
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleting(sender, instance, **kwargs):
+    # Deleting a tag removes its post links without m2m_changed; its posts are only known before
+    instance._deleted_post_ids = list(instance.posts.values_list('pk', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    if kwargs.get('signal') is post_save:
+        post_ids = list(instance.posts.values_list('pk', flat=True))
+    else:
+        post_ids = instance.__dict__.pop('_deleted_post_ids', [])
+    update_search_vectors(post_ids)
+    _invalidate(f'tag:{instance.pk}', *(f'blogpost:{pk}' for pk in post_ids), 'blogposts')
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    _invalidate(f'blogpost:{instance.post_id}')
+
+
+@receiver([post_save, post_delete], sender=ExclusiveProperty)
+def exclusive_property_changed(sender, instance, **kwargs):
+    if _counter_only(kwargs):
+        return
+    _invalidate(f'exclusive:{instance.pk}', 'exclusives')
+
+
+@receiver([post_save, post_delete], sender=ExclusivePropertyImage)
+@receiver([post_save, post_delete], sender=ExclusivePropertyAmenity)
+def exclusive_property_media_changed(sender, instance, **kwargs):
+    _invalidate(f'exclusive:{instance.property_id}')
@@ -0,0 +1,206 @@
+# main/sitemap_files.py
+"""
+Pre-generated, gzip-compressed sitemap shards.
+
+``generate_sitemaps`` walks every section of ``kif_realty.sitemaps.SITEMAPS``
+once and writes ``sitemap-<section>-<n>.xml.gz`` files plus a plain
+``sitemap.xml`` index under ``SITEMAP_ROOT``. Crawlers are then served static
+files instead of the sitemap framework, so a crawl never reaches the API.
+
+``lastmod`` comes from the item (``updated_at``) when it has one. Items
+without it (static pages, properties the mirror doesn't know) get the time
+their entry last changed, tracked by content hash in ``manifest.json``.
+
+The manifest also records each section's shards, so a run limited to some
+sections (``generate_sitemaps --sections recent``) rewrites only those and
+keeps listing the others in the index.
+
+Every file is written to a temporary name and moved into place, and the index
+is written last, so a crawler never sees a half-written shard or an index
+pointing at a shard that doesn't exist yet. Unchanged shards are not
+rewritten, which keeps their mtime (and so Last-Modified / ETag) stable.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_ROOT = Path(getattr(settings, 'SITEMAP_ROOT', settings.BASE_DIR / 'sitemaps'))
+SITE_URL = getattr(settings, 'SITE_URL', 'https://kifrealty.com').rstrip('/')
+SHARD_SIZE = 250
+INDEX_FILENAME = 'sitemap.xml'
+MANIFEST_FILENAME = 'manifest.json'
+SHARD_PREFIX = 'sitemap-'
+SHARD_SUFFIX = '.xml.gz'
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+
+
+def shard_path(filename: str, root: Optional[Path] = None) -> Optional[Path]:
+    """Path of a generated shard, or ``None`` for anything that isn't one"""
+    if not (filename.startswith(SHARD_PREFIX) and filename.endswith(SHARD_SUFFIX)) or '/' in filename:
+        return None
+    return Path(root or SITEMAP_ROOT) / filename
+
+
+def index_path(root: Optional[Path] = None) -> Path:
+    return Path(root or SITEMAP_ROOT) / INDEX_FILENAME
+
+
+def _w3c(value) -> str:
+    if isinstance(value, datetime):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, dt_timezone.utc)
+        return value.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+    return value.isoformat()
+
+
+def _entry_hash(loc, changefreq, priority, item) -> str:
+    """Hash of what an entry says about its page, for items without updated_at"""
+    if isinstance(item, dict):
+        item = sorted((k, v) for k, v in item.items() if k != 'lastmod')
+    payload = f'{loc}|{changefreq}|{priority}|{item!r}'
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def _section_entries(sitemap, known: Dict, seen: Dict, now: str) -> Iterable[Dict]:
+    """<url> entries of one Sitemap instance, lastmod filled in"""
+    for item in sitemap.items():
+        location = sitemap._get('location', item)
+        if not location:
+            continue
+        loc = location if location.startswith('http') else f'{SITE_URL}{location}'
+        changefreq = sitemap._get('changefreq', item)
+        priority = sitemap._get('priority', item)
+        lastmod = sitemap._get('lastmod', item)
+
+        if lastmod:
+            lastmod = _w3c(lastmod)
+        else:
+            digest = _entry_hash(loc, changefreq, priority, item)
+            previous = known.get(loc)
+            lastmod = previous[1] if previous and previous[0] == digest else now
+            seen[loc] = [digest, lastmod]
+
+        yield {'loc': loc, 'lastmod': lastmod, 'changefreq': changefreq, 'priority': priority}
+
+
+def _render_urlset(entries: List[Dict]) -> bytes:
+    parts = [XML_HEADER, URLSET_OPEN]
+    for entry in entries:
+        parts.append(f"<url><loc>{escape(entry['loc'])}</loc><lastmod>{entry['lastmod']}</lastmod>")
+        if entry['changefreq']:
+            parts.append(f"<changefreq>{entry['changefreq']}</changefreq>")
+        if entry['priority'] is not None:
+            parts.append(f"<priority>{entry['priority']}</priority>")
+        parts.append('</url>\n')
+    parts.append('</urlset>\n')
+    return ''.join(parts).encode('utf-8')
+
+
+def _write_atomic(path: Path, data: bytes) -> bool:
+    """Write ``data`` to ``path`` via a temp file; skip (``False``) if identical"""
+    try:
+        if path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    with open(tmp_path, 'wb') as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+    return True
+
+
+def _load_manifest(root: Path) -> Dict:
+    """``{section: {'urls': {loc: [hash, lastmod]}, 'shards': [...]}}`` from the last run"""
+    try:
+        with open(root / MANIFEST_FILENAME, encoding='utf-8') as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return {
+        section: data for section, data in manifest.items()
+        if isinstance(data, dict) and 'urls' in data and 'shards' in data
+    }
+
+
+def generate(sitemaps: Dict, root: Optional[Path] = None, shard_size: int = SHARD_SIZE,
+             sections: Optional[Iterable[str]] = None) -> Dict:
+    """
+    Write the shards and the index for ``sitemaps`` (section -> Sitemap class).
+    With ``sections``, only those are regenerated; the rest keep the shards
+    recorded by the previous run.
+    Returns ``{'shards': [...], 'written': n, 'urls': n, 'removed': n}``.
+    """
+    root = Path(root or SITEMAP_ROOT)
+    root.mkdir(parents=True, exist_ok=True)
+    previous = _load_manifest(root)
+    selected = set(sections) if sections else set(sitemaps)
+    manifest = {}
+    now = _w3c(timezone.now())
+
+    shards = []
+    written = 0
+    url_count = 0
+
+    for section, sitemap_class in sitemaps.items():
+        if section not in selected:
+            if section in previous:
+                manifest[section] = previous[section]
+                shards.extend(previous[section]['shards'])
+            continue
+
+        sitemap = sitemap_class() if isinstance(sitemap_class, type) else sitemap_class
+        seen = {}
+        known = previous.get(section, {}).get('urls', {})
+        entries = list(_section_entries(sitemap, known, seen, now))
+        url_count += len(entries)
+
+        section_shards = []
+        for number, start in enumerate(range(0, len(entries), shard_size), start=1):
+            chunk = entries[start:start + shard_size]
+            filename = f'{SHARD_PREFIX}{section}-{number}{SHARD_SUFFIX}'
+            # mtime=0 keeps the gzip bytes identical for identical content
+            data = gzip.compress(_render_urlset(chunk), compresslevel=9, mtime=0)
+            if _write_atomic(root / filename, data):
+                written += 1
+            section_shards.append({'name': filename, 'lastmod': max(entry['lastmod'] for entry in chunk)})
+        manifest[section] = {'urls': seen, 'shards': section_shards}
+        shards.extend(section_shards)
+        logger.info(f"[SITEMAP FILES] {section}: {len(entries)} urls")
+
+    _write_atomic(root / MANIFEST_FILENAME, json.dumps(manifest, sort_keys=True).encode('utf-8'))
+
+    index = [XML_HEADER, INDEX_OPEN]
+    for shard in shards:
+        index.append(
+            f"<sitemap><loc>{escape(SITE_URL)}/{shard['name']}</loc>"
+            f"<lastmod>{shard['lastmod']}</lastmod></sitemap>\n"
+        )
+    index.append('</sitemapindex>\n')
+    _write_atomic(root / INDEX_FILENAME, ''.join(index).encode('utf-8'))
+
+    # Shards no longer listed in the index (catalogue shrank, section removed)
+    current = {shard['name'] for shard in shards}
+    removed = 0
+    for path in root.glob(f'{SHARD_PREFIX}*{SHARD_SUFFIX}'):
+        if path.name not in current:
+            path.unlink(missing_ok=True)
+            removed += 1
+
+    return {'shards': shards, 'written': written, 'urls': url_count, 'removed': removed}
@@ -1,8 +1,42 @@
 # main/sitemaps.py
+"""
+Property sitemap provider.
+
+The catalogue is read from ``/properties/large/``: page 1 tells how many pages
+there are, the rest are fetched concurrently (``SITEMAP_FETCH_WORKERS`` at a
+time) and the combined list is published under one versioned cache key that
+every consumer reads - the sitemap sections in ``kif_realty.sitemaps`` and
+``generate_sitemaps``. Bump ``PROPERTY_ITEMS_VERSION`` when the item shape
+changes so old entries are ignored rather than misread.
+
+Each refresh is stored under its own generation key and only then made
+current by repointing ``PROPERTY_ITEMS_POINTER_KEY``, so readers see either
+the previous list or the new one, never a partial write. The current
+generation and the pointer don't expire - a missed cron run must not drop
+the sitemap to the mirror - and the next successful publish replaces them;
+the replaced generation is kept ``PROPERTY_ITEMS_CACHE_TIMEOUT`` seconds for
+readers that already hold the old pointer.
+
+What is cached is not a list of dicts but ``PackedPropertyItems``' state:
+ids, slug offsets and lastmod timestamps as raw ``array`` bytes plus one
+string of concatenated slugs. Unpickling that is a few memcpys, and a shard
+request only builds the ~250 dicts on its own page.
+"""
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+import math
+import threading
+import time
+import uuid
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
 from django.urls import reverse
 from django.core.cache import cache
-from main.models import BlogPost
+from main.models import BlogPost, Property
+from main.mapping import PROPERTY_REF
+from main import slug_index
+from main.cache_compute import get_or_compute
 import requests
 import logging
 import os
@@ -16,6 +50,256 @@ MICROSERVICE_API =  os.getenv("MICROSERVICE_API")
 
 PROPERTIES_API_URL = f'{MICROSERVICE_API}/properties/large/'
 
+PROPERTY_ITEMS_VERSION = 2
+PROPERTY_ITEMS_CACHE_KEY = f'sitemap_property_items_v{PROPERTY_ITEMS_VERSION}'
+PROPERTY_ITEMS_POINTER_KEY = f'{PROPERTY_ITEMS_CACHE_KEY}:current'
+PROPERTY_ITEMS_CACHE_TIMEOUT = 60 * 60 * 6
+MIRROR_ITEMS_CACHE_KEY = f'{PROPERTY_ITEMS_CACHE_KEY}:mirror'
+MIRROR_ITEMS_CACHE_TIMEOUT = 60 * 10
+MAX_API_PAGES = 100
+FETCH_WORKERS = getattr(settings, 'SITEMAP_FETCH_WORKERS', 4)
+FETCH_RATE = getattr(settings, 'SITEMAP_FETCH_RATE', 10)  # API requests per second, 0 = unlimited
+FETCH_TIMEOUT = 30
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _fetch_page(page):
+    """``(data_block, results)`` for one API page; ``(None, [])`` on any failure"""
+    try:
+        response = requests.get(PROPERTIES_API_URL, params={'page': page}, timeout=FETCH_TIMEOUT)
+        if response.status_code != 200:
+            logger.error(f"[SITEMAP] HTTP {response.status_code} on page {page}")
+            return None, []
+
+        data = response.json()
+        if not data.get('status'):
+            logger.warning(f"[SITEMAP] Status false on page {page}")
+            return None, []
+
+        data_block = data.get('data') or {}
+        return data_block, data_block.get('results') or []
+    except Exception as e:
+        logger.error(f"[SITEMAP] Error on page {page}: {e}")
+        return None, []
+
+
+def _page_count(data_block, first_page_size):
+    """Number of API pages, from the first response; ``None`` when it can't tell"""
+    last_page = data_block.get('last_page')
+    if last_page:
+        return min(int(last_page), MAX_API_PAGES)
+    count = data_block.get('count')
+    if count and first_page_size:
+        return min(math.ceil(int(count) / first_page_size), MAX_API_PAGES)
+    # No paging metadata: fine for a single page, otherwise the run can't be trusted
+    return None if data_block.get('next_page_url') else 1
+
+
+def fetch_property_refs(workers=None, rate=None, stats=None):
+    """
+    Every property on the API as ``{'id', 'slug', 'title'}`` dicts, in page
+    order. Pages that fail are retried once; returns ``None`` if any page
+    still has no results, so callers keep the published catalogue instead
+    of replacing it with a partial one.
+
+    ``rate`` caps API requests per second across all workers; ``stats``, if
+    given, is filled with ``pages``, ``failed_pages`` and ``seconds``.
+    """
+    start = time.perf_counter()
+    limiter = RateLimiter(FETCH_RATE if rate is None else rate)
+
+    def fetch(page):
+        limiter.wait()
+        return _fetch_page(page)
+
+    data_block, results = fetch(1)
+    if data_block is None or not results:
+        return None
+
+    pages = {1: results}
+    total_pages = _page_count(data_block, len(results))
+    if total_pages is None:
+        logger.error("[SITEMAP] Page 1 has a next page but no last_page/count; not publishing")
+        return None
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=max(1, workers or FETCH_WORKERS)) as pool:
+            remaining = range(2, total_pages + 1)
+            for page, (_block, page_results) in zip(remaining, pool.map(fetch, remaining)):
+                pages[page] = page_results
+
+    missing = [page for page, page_results in pages.items() if not page_results]
+    if missing:
+        logger.warning(f"[SITEMAP] No results for pages {missing}, retrying")
+        for page in missing:
+            pages[page] = fetch(page)[1]
+        missing = [page for page in missing if not pages[page]]
+    if stats is not None:
+        stats.update(pages=total_pages, failed_pages=len(missing), seconds=time.perf_counter() - start)
+    if missing:
+        logger.error(f"[SITEMAP] Pages {missing} failed twice; keeping the published catalogue")
+        return None
+
+    refs = []
+    for page in sorted(pages):
+        refs.extend(
+            {'id': ref.id, 'slug': ref.slug, 'title': ref.title}
+            for ref in PROPERTY_REF.map_many(pages[page])
+        )
+    logger.info(f"[SITEMAP] ✅ Fetched {len(refs)} properties from {total_pages} pages")
+    return refs
+
+
+def _with_lastmod(properties):
+    """Attach the mirror's updated_at (the API listing has no timestamps)"""
+    updated = dict(
+        Property.objects.filter(api_id__in=[prop['id'] for prop in properties])
+        .values_list('api_id', 'updated_at')
+    )
+    for prop in properties:
+        prop['lastmod'] = updated.get(prop['id'])
+    return properties
+
+
+def mirror_property_items():
+    """Sitemap items built from the Property mirror alone"""
+    rows = Property.objects.filter(is_active=True).exclude(slug='').order_by('api_id')
+    return PackedPropertyItems.pack(
+        {'id': api_id, 'slug': slug, 'lastmod': updated_at}
+        for api_id, slug, updated_at in rows.values_list('api_id', 'slug', 'updated_at').iterator(chunk_size=2000)
+    )
+
+
+class PackedPropertyItems:
+    """
+    Read-only sequence of sitemap items (``{'id', 'slug', 'lastmod'}``)
+    decoded on access. Supports ``len()`` and slicing, which is all the
+    sitemap Paginator needs, so each shard decodes only its own page.
+    """
+    __slots__ = ('ids', 'offsets', 'slugs', 'lastmods')
+
+    def __init__(self, ids, offsets, slugs, lastmods):
+        self.ids = ids
+        self.offsets = offsets
+        self.slugs = slugs
+        self.lastmods = lastmods
+
+    @classmethod
+    def pack(cls, properties):
+        ids = array('q')
+        offsets = array('q', [0])
+        lastmods = array('q')
+        slugs = []
+        position = 0
+        for prop in properties:
+            slug = prop.get('slug') or ''
+            ids.append(int(prop['id']))
+            position += len(slug)
+            offsets.append(position)
+            slugs.append(slug)
+            lastmod = prop.get('lastmod')
+            lastmods.append(int(lastmod.timestamp()) if lastmod else 0)
+        return cls(ids, offsets, ''.join(slugs), lastmods)
+
+    def to_state(self):
+        """Plain tuple stored in the cache (no class reference in the pickle)"""
+        return (self.ids.tobytes(), self.offsets.tobytes(), self.slugs, self.lastmods.tobytes())
+
+    @classmethod
+    def from_state(cls, state):
+        ids_bytes, offsets_bytes, slugs, lastmods_bytes = state
+        ids, offsets, lastmods = array('q'), array('q'), array('q')
+        ids.frombytes(ids_bytes)
+        offsets.frombytes(offsets_bytes)
+        lastmods.frombytes(lastmods_bytes)
+        return cls(ids, offsets, slugs, lastmods)
+
+    def _item(self, index):
+        lastmod = self.lastmods[index]
+        return {
+            'id': self.ids[index],
+            'slug': self.slugs[self.offsets[index]:self.offsets[index + 1]],
+            'lastmod': datetime.fromtimestamp(lastmod, tz=dt_timezone.utc) if lastmod else None,
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self.ids)))]
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError('PackedPropertyItems index out of range')
+        return self._item(index)
+
+    def __iter__(self):
+        return (self._item(i) for i in range(len(self.ids)))
+
+
+def publish_property_items(properties):
+    """Store ``properties`` as a new generation, then make it the current one"""
+    generation = f'{PROPERTY_ITEMS_CACHE_KEY}:{uuid.uuid4().hex[:12]}'
+    previous = cache.get(PROPERTY_ITEMS_POINTER_KEY)
+    cache.set(generation, PackedPropertyItems.pack(properties).to_state(), None)
+    cache.set(PROPERTY_ITEMS_POINTER_KEY, generation, None)
+    # The replaced generation only has to outlive readers that fetched the old pointer
+    if previous and previous != generation:
+        cache.touch(previous, PROPERTY_ITEMS_CACHE_TIMEOUT)
+    return generation
+
+
+def refresh_property_items(workers=None, rate=None, stats=None):
+    """
+    Fetch the catalogue and publish it for the sitemaps. Called by
+    generate_sitemaps / warm_sitemap_cache, never from request handling.
+    """
+    properties = fetch_property_refs(workers=workers, rate=rate, stats=stats)
+    if not properties:
+        return []
+
+    # Legacy /property/<id>/ redirects resolve from this index
+    slug_index.remember_many((prop['id'], prop['slug']) for prop in properties)
+
+    _with_lastmod(properties)
+    publish_property_items(properties)
+    return properties
+
+
+def get_property_items():
+    """
+    Published sitemap items. A crawler request never walks the upstream
+    catalogue: on a cache miss the mirror's active properties are served.
+    """
+    generation = cache.get(PROPERTY_ITEMS_POINTER_KEY)
+    state = cache.get(generation) if generation else None
+    if state:
+        return PackedPropertyItems.from_state(state)
+
+    logger.warning("[SITEMAP] Cache miss, serving properties from the mirror")
+    state = get_or_compute(
+        MIRROR_ITEMS_CACHE_KEY, lambda: mirror_property_items().to_state(), MIRROR_ITEMS_CACHE_TIMEOUT,
+    )
+    return PackedPropertyItems.from_state(state)
+
 
 class StaticViewSitemap(Sitemap):
     changefreq = "monthly"
@@ -54,88 +338,25 @@ class PropertySitemap(Sitemap):
     limit = 250  # Django auto-splits into multiple sitemap pages
 
     def items(self):
-        """
-        Fetch ALL 1712 properties from API
-        Django will automatically split into pages of 250
-        """
-        cache_key = 'sitemap_all_properties_v10'
-        cached = cache.get(cache_key)
-        
-        if cached:
-            logger.info(f"[SITEMAP] ✅ Cache: {len(cached)} properties")
-            return cached
-
-        all_properties = []
-        page = 1
-        max_pages = 10  # 1712 / 250 = ~7 pages
-
-        logger.info("[SITEMAP] 🚀 Fetching all properties...")
-        
-        while page <= max_pages:
-            try:
-                response = requests.get(
-                    PROPERTIES_API_URL,
-                    params={'page': page},
-                    timeout=30
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"[SITEMAP] HTTP {response.status_code}")
-                    break
-
-                data = response.json()
-                
-                if not data.get('status'):
-                    logger.warning(f"[SITEMAP] Status false on page {page}")
-                    break
-
-                # Extract results from: data['data']['results']
-                data_block = data.get('data', {})
-                results = data_block.get('results', [])
-                
-                if not results:
-                    logger.info(f"[SITEMAP] No results on page {page}")
-                    break
-
-                # Store minimal data for each property
-                for prop in results:
-                    if isinstance(prop, dict) and prop.get('id'):
-                        all_properties.append({
-                            'id': prop['id'],
-                            'title': prop.get('title', ''),
-                        })
-
-                logger.info(f"[SITEMAP] Page {page}: {len(results)} properties | Total: {len(all_properties)}")
-
-                # Check if there's a next page
-                if not data_block.get('next_page_url'):
-                    logger.info(f"[SITEMAP] ✅ Last page reached")
-                    break
-
-                page += 1
-
-            except Exception as e:
-                logger.error(f"[SITEMAP] Error on page {page}: {e}")
-                break
-
-        logger.info(f"[SITEMAP] ✅ Total fetched: {len(all_properties)} properties")
-
-        # Cache for 6 hours
-        if all_properties:
-            cache.set(cache_key, all_properties, 60 * 60 * 6)
-
-        return all_properties
+        return get_property_items()
 
     def location(self, obj):
         """
-        Generate URL for each property
-        obj is a dict with 'id' key
+        Generate URL for each property in slug-id format
+        Format: /property/vue-doree-2492/
+        This matches the URL pattern in urls.py: path('property/<slug:slug>-<int:pk>/'...)
         """
+        if isinstance(obj, dict) and obj.get('id') and obj.get('slug'):
+            return f"/property/{obj['slug']}-{obj['id']}/"
+
+        # Fallback if slug is missing (shouldn't happen but just in case)
         if isinstance(obj, dict) and obj.get('id'):
-            # Direct URL string - no reverse() needed
+            logger.warning(f"[SITEMAP] Missing slug for property {obj['id']}, using ID only")
             return f"/property/{obj['id']}/"
+
+        logger.warning(f"[SITEMAP] Invalid object in location(): {type(obj)}")
         return None
 
     def lastmod(self, obj):
-        """No lastmod available from this API endpoint"""
-        return None
\ No newline at end of file
+        """Mirror's updated_at when known (the API listing has no timestamps)"""
+        return obj.get('lastmod') if isinstance(obj, dict) else None
@@ -0,0 +1,49 @@
+# main/slug_index.py
+"""
+api_id -> slug lookups without calling the microservice.
+
+Legacy ``/property/<id>/`` URLs and wrong-slug URLs only need the slug to
+answer with a redirect. The index holds only slugs the API reported (from
+property payloads, listings and sitemap refreshes) and lives in the default
+cache, so every worker sees the same entry: its per-process tier keeps a
+copy for at most ``L1_TIMEOUT`` seconds, and a ``remember()`` in one worker
+reaches the others within that time.
+
+Mirror slugs are not used: ``Property.save`` appends ``-N`` to keep them
+unique, so they can differ from the API slug, and redirecting on them sent
+visitors between two URLs.
+"""
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+SLUG_CACHE_PREFIX = 'property_slug_v2'
+SLUG_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _cache_key(api_id) -> str:
+    return f'{SLUG_CACHE_PREFIX}:{int(api_id)}'
+
+
+def get_slug(api_id) -> Optional[str]:
+    """Return the API slug for ``api_id`` or ``None`` if it isn't known"""
+    return cache.get(_cache_key(api_id))
+
+
+def remember(api_id, slug):
+    """Record the slug the API reported for ``api_id``"""
+    if not api_id or not slug:
+        return
+    if cache.get(_cache_key(api_id)) != slug:
+        cache.set(_cache_key(api_id), slug, SLUG_CACHE_TIMEOUT)
+
+
+def remember_many(refs: Iterable):
+    """Feed (id, slug) pairs the API reported in bulk, e.g. from a sitemap refresh"""
+    slugs = {_cache_key(api_id): slug for api_id, slug in refs if api_id and slug}
+    if not slugs:
+        return
+    known = cache.get_many(list(slugs))
+    changed = {key: slug for key, slug in slugs.items() if known.get(key) != slug}
+    if changed:
+        cache.set_many(changed, SLUG_CACHE_TIMEOUT)
@@ -0,0 +1,180 @@
+# main/snapshot.py
+import gzip
+import json
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Property
+from .cache_compute import prime
+from .services import PropertyService, CITIES_CACHE_KEY, DEVELOPERS_CACHE_KEY, REFERENCE_CACHE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 'kif-catalogue-snapshot'
+SNAPSHOT_VERSION = 1
+BULK_BATCH_SIZE = 500
+
+# Fields copied verbatim between the mirror table and the snapshot file
+PROPERTY_FIELDS = [
+    field.name for field in Property._meta.concrete_fields
+    if not field.primary_key
+]
+PROPERTY_UPDATE_FIELDS = [name for name in PROPERTY_FIELDS if name != 'api_id']
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or of an unknown version"""
+
+
+def _line(obj) -> bytes:
+    return (json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def export_snapshot(path: str, include_reference: bool = True) -> Dict:
+    """
+    Write the property mirror and reference data to one gzip-compressed
+    JSON-lines file. The first line is a header carrying format and version.
+    """
+    counts = {'properties': 0, 'cities': 0, 'developers': 0}
+
+    reference = {}
+    if include_reference:
+        for section, fetch in (('cities', PropertyService.get_cities),
+                               ('developers', PropertyService.get_developers)):
+            result = fetch()
+            if result['success']:
+                reference[section] = result['data']
+                counts[section] = len(result['data']) if isinstance(result['data'], list) else 1
+            else:
+                logger.warning(f"[SNAPSHOT] Skipping {section}: {result['error']}")
+
+    properties = Property.objects.order_by('api_id').values(*PROPERTY_FIELDS)
+    counts['properties'] = properties.count()
+
+    header = {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'created_at': timezone.now(),
+        'counts': counts,
+    }
+
+    with gzip.open(path, 'wb', compresslevel=6) as fh:
+        fh.write(_line(header))
+        for section, data in reference.items():
+            fh.write(_line({'section': section, 'data': data}))
+        for row in properties.iterator(chunk_size=BULK_BATCH_SIZE):
+            fh.write(_line({'section': 'properties', 'row': row}))
+
+    logger.info(f"[SNAPSHOT] Exported {counts} to {path}")
+    return header
+
+
+def read_snapshot(path: str) -> Iterator[Dict]:
+    """Yield the header followed by every record of a snapshot file"""
+    try:
+        with gzip.open(path, 'rb') as fh:
+            first = fh.readline()
+            if not first:
+                raise SnapshotError(f"{path} is empty")
+            header = json.loads(first)
+            if header.get('format') != SNAPSHOT_FORMAT:
+                raise SnapshotError(f"{path} is not a catalogue snapshot")
+            if header.get('version') != SNAPSHOT_VERSION:
+                raise SnapshotError(
+                    f"Unsupported snapshot version {header.get('version')} "
+                    f"(expected {SNAPSHOT_VERSION})"
+                )
+            yield header
+            for raw in fh:
+                if raw.strip():
+                    yield json.loads(raw)
+    except (OSError, ValueError) as e:
+        raise SnapshotError(f"Unable to read {path}: {e}") from e
+
+
+@contextmanager
+def _preserve_timestamps():
+    """
+    bulk_create runs pre_save(), which would stamp auto_now fields with the
+    import time; keep the upstream-derived timestamps from the snapshot instead.
+    """
+    fields = [
+        field for field in Property._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _build_property(row: Dict) -> Property:
+    values = {}
+    for name in PROPERTY_FIELDS:
+        if name in row:
+            values[name] = Property._meta.get_field(name).to_python(row[name])
+    return Property(**values)
+
+
+def _flush(batch, replace: bool) -> int:
+    if not batch:
+        return 0
+    if replace:
+        Property.objects.bulk_create(batch, batch_size=BULK_BATCH_SIZE)
+    else:
+        Property.objects.bulk_create(
+            batch,
+            batch_size=BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['api_id'],
+            update_fields=PROPERTY_UPDATE_FIELDS,
+        )
+    return len(batch)
+
+
+def import_snapshot(path: str, replace: bool = False, prime_cache: bool = True) -> Dict:
+    """
+    Load a snapshot into the mirror with batched bulk inserts and prime the
+    reference-data cache so cities/developers are served without the API.
+
+    With ``replace`` the mirror table is emptied first (inside the same
+    transaction), otherwise rows are upserted on ``api_id``.
+    """
+    stats = {'properties': 0, 'cities': 0, 'developers': 0}
+    records = read_snapshot(path)
+    header = next(records)
+
+    batch = []
+    with transaction.atomic(), _preserve_timestamps():
+        if replace:
+            Property.objects.all().delete()
+
+        for record in records:
+            section = record.get('section')
+            if section == 'properties':
+                batch.append(_build_property(record['row']))
+                if len(batch) >= BULK_BATCH_SIZE:
+                    stats['properties'] += _flush(batch, replace)
+                    batch = []
+            elif section in ('cities', 'developers'):
+                data = record.get('data')
+                stats[section] = len(data) if isinstance(data, list) else 1
+                if prime_cache:
+                    key = CITIES_CACHE_KEY if section == 'cities' else DEVELOPERS_CACHE_KEY
+                    prime(key, data, REFERENCE_CACHE_TIMEOUT)
+            else:
+                logger.warning(f"[SNAPSHOT] Ignoring unknown section {section!r}")
+
+        stats['properties'] += _flush(batch, replace)
+
+    logger.info(f"[SNAPSHOT] Imported {stats} from {path} (created {header.get('created_at')})")
+    return {'header': header, 'stats': stats}
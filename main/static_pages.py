@@ -0,0 +1,247 @@
+# main/static_pages.py
+"""
+Static export of the landing and legal pages.
+
+The ten landing pages, privacy / terms / RERA and robots.txt are templates
+without any data, yet every hit went through the whole Django stack.
+``manage.py export_static_pages`` (run on every deploy) renders them once,
+minifies the HTML, writes ``.gz`` (and ``.br`` when the brotli package is
+installed) next to each file and switches ``current`` over to the new
+version directory:
+
+    STATIC_PAGES_ROOT/
+        current -> 20261019-120000
+        20261019-120000/
+            manifest.json
+            retail-spaces/index.html  (.gz, .br)
+            privacy-policy/index.html (.gz, .br)
+            robots.txt                (.gz)
+
+With ``STATIC_PAGES_SERVE`` the views decorated with ``@exported_page`` answer
+from those files (kept in memory per version) instead of rendering, picking
+the precompressed variant the client accepts. Until a version exists - or
+for a page missing from it - they render as before. The front web server can
+serve the same files directly, e.g. nginx with ``gzip_static on``:
+
+    location ~ ^/(retail-spaces|privacy-policy|...)/?$ {
+        root /srv/kifrealty/static_pages/current;
+        try_files /$1/index.html @django;
+    }
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always written
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# URL names of the exported routes
+EXPORTED_PAGES = [
+    'retail-spaces', 'secondary-residential-properties', 'commercial-properties',
+    'luxury-villas-townhouses', 'beachfront-Properties', 'off-plan-residential-properties',
+    'labour-camps', 'warehouses-for-sale', 'plots-for-sale', 'mansions-for-sale',
+    'privacy-policy', 'terms-and-conditions', 'rera-compliance', 'robots_txt',
+]
+MANIFEST_NAME = 'manifest.json'
+CURRENT_NAME = 'current'
+KEEP_VERSIONS = 3
+
+_PRESERVE_RE = re.compile(r'<(pre|textarea|script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r'<!--(?!\s*\[if).*?-->', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+_STYLE_RE = re.compile(r'(<style\b[^>]*>)(.*?)(</style\s*>)', re.IGNORECASE | re.DOTALL)
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};])\s*')
+
+
+def static_pages_root() -> Path:
+    return Path(getattr(settings, 'STATIC_PAGES_ROOT', settings.BASE_DIR / 'static_pages'))
+
+
+def page_file(path: str) -> str:
+    """Relative file for a URL path: ``/retail-spaces`` -> ``retail-spaces/index.html``"""
+    path = path.strip('/')
+    if not path:
+        return 'index.html'
+    if '.' in path.rsplit('/', 1)[-1]:
+        return path
+    return f'{path}/index.html'
+
+
+def _minify_style(match) -> str:
+    css = _WHITESPACE_RE.sub(' ', _CSS_COMMENT_RE.sub('', match.group(2)))
+    css = _CSS_PUNCTUATION_RE.sub(r'\1', css).strip()
+    return f'{match.group(1)}{css}{match.group(3)}'
+
+
+def minify_html(html: str) -> str:
+    """
+    Drop comments and collapse whitespace runs to one space - what the
+    browser renders anyway. Inline CSS loses comments and the whitespace
+    around braces and semicolons; ``<pre>``, ``<textarea>`` and ``<script>``
+    are copied unchanged.
+    """
+    parts = []
+    position = 0
+    for match in _PRESERVE_RE.finditer(html):
+        parts.append(_WHITESPACE_RE.sub(' ', _COMMENT_RE.sub('', html[position:match.start()])))
+        parts.append(_STYLE_RE.sub(_minify_style, match.group(0)))
+        position = match.end()
+    parts.append(_WHITESPACE_RE.sub(' ', _COMMENT_RE.sub('', html[position:])))
+    return ''.join(parts).strip()
+
+
+def _write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def write_version(pages: Dict[str, tuple], root: Path, version: str) -> Path:
+    """
+    Write ``{url_path: (content_type, body)}`` as ``version`` and point
+    ``current`` at it. Returns the version directory.
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    staging = root / f'.{version}.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+
+    manifest = {}
+    for url_path, (content_type, body) in pages.items():
+        name = page_file(url_path)
+        _write(staging / name, body)
+        _write(staging / f'{name}.gz', gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write(staging / f'{name}.br', brotli.compress(body))
+        manifest[url_path] = {
+            'file': name,
+            'content_type': content_type,
+            'etag': hashlib.md5(body).hexdigest()[:20],
+            'size': len(body),
+        }
+    _write(staging / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+    target = root / version
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+    # Atomic switch: the symlink is replaced in one rename
+    link = root / f'.{CURRENT_NAME}.tmp'
+    if link.is_symlink() or link.exists():
+        link.unlink()
+    os.symlink(version, link)
+    os.replace(link, root / CURRENT_NAME)
+    return target
+
+
+def prune_versions(root: Path, keep: int = KEEP_VERSIONS):
+    """Remove all but the newest ``keep`` version directories (never the current one)"""
+    current = (root / CURRENT_NAME).resolve()
+    versions = sorted(
+        (path for path in root.iterdir() if path.is_dir() and not path.is_symlink() and not path.name.startswith('.')),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for path in versions[keep:]:
+        if path.resolve() != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def new_version_name() -> str:
+    release = getattr(settings, 'RELEASE', '')
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return f'{stamp}-{release}' if release else stamp
+
+
+# Serving ------------------------------------------------------------------
+
+_loaded = {}  # version -> {url_path: {encoding: bytes, 'meta': {...}}}
+_load_lock = threading.Lock()
+
+
+def _current_version() -> Optional[Path]:
+    link = static_pages_root() / CURRENT_NAME
+    try:
+        return link.resolve(strict=True)
+    except (OSError, RuntimeError):
+        return None
+
+
+def _load(version_dir: Path) -> dict:
+    key = str(version_dir)
+    pages = _loaded.get(key)
+    if pages is not None:
+        return pages
+    with _load_lock:
+        if key in _loaded:
+            return _loaded[key]
+        pages = {}
+        try:
+            manifest = json.loads((version_dir / MANIFEST_NAME).read_text())
+            for url_path, meta in manifest.items():
+                variants = {'': (version_dir / meta['file']).read_bytes()}
+                for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+                    path = version_dir / f"{meta['file']}{suffix}"
+                    if path.exists():
+                        variants[encoding] = path.read_bytes()
+                pages[url_path] = {'meta': meta, 'variants': variants}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"[STATIC PAGES] Unable to load {version_dir}: {e}")
+        # Only the current version is kept in memory
+        _loaded.clear()
+        _loaded[key] = pages
+        return pages
+
+
+def exported_response(request) -> Optional[HttpResponse]:
+    """The exported file for ``request.path``, or ``None`` to render normally"""
+    version_dir = _current_version()
+    if version_dir is None:
+        return None
+    page = _load(version_dir).get(request.path)
+    if page is None:
+        return None
+
+    meta = page['meta']
+    etag = quote_etag(meta['etag'])
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encoding = next((name for name in ('br', 'gzip') if name in accepted and name in page['variants']), '')
+    response = HttpResponse(page['variants'][encoding], content_type=meta['content_type'])
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    response['ETag'] = etag
+    return response
+
+
+def exported_page(view):
+    """Serve the view's exported file when ``STATIC_PAGES_SERVE`` is on"""
+    @wraps(view)
+    def _wrapped(request, *args, **kwargs):
+        if getattr(settings, 'STATIC_PAGES_SERVE', False) and request.method in ('GET', 'HEAD'):
+            response = exported_response(request)
+            if response is not None:
+                return response
+        return view(request, *args, **kwargs)
+    return _wrapped
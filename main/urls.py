@@ -50,6 +50,10 @@ urlpatterns = [
     path('api/properties/filter/', views.filter_properties_api, name='filter_properties_api'),
     path('cities/', views.cities_api, name='cities_api'),  # Cities API for React frontend
     path('developers/', views.developers_api, name='developers_api'),  # Developers API for React frontend
+    path('csrf-token/', views.csrf_token_api, name='csrf_token'),  # token for forms on edge-cached pages
+    path('api/properties/most-viewed/', views.most_viewed_properties_api, name='most_viewed_properties_api'),
+    path('api/properties/<int:pk>/view/', views.property_view_beacon, name='property_view_beacon'),
+    path('api/blogs/<int:pk>/view/', views.blog_view_beacon, name='blog_view_beacon'),
 
     
     path('contact/', views.contact_view, name='contact'),
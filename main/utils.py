@@ -1,8 +1,15 @@
 # main/utils.py
+from urllib.parse import urlencode
+
 from django.http import JsonResponse as DjangoJsonResponse
 
 def utf8_json_response(data, **kwargs):
     """Helper to return JsonResponse with proper UTF-8 encoding"""
     kwargs.setdefault('json_dumps_params', {})
     kwargs['json_dumps_params']['ensure_ascii'] = False
-    return DjangoJsonResponse(data, **kwargs)
\ No newline at end of file
+    return DjangoJsonResponse(data, **kwargs)
+
+def canonical_path(request, params=()):
+    """``request.path`` plus only the query parameters in ``params``, in that order"""
+    kept = [(name, request.GET[name]) for name in params if request.GET.get(name)]
+    return f"{request.path}?{urlencode(kept)}" if kept else request.path
@@ -1,11 +1,12 @@
 from .utils import utf8_json_response as JsonResponse
 from django.shortcuts import render, redirect
-from django.contrib import messages
 from django.http import Http404, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
+from django.contrib.sitemaps.views import index as django_sitemap_index
 from django.conf import settings
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse
+from datetime import datetime, timezone as dt_timezone
 from urllib.parse import urlparse, parse_qs
 from django.shortcuts import render, redirect
 from django.core.mail import send_mail
@@ -14,26 +15,65 @@ import json
 import requests
 from django.utils.text import slugify
 from .services import PropertyService
+from .mapping import PROPERTY_CARD, PROPERTY_HEADER
+from . import property_payload
+from . import counters
+from . import property_views
+from .blog_search import add_headlines, search as search_posts
+from . import slug_index
+from .listing import get_first_page
+from . import sitemap_files
+from .crawlers import countable_beacon, crawler_snapshot
+from .cache_tags import cached_tagged
+from .conditional import conditional_json, not_modified, tags_etag, with_etag
+from .notices import Notice, redirect_with_notice
+from .edge_cache import surrogate_keys, tag_response
+from .static_pages import exported_page
 from django.shortcuts import get_object_or_404
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Sum
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
-from django.contrib import messages
 from django.utils import timezone
-from .models import BlogPost, Category, Tag, Newsletter, Comment
+from .models import BlogPost, Category, Tag, Newsletter, Comment, Property
 from .forms import NewsletterForm, CommentForm
-from django.views.decorators.cache import cache_page
-from django.utils.html import strip_tags
-import re
+from django.utils.cache import add_never_cache_headers
+from django.views.decorators.cache import never_cache
+from django.middleware.csrf import get_token
 import os
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+def _blog_sidebar():
+    """Sidebar categories, recent posts and popular tags; cached until a post, category or tag changes"""
+    def compute():
+        return {
+            'categories': list(Category.objects.annotate(
+                posts_count=Count('posts', filter=Q(posts__status='published'))
+            ).filter(posts_count__gt=0)),
+            'recent_posts': list(BlogPost.objects.filter(status='published').order_by('-published_at')[:3]),
+            'popular_tags': list(Tag.objects.annotate(
+                posts_count=Count('posts', filter=Q(posts__status='published'))
+            ).filter(posts_count__gt=0).order_by('-posts_count')[:10]),
+        }
+    return cached_tagged('blog_sidebar_v1', ['blogposts'], compute)
+
 
 def blog_list(request):
     """Display blog list page with pagination and filtering"""
+    # Any change to a published post, category or tag invalidates 'blogposts'; the
+    # view counts shown on the cards change without it, so their total is part of the validator
+    total_views = BlogPost.objects.filter(status='published').aggregate(total=Sum('views'))['total']
+    etag = tags_etag(['blogposts'], total_views)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
     posts = BlogPost.objects.filter(status='published').select_related(
         'category', 'author'
     ).prefetch_related('tags').order_by('-published_at')
@@ -51,15 +91,10 @@ def blog_list(request):
     if tag_slug:
         posts = posts.filter(tags__slug=tag_slug)
     
-    # Search functionality
+    # Search functionality: ranked full-text search (main/blog_search.py)
     search_query = request.GET.get('q')
     if search_query:
-        posts = posts.filter(
-            Q(title__icontains=search_query) |
-            Q(excerpt__icontains=search_query) |
-            Q(content__icontains=search_query) |
-            Q(tags__name__icontains=search_query)
-        ).distinct()
+        posts = search_posts(posts, search_query)
     
     # Exclude featured post from the paginated list
     if featured_post:
@@ -69,30 +104,25 @@ def blog_list(request):
     paginator = Paginator(posts, 6)  # 6 posts per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    if search_query:
+        page_obj.object_list = add_headlines(page_obj.object_list, search_query)
     
     # Sidebar data
-    categories = Category.objects.annotate(
-        posts_count=Count('posts', filter=Q(posts__status='published'))
-    ).filter(posts_count__gt=0)
-    
-    recent_posts = BlogPost.objects.filter(status='published').order_by('-published_at')[:3]
-    popular_tags = Tag.objects.annotate(
-        posts_count=Count('posts', filter=Q(posts__status='published'))
-    ).filter(posts_count__gt=0).order_by('-posts_count')[:10]
+    sidebar = _blog_sidebar()
     
     context = {
         'featured_post': featured_post,
         'page_obj': page_obj,
-        'categories': categories,
-        'recent_posts': recent_posts,
-        'popular_tags': popular_tags,
+        'categories': sidebar['categories'],
+        'recent_posts': sidebar['recent_posts'],
+        'popular_tags': sidebar['popular_tags'],
         'search_query': search_query,
         'category_slug': category_slug,
         'tag_slug': tag_slug,
         'newsletter_form': NewsletterForm(),
     }
     
-    return render(request, 'blogs.html', context)
+    return tag_response(with_etag(request, render(request, 'blogs.html', context), etag), 'blogposts')
 
 
 def blog_detail(request, slug):
@@ -103,21 +133,33 @@ def blog_detail(request, slug):
         status='published'
     )
     
-    # Increment view count
-    post.increment_views()
-    
-    # Get approved comments
-    comments = post.comments.filter(is_approved=True).order_by('-created_at')
-    
-    # Related posts
-    related_posts = BlogPost.objects.filter(
-        category=post.category,
-        status='published'
-    ).exclude(id=post.id)[:3]
+    # Views are counted by the page's beacon (blog_view_beacon): this view only sees
+    # edge-cache misses and revalidations
+
+    # Validator from the post (including the view count it shows) and the versions of its
+    # cached parts; revalidations skip the rendering
+    etag = tags_etag([f'blogpost:{post.pk}', f'category:{post.category_id}'], post.updated_at, post.views)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    
+    # Approved comments and related posts, cached until the post, its comments or its category change
+    comments, related_posts = cached_tagged(
+        f'blog_detail_v1:{post.pk}',
+        [f'blogpost:{post.pk}', f'category:{post.category_id}'],
+        lambda: (
+            list(post.comments.filter(is_approved=True).order_by('-created_at')),
+            list(BlogPost.objects.filter(
+                category=post.category,
+                status='published'
+            ).exclude(id=post.id)[:3]),
+        ),
+    )
     
     # Initialize comment form
     comment_form = CommentForm()
     comment_success = False
+    form_notices = []
     
     # Handle comment form submission
     if request.method == 'POST':
@@ -133,33 +175,22 @@ def blog_detail(request, slug):
                     # Save to database
                     comment.save()
                     
-                    # Set success flag
-                    comment_success = True
-                    
-                    # Add success message
-                    messages.success(
-                        request, 
-                        'Thank you for your comment! It has been submitted and is awaiting approval.'
+                    # Redirect to prevent re-submission on refresh; the notice
+                    # travels in the URL, not the session
+                    return redirect_with_notice(
+                        'blog_detail', 'success',
+                        'Thank you for your comment! It has been submitted and is awaiting approval.',
+                        slug=slug,
                     )
                     
-                    # Reset form after successful submission
-                    comment_form = CommentForm()
-                    
-                    # Redirect to prevent re-submission on refresh
-                    return redirect('blog_detail', slug=slug)
-                    
                 except Exception as e:
                     print(f"Error saving comment: {e}")  # For debugging
-                    messages.error(
-                        request, 
-                        'Sorry, there was an error submitting your comment. Please try again.'
-                    )
+                    form_notices.append(Notice(
+                        'error', 'Sorry, there was an error submitting your comment. Please try again.'
+                    ))
             else:
                 # Form has validation errors
-                messages.error(
-                    request, 
-                    'Please correct the errors in your comment form.'
-                )
+                form_notices.append(Notice('error', 'Please correct the errors in your comment form.'))
     
     context = {
         'post': post,
@@ -168,8 +199,11 @@ def blog_detail(request, slug):
         'comment_form': comment_form,
         'comment_success': comment_success,
     }
+    if form_notices:
+        context['notices'] = form_notices
     
-    return render(request, 'blog_detail.html', context)
+    response = with_etag(request, render(request, 'blog_detail.html', context), etag)
+    return tag_response(response, f'blogpost:{post.pk}', f'category:{post.category_id}')
 
 
 def blog_category(request, slug):
@@ -187,12 +221,10 @@ def blog_category(request, slug):
     context = {
         'category': category,
         'page_obj': page_obj,
-        'categories': Category.objects.annotate(
-            posts_count=Count('posts', filter=Q(posts__status='published'))
-        ).filter(posts_count__gt=0),
+        'categories': _blog_sidebar()['categories'],
     }
     
-    return render(request, 'blogs.html', context)
+    return tag_response(render(request, 'blogs.html', context), f'category:{category.pk}', 'blogposts')
 
 
 def blog_tag(request, slug):
@@ -210,12 +242,10 @@ def blog_tag(request, slug):
     context = {
         'tag': tag,
         'page_obj': page_obj,
-        'popular_tags': Tag.objects.annotate(
-            posts_count=Count('posts', filter=Q(posts__status='published'))
-        ).filter(posts_count__gt=0).order_by('-posts_count')[:10],
+        'popular_tags': _blog_sidebar()['popular_tags'],
     }
     
-    return render(request, 'blogs.html', context)
+    return tag_response(render(request, 'blogs.html', context), f'tag:{tag.pk}', 'blogposts')
 
 @require_POST
 def newsletter_subscribe(request):
@@ -265,32 +295,27 @@ def blog_search(request):
     posts = BlogPost.objects.none()
     
     if query:
-        posts = BlogPost.objects.filter(
-            Q(title__icontains=query) |
-            Q(excerpt__icontains=query) |
-            Q(content__icontains=query) |
-            Q(tags__name__icontains=query) |
-            Q(category__name__icontains=query),
-            status='published'
-        ).distinct().select_related('category', 'author').prefetch_related('tags')
+        posts = search_posts(
+            BlogPost.objects.filter(status='published').select_related('category', 'author').prefetch_related('tags'),
+            query,
+        )
     
     paginator = Paginator(posts, 6)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    if query:
+        page_obj.object_list = add_headlines(page_obj.object_list, query)
+    sidebar = _blog_sidebar()
     
     context = {
         'page_obj': page_obj,
         'search_query': query,
-        'results_count': posts.count(),
-        'categories': Category.objects.annotate(
-            posts_count=Count('posts', filter=Q(posts__status='published'))
-        ).filter(posts_count__gt=0),
-        'popular_tags': Tag.objects.annotate(
-            posts_count=Count('posts', filter=Q(posts__status='published'))
-        ).filter(posts_count__gt=0).order_by('-posts_count')[:10],
+        'results_count': paginator.count,
+        'categories': sidebar['categories'],
+        'popular_tags': sidebar['popular_tags'],
     }
     
-    return render(request, 'blog_search.html', context)
+    return tag_response(render(request, 'blog_search.html', context), 'blogposts')
 
 API_BASE = os.getenv("MICROSERVICE_API")
 # API_BASE = "http://54.197.194.173/api/properties/large/"
@@ -311,11 +336,13 @@ API_BASE = os.getenv("MICROSERVICE_API")
 #     return render(request, 'index.html', context)
 
 def index(request):
-    """Homepage - properties loaded dynamically via JavaScript"""
+    """Homepage - latest properties rendered on the server from the cached listing"""
+    listing = get_first_page()
     context = {
         'MICROSERVICE_API': settings.MICROSERVICE_API,
+        'featured_properties': listing['results'][:8] if listing else [],
     }
-    return render(request, 'index.html', context)
+    return tag_response(render(request, 'index.html', context), 'listing')
 
 
 def exclusive(request):
@@ -344,13 +371,20 @@ def extract_page_number(url):
 
 
 def properties(request):
-    """Ultra-fast properties page – all data loaded by JavaScript"""
-    return render(request, 'properties.html', {
-        'properties': [],
-        'total_count': 0,
+    """
+    Properties page - the default first page is rendered on the server from
+    the cached listing; JavaScript takes over for filters and pagination
+    """
+    # Filtered URLs (?city=...) are still loaded by JavaScript
+    listing = None if request.GET else get_first_page()
+    response = render(request, 'properties.html', {
+        'properties': listing['results'] if listing else [],
+        'initial_listing': listing,
+        'total_count': listing['count'] if listing else 0,
         'properties_error': None,
         'MICROSERVICE_API': API_BASE,
     })
+    return tag_response(response, 'listing')
 
 # @csrf_exempt
 # def properties(request):
@@ -699,124 +733,29 @@ def properties(request):
 def property_redirect(request, property_id):
     """
     Redirect old /property/ID/ URLs to new /property/slug-ID/ format
-    Fetches property from API to get proper slug
+    Uses the local slug index; only unknown ids fall back to the (cached) payload
     """
-    url = f"{API_BASE}/{property_id}"
-    
-    try:
-        resp = requests.get(url, timeout=8)
-        
-        if resp.status_code == 200:
-            data = resp.json()
-            
-            if data.get("status"):
-                prop = data.get("data") or {}
-                
-                # Get title and generate slug
-                title_data = prop.get('title', {})
-                title = title_data.get('en', 'property') if isinstance(title_data, dict) else (title_data or 'property')
-                
-                # Use API slug if available, otherwise create from title
-                slug = prop.get('slug') or slugify(title)
-                
-                # Redirect to new URL format with 301 (permanent)
-                return redirect('property_detail', slug=slug, pk=property_id, permanent=True)
-    
-    except requests.RequestException:
-        pass
-    
-    # If API call fails, create generic slug and redirect
-    return redirect('property_detail', slug='property', pk=property_id, permanent=True)
+    slug = slug_index.get_slug(property_id)
+    if not slug:
+        prop = property_payload.get_property(property_id)
+        # If the API call fails, use a generic slug
+        slug = prop['slug'] if prop else 'property'
 
+    # Redirect to new URL format with 301 (permanent)
+    return redirect('property_detail', slug=slug, pk=property_id, permanent=True)
 
-# Cache the view for 15 minutes to reduce API calls
-@cache_page(60 * 15)
-def property_detail(request, slug, pk):
-    """
-    Display property details using slug in URL but pk (ID) for API call
-    URL format: /property/luxury-villa-palm-jumeirah-2376/
-    API call: uses the pk (2376)
-    """
-    
-    print(f"🔍 Property Detail View Called:")
-    print(f"   Slug from URL: {slug}")
-    print(f"   PK from URL: {pk}")
-    
-    url = f"{API_BASE}/property/{pk}"
-    print(f"   API URL: {url}")
-    
-    try:
-        resp = requests.get(url, timeout=8)
-        print(f"   API Response Status: {resp.status_code}")
-    except requests.RequestException as e:
-        print(f"   ❌ API Request Error: {e}")
-        return render(request, "property_detail.html", {
-            "property_error": "Failed to retrieve property data."
-        })
 
-    if resp.status_code != 200:
-        print(f"   ❌ API returned non-200 status")
-        return render(request, "property_detail.html", {
-            "property_error": "Property not found or API error."
-        })
-    
-    data = resp.json()
-    print(f"   API Response Data Keys: {data.keys() if data else 'None'}")
-    
-    if not data.get("status"):
-        print(f"   ❌ API status is False")
-        return render(request, "property_detail.html", {
-            "property_error": data.get("message") or "API returned error."
-        })
+def _property_error(request, message):
+    """Error page that neither the HTML cache nor the crawler snapshot keeps"""
+    response = render(request, "property_detail.html", {"property_error": message})
+    add_never_cache_headers(response)
+    return response
+
+
+PROPERTY_DETAIL_TEMPLATES = ("property_detail.html", "base.html")
 
-    prop = data.get("data") or {}
-    print(f"   ✅ Property data retrieved: {prop.get('title', {}).get('en', 'No title')}")
-    
-    # Clean the description
-    if prop.get('description'):
-        desc = prop['description']
-        if isinstance(desc, dict) and 'en' in desc:
-            raw_html = desc['en']
-            
-            # Remove all style attributes
-            raw_html = re.sub(r'style\s*=\s*["\'][^"\']*["\']?', '', raw_html, flags=re.IGNORECASE | re.DOTALL)
-            raw_html = re.sub(r'(color-scheme|forced-color-adjust|font-family|position-anchor)[^>]*', '', raw_html, flags=re.IGNORECASE)
-            
-            clean_text = strip_tags(raw_html)
-            clean_text = re.sub(r'<\s*p[^a-zA-Z0-9>]*', '', clean_text)
-            clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-            clean_text = re.sub(r'unset[;:\s]+', '', clean_text)
-            clean_text = re.sub(r'(color-scheme|forced-color-adjust|mask|math-depth|position|appearance)[:\s]+[^;]*;?', '', clean_text)
-            
-            sentences = re.split(r'(?<=[.!?])\s+', clean_text)
-            paragraphs = []
-            for i in range(0, len(sentences), 3):
-                para_sentences = sentences[i:i+3]
-                para_text = ' '.join(para_sentences).strip()
-                if para_text:
-                    paragraphs.append(f'<p>{para_text}</p>')
-            
-            prop['description']['en'] = '\n'.join(paragraphs) if paragraphs else '<p>No description available.</p>'
-    
-    # Get title and correct slug
-    title_data = prop.get('title', {})
-    title = title_data.get('en', 'property') if isinstance(title_data, dict) else (title_data or 'property')
-    
-    # Get slug from API or generate from title
-    correct_slug = prop.get('slug') or slugify(title)
-    
-    print(f"   URL slug: {slug}")
-    print(f"   Correct slug: {correct_slug}")
-    
-    # Only redirect if slugs are different
-    if correct_slug != slug:
-        print(f"   ⚠️ Slug mismatch - redirecting to correct URL")
-        return redirect('property_detail', slug=correct_slug, pk=pk)
-    
-    # Get district name
-    district_name = prop.get('district', {}).get('name', {}).get('en', '')
 
-    # Generate meta title
+def _meta_title(title, district_name, pk):
     combined_title_length = len(title) + len(district_name) + 13
     id_suffix = f" #{pk}"
 
@@ -830,45 +769,77 @@ def property_detail(request, slug, pk):
     if len(meta_title) > 64:
         available_length = 64 - len(id_suffix)
         meta_title = meta_title[:available_length].rsplit(' ', 1)[0] + id_suffix
-    
-    # Ensure lists exist
-    prop.setdefault("property_images", [])
-    prop.setdefault("facilities", [])
-    prop.setdefault("grouped_apartments", [])
-    prop.setdefault("payment_plans", [])
-    prop.setdefault("property_units", [])
-    
-    # Limit images
-    if len(prop["property_images"]) > 20:
-        prop["property_images"] = prop["property_images"][:20]
+    return meta_title
 
-    print(f"   ✅ Rendering template with property data")
-    
-    # In property_detail view, add this after getting prop:
-    print(f"   Property data keys: {prop.keys()}")
-    print(f"   Property slug from API: {prop.get('slug')}")
-    
-    # ✅ CRITICAL: Ensure slug is in the property object for the template
-    prop['slug'] = correct_slug  # This ensures grouped_apartments have access to property slug
 
-    
-    return render(request, "property_detail.html", {
-        "property": prop,
-        "meta_title": meta_title
-    })
+# The upstream payload is cached per pk (main/property_payload.py), so every
+# URL variant shares one fetch; verified crawlers get snapshots
+@crawler_snapshot
+def property_detail(request, slug, pk):
+    """
+    Display property details using slug in URL but pk (ID) for API call
+    URL format: /property/luxury-villa-palm-jumeirah-2376/
+    API call: uses the pk (2376)
+    """
+    # Wrong-slug URLs are redirected from the index of API slugs without an API call
+    known_slug = slug_index.get_slug(pk)
+    if known_slug and known_slug != slug:
+        return redirect('property_detail', slug=known_slug, pk=pk)
+
+    payload = property_payload.get_payload(pk)
+    prop = payload.get("property")
+    if prop is None:
+        logger.info(f"[PROPERTY] {pk}: {payload['error']}")
+        return _property_error(request, payload["error"])
+
+    # Only redirect if slugs are different; the payload is authoritative, so
+    # the index is corrected first and can't send the visitor back
+    correct_slug = prop["slug"]
+    if correct_slug != slug:
+        slug_index.remember(pk, correct_slug)
+        return redirect('property_detail', slug=correct_slug, pk=pk)
 
+    # Rendered once per payload and template version for all visitors
+    html = property_payload.get_html(pk, payload, PROPERTY_DETAIL_TEMPLATES)
+    if html is not None:
+        return tag_response(HttpResponse(html), f'property:{pk}')
 
+    header = PROPERTY_HEADER(prop)
+    response = render(request, "property_detail.html", {
+        "property": prop,
+        "meta_title": _meta_title(header.title, header.district, pk),
+    })
+    property_payload.set_html(pk, payload, PROPERTY_DETAIL_TEMPLATES, response.content)
+    return tag_response(response, f'property:{pk}')
+
+
+# Template fields unit_detail.html reads from the parent property
+UNIT_PROPERTY_DEFAULTS = {
+    "facilities": [],
+    "payment_plans": [],
+    "title": {"en": "Property Details"},
+    "district": {"name": {"en": "Dubai"}},
+    "city": {"name": {"en": "Dubai"}},
+    "developer": {"name": "Developer"},
+    "delivery_date": None,
+    "sales_status": {"name": {"en": "Available"}},
+    "residential_units": 0,
+    "completion_rate": 0,
+    "cover": "",
+}
+
+
+@crawler_snapshot
 def unit_detail(request, property_slug, property_id, unit_id):
     """
     Display unit details
     URL format: /property/luxury-villa-2376/unit/123/
+    Units are looked up in the cached property payload first; the unit
+    endpoints are only tried for units the payload doesn't list.
     """
-    
-    print(f"🔍 Unit Detail View:")
-    print(f"   Property Slug: {property_slug}")
-    print(f"   Property ID: {property_id}")
-    print(f"   Unit ID: {unit_id}")
-    
+    property = property_payload.get_property(property_id)
+    unit = property_payload.find_unit(property, unit_id) if property else None
+
     # TRY MULTIPLE API ENDPOINT PATTERNS
     api_patterns = [
         f"{API_BASE}/units/{unit_id}",                              # Pattern 1: Direct unit access
@@ -877,146 +848,42 @@ def unit_detail(request, property_slug, property_id, unit_id):
         f"{API_BASE}/grouped-apartments/{unit_id}",                 # Pattern 4: Grouped apartments
         f"{API_BASE}/property-units/{unit_id}",                     # Pattern 5: Property units
     ]
-    
-    unit = None
-    unit_data = None
-    
+
     # Try each API pattern until one works
-    for pattern_index, unit_url in enumerate(api_patterns, 1):
-        print(f"   🔄 Trying API Pattern #{pattern_index}: {unit_url}")
-        
+    for unit_url in api_patterns if not unit else ():
         try:
             unit_resp = requests.get(unit_url, timeout=8)
-            print(f"      Response Status: {unit_resp.status_code}")
-            
             if unit_resp.status_code == 200:
                 unit_data = unit_resp.json()
-                
                 if unit_data.get("status"):
                     unit = unit_data.get("data", {})
-                    print(f"   ✅ SUCCESS with Pattern #{pattern_index}!")
-                    print(f"   Unit Type: {unit.get('unit_type', 'Unknown')}")
                     break
-                else:
-                    print(f"      ⚠️ Status is False: {unit_data.get('message', 'No message')}")
-            else:
-                print(f"      ❌ Failed with status {unit_resp.status_code}")
-                
-        except requests.RequestException as e:
-            print(f"      ❌ Request error: {e}")
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"[UNIT] {unit_url}: {e}")
             continue
-    
-    # If no API pattern worked, try fetching from property data
-    if not unit:
-        print(f"   ⚠️ All API patterns failed. Trying to find unit in property data...")
-        
-        # Fetch property data to get units
-        property_url = f"{API_BASE}/property/{property_id}"
-        print(f"   Fetching property: {property_url}")
-        
-        try:
-            property_resp = requests.get(property_url, timeout=8)
-            if property_resp.status_code == 200:
-                property_data = property_resp.json()
-                if property_data.get("status"):
-                    property = property_data.get("data", {})
-                    
-                    # Search in grouped_apartments
-                    for apt in property.get("grouped_apartments", []):
-                        if str(apt.get("id")) == str(unit_id):
-                            unit = apt
-                            print(f"   ✅ Found unit in grouped_apartments!")
-                            break
-                    
-                    # If not found, search in property_units
-                    if not unit:
-                        for apt in property.get("property_units", []):
-                            if str(apt.get("id")) == str(unit_id):
-                                unit = apt
-                                print(f"   ✅ Found unit in property_units!")
-                                break
-        except requests.RequestException as e:
-            print(f"   ❌ Error fetching property: {e}")
-    
+
     # If still no unit found, show error
     if not unit:
-        print(f"   ❌ Unit not found in any source")
-        return render(request, "unit_detail.html", {
+        logger.info(f"[UNIT] Unit {unit_id} of property {property_id} not found")
+        response = render(request, "unit_detail.html", {
             "unit_error": f"Unit #{unit_id} not found. Please contact us for availability."
         })
-    
-    print(f"   📦 Unit data keys: {unit.keys() if unit else 'None'}")
-    
-    # FETCH PROPERTY DATA for template
-    property_url = f"{API_BASE}/property/{property_id}"
-    print(f"   Fetching property details: {property_url}")
-    
-    property = None
-    try:
-        property_resp = requests.get(property_url, timeout=8)
-        if property_resp.status_code == 200:
-            property_data = property_resp.json()
-            if property_data.get("status"):
-                property = property_data.get("data", {})
-                
-                # Get slug from property or generate it
-                if not property.get('slug'):
-                    title = property.get('title', {})
-                    title_en = title.get('en', 'property') if isinstance(title, dict) else str(title)
-                    property['slug'] = slugify(title_en)
-                
-                print(f"   ✅ Property retrieved: {property.get('title', {}).get('en', 'Unknown')}")
-                print(f"   📌 Property ID: {property.get('id')}")
-                print(f"   📌 Property Slug: {property.get('slug')}")
-                
-                # Ensure required fields exist
-                property.setdefault("facilities", [])
-                property.setdefault("payment_plans", [])
-                property.setdefault("title", {"en": "Property Details"})
-                property.setdefault("district", {"name": {"en": "Dubai"}})
-                property.setdefault("city", {"name": {"en": "Dubai"}})
-                property.setdefault("developer", {"name": "Developer"})
-                property.setdefault("delivery_date", None)
-                property.setdefault("sales_status", {"name": {"en": "Available"}})
-                property.setdefault("residential_units", 0)
-                property.setdefault("completion_rate", 0)
-                property.setdefault("cover", "")
-                
-    except requests.RequestException as e:
-        print(f"   ⚠️ Error fetching property: {e}")
-    
-    # Create fallback property if fetch failed
-    if not property:
-        print(f"   ⚠️ Using fallback property data")
-        
-        # Use property_slug from URL or generate one
+        add_never_cache_headers(response)
+        return response
+
+    if property:
+        for field, default in UNIT_PROPERTY_DEFAULTS.items():
+            property.setdefault(field, default)
+    else:
+        # Fallback property if the fetch failed; use property_slug from URL or generate one
         fallback_slug = property_slug if (property_slug and property_slug != 'property') else slugify(f"property-{property_id}")
+        property = {"id": property_id, "slug": fallback_slug, **UNIT_PROPERTY_DEFAULTS}
 
-        
-        property = {
-            "id": property_id,
-            "slug": fallback_slug,  # ✅ ALWAYS valid slug
-            "title": {"en": "Property Details"},
-            "district": {"name": {"en": "Dubai"}},
-            "city": {"name": {"en": "Dubai"}},
-            "developer": {"name": "Developer"},
-            "facilities": [],
-            "payment_plans": [],
-            "delivery_date": None,
-            "sales_status": {"name": {"en": "Available"}},
-            "residential_units": 0,
-            "completion_rate": 0,
-            "cover": ""
-        }
-    
-    print(f"   ✅ Rendering template with unit and property data")
-    print(f"   🔗 Final Property Slug: {property.get('slug')}")
-    print(f"   🔗 Final Property ID: {property.get('id')}")
-    
-    return render(request, "unit_detail.html", {
+    response = render(request, "unit_detail.html", {
         "unit": unit,
         "property": property
     })
+    return tag_response(response, f'property:{property_id}')
 
 
 def extract_page_number(url):
@@ -1036,6 +903,7 @@ def model1(request):
     """Model 1 page"""
     return render(request, 'model1.html')
 
+@surrogate_keys('pages')
 def about(request):
     """About us page"""
     return render(request, 'about.html')
@@ -1065,8 +933,7 @@ def contact(request):
             message=message_text
         )
         
-        messages.success(request, 'Thank you for your message! We will get back to you soon.')
-        return redirect('contact')
+        return redirect_with_notice('contact', 'success', 'Thank you for your message! We will get back to you soon.')
     
     return render(request, 'contact.html')
 
@@ -1116,13 +983,32 @@ def search_properties_api(request):
             'error': result['error']
         }, json_dumps_params={'ensure_ascii': False})
 
+FILTER_NUMERIC_FIELDS = ['delivery_year', 'low_price', 'max_price', 'min_area', 'max_area']
+
+
+def _query_filters(query):
+    """Filters from a GET query string, numbers converted like the JSON body's"""
+    data = query.dict()
+    for field in FILTER_NUMERIC_FIELDS:
+        try:
+            value = float(data[field])
+            data[field] = int(value) if value.is_integer() else value
+        except (KeyError, ValueError):
+            data.pop(field, None)
+    return data
+
+
 @csrf_exempt
-@require_http_methods(["POST"])
+@require_http_methods(["GET", "POST"])
 def filter_properties_api(request):
-    """API endpoint for property filtering with JSON body"""
+    """
+    API endpoint for property filtering with JSON body (POST) or query
+    string (GET). GET responses carry an ETag of the body, so an unchanged
+    listing is answered with 304.
+    """
     try:
         # Parse JSON data
-        data = json.loads(request.body)
+        data = _query_filters(request.GET) if request.method == 'GET' else json.loads(request.body)
 
         
         # Extract filters from JSON body - only include non-empty/non-zero values
@@ -1141,8 +1027,7 @@ def filter_properties_api(request):
                 filters[field] = str(value).strip()
         
         # Only add numeric fields if they are greater than 0
-        numeric_fields = ['delivery_year', 'low_price', 'max_price', 'min_area', 'max_area']
-        for field in numeric_fields:
+        for field in FILTER_NUMERIC_FIELDS:
             value = data.get(field)
             if value and (isinstance(value, (int, float)) and value > 0):
                 filters[field] = value
@@ -1156,37 +1041,9 @@ def filter_properties_api(request):
             data_block = properties_result['data']['data']
             
             # Map properties to frontend format
-            mapped_properties = []
-            for prop in data_block.get('results', []):
-                title_data = prop.get('title', {})
-                
-                # Map property type ID to readable text
-                property_type_id = prop.get('property_type')
-                property_type_text = 'Residential'  # Default
-                if property_type_id == '3' or property_type_id == 3:
-                    property_type_text = 'Commercial'
-                elif property_type_id == '20' or property_type_id == 20:
-                    property_type_text = 'Residential'
-                
-                # Debug log to check property type mapping
-                print(f"🏠 Backend property type mapping: ID={property_type_id} -> Text={property_type_text} (3=Commercial, 20=Residential)")
-                
-                mapped_properties.append({
-                    'id': prop.get('id'),
-                    'title': title_data.get('en', 'Luxury Property'),
-                    'location': prop.get('location', 'Premium Location, Dubai'),
-                    'bedrooms': prop.get('bedrooms', 'N/A'),
-                    'area': prop.get('area', 'N/A'),
-                    'price': prop.get('price'),
-                    'low_price': prop.get('low_price'),
-                    'min_area': prop.get('min_area'),
-                    'property_type': property_type_text,
-                    'cover': prop.get('cover'),  # Add cover field
-                    'image': prop.get('image'),  # Keep image as backup
-                    'city': prop.get('city'),    # Add city object
-                    'district': prop.get('district'),  # Add district object
-                    'detail_url': f"/property/{prop.get('id')}/"
-                })
+            mapped_properties = [
+                card.as_dict() for card in PROPERTY_CARD.map_many(data_block.get('results', []))
+            ]
             
             # Debug pagination data
             pagination_data = {
@@ -1198,13 +1055,13 @@ def filter_properties_api(request):
             }
             print(f"📄 Backend pagination data: {pagination_data}")
             
-            return JsonResponse({
+            return conditional_json(request, JsonResponse({
                 'status': True,
                 'data': {
                     'results': mapped_properties,
                     **pagination_data
                 }
-            }, json_dumps_params={'ensure_ascii': False})
+            }, json_dumps_params={'ensure_ascii': False}))
         else:
             return JsonResponse({
                 'status': False,
@@ -1239,8 +1096,7 @@ def contact_submit(request):
         
         # Validate required fields
         if not all([first_name, last_name, email, phone]):
-            messages.error(request, 'Please fill in all required fields.')
-            return redirect('contact')
+            return redirect_with_notice('contact', 'error', 'Please fill in all required fields.')
         
         # Get optional fields
         investment_budget = request.POST.get('investmentBudget', '')
@@ -1273,13 +1129,11 @@ def contact_submit(request):
             # Log the error but don't fail the form submission
             print(f"Email notification failed: {e}")
         
-        messages.success(request, 'Thank you for your inquiry! Our team will contact you within 24 hours.')
-        return redirect('contact')
+        return redirect_with_notice('contact', 'success', 'Thank you for your inquiry! Our team will contact you within 24 hours.')
         
     except Exception as e:
         print(f"Contact form error: {e}")
-        messages.error(request, 'An error occurred while submitting your inquiry. Please try again.')
-        return redirect('contact')
+        return redirect_with_notice('contact', 'error', 'An error occurred while submitting your inquiry. Please try again.')
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -1458,10 +1312,11 @@ def cities_api(request):
         result = PropertyService.get_cities()
         
         if result['success']:
-            return JsonResponse({
+            # ETag of the payload: clients revalidate instead of downloading the list again
+            return conditional_json(request, JsonResponse({
                 'status': True,
                 'data': result['data']
-            }, json_dumps_params={'ensure_ascii': False})
+            }, json_dumps_params={'ensure_ascii': False}))
         else:
             return JsonResponse({'status': False, 'error': result['error']}, status=400, json_dumps_params={'ensure_ascii': False})
             
@@ -1477,10 +1332,11 @@ def developers_api(request):
         result = PropertyService.get_developers()
         
         if result['success']:
-            return JsonResponse({
+            # ETag of the payload: clients revalidate instead of downloading the list again
+            return conditional_json(request, JsonResponse({
                 'status': True,
                 'data': result['data']
-            }, json_dumps_params={'ensure_ascii': False})
+            }, json_dumps_params={'ensure_ascii': False}))
         else:
             return JsonResponse({'status': False, 'error': result['error']}, status=400, json_dumps_params={'ensure_ascii': False})
             
@@ -1490,49 +1346,118 @@ def developers_api(request):
 
 
 
-# landingpages
+@never_cache
+@require_http_methods(["GET"])
+def csrf_token_api(request):
+    """CSRF token (and cookie) for forms on pages that don't embed one"""
+    return JsonResponse({'token': get_token(request)})
+
+
+@csrf_exempt
+@require_POST
+def property_view_beacon(request, pk):
+    """Beacon sent by property_detail.html; counted in memory, written in bulk later"""
+    if countable_beacon(request, 'property', pk) and Property.objects.filter(api_id=pk, is_active=True).exists():
+        property_views.record_view(pk)
+    return HttpResponse(status=204)
+
+
+@csrf_exempt
+@require_POST
+def blog_view_beacon(request, pk):
+    """Beacon sent by blog_detail.html; the page is edge-cached, so the view can't count itself"""
+    if countable_beacon(request, 'blogpost', pk) and BlogPost.objects.filter(pk=pk, status='published').exists():
+        counters.increment(BlogPost, pk, 'views')
+    return HttpResponse(status=204)
+
+
+@require_http_methods(["GET"])
+def most_viewed_properties_api(request):
+    """Most viewed upstream properties (?days=7&limit=12) for homepage rails"""
+    try:
+        days = min(max(int(request.GET.get('days', 7)), 1), 30)
+        limit = min(max(int(request.GET.get('limit', 12)), 1), 24)
+    except ValueError:
+        return JsonResponse({'status': False, 'error': 'days and limit must be integers'}, status=400)
+
+    response = conditional_json(request, JsonResponse({
+        'status': True,
+        'data': property_views.most_viewed(days, limit),
+    }, json_dumps_params={'ensure_ascii': False}))
+    return tag_response(response, 'most_viewed')
+
+
+# landingpages (edge-cached, purge with manage.py purge_edge pages; served from
+# the export_static_pages files when STATIC_PAGES_SERVE is on)
+@surrogate_keys('pages')
+@exported_page
 def retail(request):
     return render(request,'landingpages/retail.html')
 
+@surrogate_keys('pages')
+@exported_page
 def second(request):
     return render(request,'landingpages/second.html')
 
+@surrogate_keys('pages')
+@exported_page
 def commercial(request):
     return render(request,'landingpages/commercial.html')
 
+@surrogate_keys('pages')
+@exported_page
 def luxury(request):
     return render(request,'landingpages/luxury.html')
 
+@surrogate_keys('pages')
+@exported_page
 def beach(request):
     return render(request,'landingpages/beach.html')
 
+@surrogate_keys('pages')
+@exported_page
 def offplan(request):
     return render(request,'landingpages/offplan.html')
 
+@surrogate_keys('pages')
+@exported_page
 def labour(request):
     return render(request,'landingpages/labour.html')
 
+@surrogate_keys('pages')
+@exported_page
 def warehouse(request):
     return render(request,'landingpages/warehouse.html')
 
+@surrogate_keys('pages')
+@exported_page
 def plots(request):
     return render(request,'landingpages/plots.html')
 
+@surrogate_keys('pages')
+@exported_page
 def mansions(request):
     return render(request,'landingpages/mansions.html')
 
 
+@surrogate_keys('pages')
+@exported_page
 def privacy(request):
     return render(request,'privacy_policy.html')
 
+@surrogate_keys('pages')
+@exported_page
 def terms(request):
     return render(request,'terms.html')
 
+@surrogate_keys('pages')
+@exported_page
 def rera(request):
     return render(request,'rera.html')
 
 
 
+@exported_page
 def robots_txt(request):
     content = (
         "User-agent: *\n"
@@ -1543,6 +1468,46 @@ def robots_txt(request):
     return HttpResponse(content, content_type="text/plain")
 
 
+def _sitemap_file_stat(path):
+    try:
+        return path.stat()
+    except (OSError, TypeError):
+        return None
+
+
+def _sitemap_etag(request, filename=None, **kwargs):
+    path = sitemap_files.shard_path(filename) if filename else sitemap_files.index_path()
+    stat = _sitemap_file_stat(path)
+    return f'{stat.st_mtime_ns:x}-{stat.st_size:x}' if stat else None
+
+
+def _sitemap_last_modified(request, filename=None, **kwargs):
+    path = sitemap_files.shard_path(filename) if filename else sitemap_files.index_path()
+    stat = _sitemap_file_stat(path)
+    return datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc) if stat else None
+
+
+@condition(etag_func=_sitemap_etag, last_modified_func=_sitemap_last_modified)
+def sitemap_index_file(request, sitemaps):
+    """Pre-generated sitemap index; the sitemap framework's index until one exists"""
+    path = sitemap_files.index_path()
+    if not path.exists():
+        return django_sitemap_index(request, sitemaps=sitemaps)
+    return FileResponse(open(path, 'rb'), content_type='application/xml')
+
+
+@condition(etag_func=_sitemap_etag, last_modified_func=_sitemap_last_modified)
+def sitemap_file(request, filename):
+    """One pre-generated sitemap-<section>-<n>.xml.gz shard"""
+    path = sitemap_files.shard_path(filename)
+    if path is None or not path.exists():
+        raise Http404("Sitemap not found")
+    response = FileResponse(open(path, 'rb'), content_type='application/gzip')
+    # Already gzipped: a Content-Encoding keeps GZipMiddleware from compressing it again
+    response['Content-Encoding'] = 'identity'
+    return response
+
+
 # main/views.py
 
 